@@ -0,0 +1,155 @@
+import json
+import platform
+import subprocess
+import time
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+
+from LammPy.CrystalLibrary import CRYSTALS
+from LammPy.LammpsScriptBuilder import LammpsScriptFactory
+from LammPy.LogParser import SECTIONS, parseLog
+from LammPy.TemperatureSweep import TemperatureSweep
+
+# Crystals of CrystalLibrary.CRYSTALS benchmarked by default
+BUNDLED_SYSTEMS: tuple[str, ...] = ("Water", "Nitric", "NAM")
+
+
+class Benchmark:
+    """
+    Scaling benchmark of the bundled crystals: every system is replicated to each supercell,
+    runs a short NVT then NPT stage (no trajectory) at every rank count, and the log's loop
+    times give timesteps/s, ns/day and the parallel efficiency against the smallest rank count.
+
+    benchmarkDirectory/
+        <system>/<a>x<b>x<c>/np<ranks>/bench.lammps
+        benchmark-<date>.json
+    """
+
+    def __init__(
+        self,
+        benchmarkDirectory: str,
+        supercells: list[tuple[int, int, int]] | None = None,
+        rankCounts: list[int] | None = None,
+        stageDurationPs: float = 1,
+        TempK: float = 100,
+        systems: dict[str, str] | None = None,
+    ):
+        self.benchmarkDirectory: Path = Path(benchmarkDirectory)
+        self.supercells: list[tuple[int, int, int]] = [(1, 1, 1), (2, 2, 2), (3, 3, 3)] if supercells is None else supercells
+        self.rankCounts: list[int] = [1, 2, 4] if rankCounts is None else sorted(rankCounts)
+        self.stageDurationPs: float = stageDurationPs
+        self.TempK: float = TempK
+        self.systems: dict[str, str] = {name: CRYSTALS[name].commands() for name in BUNDLED_SYSTEMS} if systems is None else systems
+
+    def writeJobs(self, factory: LammpsScriptFactory | None = None) -> dict[tuple[str, tuple[int, int, int], int], Path]:
+        """One script per (system, supercell, rank count); the factory settings (pair style, ...) are shared."""
+        baseFactory: LammpsScriptFactory = LammpsScriptFactory() if factory is None else factory
+        jobScripts: dict[tuple[str, tuple[int, int, int], int], Path] = {}
+        for systemName, systemCommands in self.systems.items():
+            for supercell in self.supercells:
+                caseFactory: LammpsScriptFactory = deepcopy(baseFactory)
+                caseFactory.fixes = []
+                caseFactory.replicates = []
+                caseFactory.loadSystem(systemCommands)
+                caseFactory.replicate(*supercell)
+                caseFactory.setTrajectoryDump(productionOnly=True)
+                caseFactory.addNVT(Temp1K=self.TempK, Temp2K=self.TempK, fixDurationPs=self.stageDurationPs, production=False)
+                caseFactory.addNPT(Temp1K=self.TempK, Temp2K=self.TempK, PressureBar=1.0, fixDurationPs=self.stageDurationPs, production=False)
+                for ranks in self.rankCounts:
+                    jobDirectory: Path = self.benchmarkDirectory / systemName / "x".join(map(str, supercell)) / f"np{ranks}"
+                    jobDirectory.mkdir(parents=True, exist_ok=True)
+                    scriptPath: Path = jobDirectory / "bench.lammps"
+                    caseFactory.buildJobAtPath(scriptPath.as_posix())
+                    jobScripts[(systemName, supercell, ranks)] = scriptPath
+        return jobScripts
+
+    def run(
+        self,
+        factory: LammpsScriptFactory | None = None,
+        lammpsExecutable: str = "lmp",
+        mpiLauncher: str = "mpirun",
+    ) -> Path:
+        """Run every case one after the other (each owns the CPU) and write the JSON report. Returns its path."""
+        timestepFs: float = (LammpsScriptFactory() if factory is None else factory).timestep
+        results: list[dict] = []
+        for (systemName, supercell, ranks), scriptPath in self.writeJobs(factory).items():
+            wallStart: float = time.perf_counter()
+            subprocess.run(
+                TemperatureSweep.launchCommand(scriptPath, ranks, lammpsExecutable, mpiLauncher),
+                cwd=scriptPath.parent,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            runs: np.ndarray = parseLog((scriptPath.parent / "log.lammps").as_posix())
+            if not len(runs):
+                raise ValueError(f"No run block in {scriptPath.parent / 'log.lammps'}")
+            loopSeconds: float = float(runs["loopSeconds"].sum())
+            steps: int = int(runs["steps"].sum())
+            results.append(
+                {
+                    "system": systemName,
+                    "supercell": list(supercell),
+                    "ranks": ranks,
+                    "atoms": int(runs["atoms"][-1]),
+                    "steps": steps,
+                    "loopSeconds": loopSeconds,
+                    "wallSeconds": time.perf_counter() - wallStart,
+                    "timestepsPerSecond": steps / loopSeconds,
+                    "nsPerDay": steps / loopSeconds * timestepFs * 86400 / 1e6,
+                    # % of the loop time per section, weighted over the runs
+                    "breakdown": {section: float(np.nansum(runs[section] * runs["loopSeconds"]) / loopSeconds) for section in SECTIONS},
+                }
+            )
+        self.addParallelEfficiency(results)
+
+        report: dict = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "processor": platform.processor(),
+            "lammpsExecutable": lammpsExecutable,
+            "timestepFs": timestepFs,
+            "stageDurationPs": self.stageDurationPs,
+            "results": results,
+        }
+        reportPath: Path = self.benchmarkDirectory / f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(reportPath, "w") as file:
+            json.dump(report, file, indent=4)
+        return reportPath
+
+    @staticmethod
+    def addParallelEfficiency(results: list[dict]) -> None:
+        """efficiency = speed-up over the smallest rank count of the same case, divided by the rank ratio."""
+        for result in results:
+            sameCase: list[dict] = [other for other in results if other["system"] == result["system"] and other["supercell"] == result["supercell"]]
+            reference: dict = min(sameCase, key=lambda other: other["ranks"])
+            speedUp: float = result["timestepsPerSecond"] / reference["timestepsPerSecond"]
+            result["parallelEfficiency"] = speedUp * reference["ranks"] / result["ranks"]
+
+    @staticmethod
+    def compareReports(previousReportPath: str, currentReportPath: str, tolerance: float = 0.1) -> list[dict]:
+        """Cases whose timesteps/s dropped by more than tolerance (relative) between two reports."""
+        with open(previousReportPath) as file:
+            previous: dict = json.load(file)
+        with open(currentReportPath) as file:
+            current: dict = json.load(file)
+
+        def caseKey(result: dict) -> tuple:
+            return result["system"], tuple(result["supercell"]), result["ranks"]
+
+        previousSpeeds: dict[tuple, float] = {caseKey(result): result["timestepsPerSecond"] for result in previous["results"]}
+        regressions: list[dict] = []
+        for result in current["results"]:
+            previousSpeed: float | None = previousSpeeds.get(caseKey(result))
+            if previousSpeed is not None and result["timestepsPerSecond"] < (1 - tolerance) * previousSpeed:
+                regressions.append(
+                    {
+                        "system": result["system"],
+                        "supercell": result["supercell"],
+                        "ranks": result["ranks"],
+                        "previousTimestepsPerSecond": previousSpeed,
+                        "timestepsPerSecond": result["timestepsPerSecond"],
+                    }
+                )
+        return regressions
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from LammPy.LammpsScriptBuilder import LammpsScriptFactory, ProtocolStage
+
+
+class Campaign:
+    """
+    Many jobs sharing one factory setup. The job-independent blocks (settings and box, labelmaps,
+    masses and force field, system, thermo) are written once and every job script only includes
+    them before its own stages, so thousands of variants cost a few kB each.
+
+    campaignDirectory/
+        shared/settings.lammps, forcefield.lammps, system.lammps, thermo.lammps (+ system.data)
+        <job>/<job>.lammps      -> include ../shared/*.lammps, then the job stages
+
+    The shared files are written from the factory state at the first job: change the stages
+    between jobs, not the settings.
+    """
+
+    sharedDirectoryName: str = "shared"
+    dataFileName: str = "system.data"
+
+    def __init__(self, factory: LammpsScriptFactory, campaignDirectory: str):
+        self.factory: LammpsScriptFactory = factory
+        self.campaignDirectory: Path = Path(campaignDirectory)
+        self.sharedFileNames: list[str] = []
+
+    @property
+    def sharedDirectory(self) -> Path:
+        return self.campaignDirectory / self.sharedDirectoryName
+
+    def writeSharedFiles(self) -> list[Path]:
+        self.sharedDirectory.mkdir(parents=True, exist_ok=True)
+        # Jobs run from their own directory, next to the shared one
+        relativeDataPath: str = f"../{self.sharedDirectoryName}/{self.dataFileName}"
+        if self.factory.systemData is not None and self.factory.restartFile is None:
+            self.factory.writeSystemDataFile((self.sharedDirectory / self.dataFileName).as_posix())
+
+        sharedPaths: list[Path] = []
+        for blockName, commands in self.factory.sharedBlocks(dataFilePath=relativeDataPath).items():
+            sharedPath: Path = self.sharedDirectory / f"{blockName}.lammps"
+            with open(sharedPath, "w") as file:
+                file.write(commands)
+            sharedPaths.append(sharedPath)
+        self.sharedFileNames = [sharedPath.name for sharedPath in sharedPaths]
+        return sharedPaths
+
+    def writeJob(self, jobName: str) -> Path:
+        """Write <jobName>/<jobName>.lammps running the stages currently in factory.fixes."""
+        if not self.sharedFileNames:
+            self.writeSharedFiles()
+        jobDirectory: Path = self.campaignDirectory / jobName
+        jobDirectory.mkdir(parents=True, exist_ok=True)
+        scriptPath: Path = jobDirectory / f"{jobName}.lammps"
+        includePaths: list[str] = [f"../{self.sharedDirectoryName}/{fileName}" for fileName in self.sharedFileNames]
+        with open(scriptPath, "w") as file:
+            file.write(self.factory.getIncludingScript(scriptPath.name, includePaths))
+        if self.factory.checkpoints:
+            self.factory.writeStageManifest(self.factory.stageManifestPath(scriptPath.as_posix()))
+        return scriptPath
+
+    def writeJobs(self, jobStages: dict[str, list[ProtocolStage]]) -> list[Path]:
+        """One job per entry of jobStages (job name -> stages), the factory stages being restored afterwards."""
+        factoryStages: list[ProtocolStage] = self.factory.fixes
+        try:
+            scriptPaths: list[Path] = []
+            for jobName, stages in jobStages.items():
+                self.factory.fixes = stages
+                scriptPaths.append(self.writeJob(jobName))
+        finally:
+            self.factory.fixes = factoryStages
+        return scriptPaths
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def neighbourPairs(positions: np.ndarray, boxLengths: np.ndarray, cutoff: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every pair of atoms closer than cutoff in an orthogonal periodic box, each pair once (i < j).
+    Returns (i, j, distances) with 0-based atom indices.
+
+    Atoms are binned into cells at least cutoff wide and only the 27 neighbouring cells are
+    searched, so the cost grows with N instead of N^2. Distances use the minimum image,
+    which requires cutoff <= half the shortest box length.
+    """
+    boxLengths = np.asarray(boxLengths, dtype=np.float64)
+    if cutoff > boxLengths.min() / 2:
+        raise ValueError(f"Cutoff {cutoff} is larger than half the shortest box length {boxLengths.min()}")
+    positions = np.mod(positions, boxLengths)
+
+    cellCounts: np.ndarray = np.maximum((boxLengths // cutoff).astype(np.int64), 1)
+    cellIndices: np.ndarray = np.minimum((positions / boxLengths * cellCounts).astype(np.int64), cellCounts - 1)
+    cellOf: np.ndarray = np.ravel_multi_index(cellIndices.T, cellCounts)
+
+    atomOrder: np.ndarray = np.argsort(cellOf, kind="stable")
+    atomsPerCell: np.ndarray = np.bincount(cellOf, minlength=int(cellCounts.prod()))
+    cellStarts: np.ndarray = np.concatenate(([0], np.cumsum(atomsPerCell)[:-1]))
+
+    # With fewer than 3 cells along an axis, -1 and +1 reach the same cell: keep each shift once
+    axisShifts: list[np.ndarray] = [np.unique(np.array([-1, 0, 1]) % count) for count in cellCounts.tolist()]
+    firstAtoms: list[np.ndarray] = []
+    secondAtoms: list[np.ndarray] = []
+    for shift in np.array(np.meshgrid(*axisShifts, indexing="ij")).reshape(3, -1).T:
+        neighbourCells: np.ndarray = np.ravel_multi_index(((cellIndices + shift) % cellCounts).T, cellCounts)
+        candidateCounts: np.ndarray = atomsPerCell[neighbourCells]
+        first: np.ndarray = np.repeat(np.arange(len(positions)), candidateCounts)
+        rankInCell: np.ndarray = np.arange(len(first)) - np.repeat(np.cumsum(candidateCounts) - candidateCounts, candidateCounts)
+        second: np.ndarray = atomOrder[np.repeat(cellStarts[neighbourCells], candidateCounts) + rankInCell]
+        kept: np.ndarray = first < second
+        firstAtoms.append(first[kept])
+        secondAtoms.append(second[kept])
+
+    i: np.ndarray = np.concatenate(firstAtoms)
+    j: np.ndarray = np.concatenate(secondAtoms)
+    separations: np.ndarray = positions[j] - positions[i]
+    separations -= boxLengths * np.round(separations / boxLengths)
+    distances: np.ndarray = np.linalg.norm(separations, axis=1)
+    withinCutoff: np.ndarray = distances < cutoff
+    return i[withinCutoff], j[withinCutoff], distances[withinCutoff]
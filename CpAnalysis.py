@@ -0,0 +1,143 @@
+import re
+from pathlib import Path
+
+import numpy as np
+
+# Columns of every fix ave/time CSV written by LammpsScriptFactory
+COLUMNS: dict[str, int] = {
+    "TimeStep": 0,
+    "VirtualTime": 1,
+    "CpuTime": 2,
+    "T": 3,
+    "P": 4,
+    "Density": 5,
+    "Volume": 6,
+    "H": 7,
+}
+
+# DataWritingT<temperatureTag>.csv: 250.5 K is written DataWritingT250p5.csv
+CP_FILE_PATTERN: re.Pattern = re.compile(r"DataWritingT(\d+(?:p\d+)?)\.csv$")
+# NPT-<T>K-<P>bar.csv, optionally prefixed by a sweep job name (collected/T300K_...), never by the relaxation job
+NPT_FILE_PATTERN: re.Pattern = re.compile(r"^(?!relax_)(?:[^_]+_)?NPT-(-?[\d.]+)K-(-?[\d.]+)bar\.csv$")
+
+
+def cpFileTemperature(csvPath: Path) -> float:
+    return float(CP_FILE_PATTERN.search(csvPath.name).group(1).replace("p", "."))
+
+
+def loadStageFiles(csvPaths: list[Path]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load every CSV at once into a (nFiles, maxRows, nColumns) array padded with NaN.
+    All numeric lines are joined and converted by a single NumPy call.
+    Returns (data, rowCounts).
+    """
+    dataLines: list[bytes] = []
+    rowCounts: np.ndarray = np.zeros(len(csvPaths), dtype=np.int64)
+    for i, csvPath in enumerate(csvPaths):
+        with open(csvPath, "rb") as file:
+            fileLines: list[bytes] = [line for line in file.read().splitlines() if line.strip() and not line.startswith(b"#")]
+        rowCounts[i] = len(fileLines)
+        dataLines.extend(fileLines)
+
+    if not dataLines:
+        return np.full((len(csvPaths), 0, len(COLUMNS)), np.nan), rowCounts
+    values: np.ndarray = np.array(b" ".join(dataLines).split(), dtype=np.float64).reshape(len(dataLines), -1)
+
+    data: np.ndarray = np.full((len(csvPaths), rowCounts.max(), values.shape[1]), np.nan)
+    rowIndices: np.ndarray = np.arange(rowCounts.max())
+    data[rowIndices < rowCounts[:, None]] = values
+    return data, rowCounts
+
+
+def blockStatistics(values: np.ndarray, mask: np.ndarray, blockCount: int = 5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Block-averaged mean and standard error of every row of values (nSeries, nRows),
+    using only the samples selected by mask. Each series is cut into blockCount equal blocks.
+    Raises ValueError when a series has fewer samples than blocks (an empty block has no mean).
+    """
+    seriesCount: int = values.shape[0]
+    sampleCounts: np.ndarray = mask.sum(axis=1)
+    if (sampleCounts < blockCount).any():
+        raise ValueError(
+            f"{int(sampleCounts.min())} samples left after equilibration for {blockCount} blocks: run longer stages or lower blockCount"
+        )
+    sampleRanks: np.ndarray = np.cumsum(mask, axis=1) - 1
+    blockSizes: np.ndarray = sampleCounts // blockCount
+    blockIndices: np.ndarray = sampleRanks // blockSizes[:, None]
+    used: np.ndarray = mask & (blockIndices < blockCount)
+
+    bins: np.ndarray = (np.arange(seriesCount)[:, None] * blockCount + blockIndices)[used]
+    blockSums: np.ndarray = np.bincount(bins, weights=values[used], minlength=seriesCount * blockCount)
+    blockSamples: np.ndarray = np.bincount(bins, minlength=seriesCount * blockCount)
+    blockMeans: np.ndarray = (blockSums / blockSamples).reshape(seriesCount, blockCount)
+    return blockMeans.mean(axis=1), blockMeans.std(axis=1, ddof=1) / np.sqrt(blockCount)
+
+
+def cpFromMeasurements(
+    directory: str,
+    equilibrationFraction: float = 0.2,
+    blockCount: int = 5,
+) -> np.ndarray:
+    """
+    Cp of every DataWritingT<T>.csv written by MeasureCp/addCpMeasurement in directory.
+    Each file holds two NPT stages of equal length (low then high temperature); the first
+    equilibrationFraction of each stage is dropped.
+    Cp = (<H>high - <H>low) / (<T>high - <T>low), in J/(mol.K) per atom, with block-averaged errors.
+    """
+    csvPaths: list[Path] = sorted(
+        (path for path in Path(directory).glob("*DataWritingT*.csv") if CP_FILE_PATTERN.search(path.name) is not None), key=cpFileTemperature
+    )
+    data, rowCounts = loadStageFiles(csvPaths)
+
+    rowIndices: np.ndarray = np.arange(data.shape[1])[None, :]
+    stageLengths: np.ndarray = (rowCounts // 2)[:, None]
+    skippedRows: np.ndarray = np.ceil(equilibrationFraction * stageLengths).astype(np.int64)
+    lowMask: np.ndarray = (rowIndices >= skippedRows) & (rowIndices < stageLengths)
+    highMask: np.ndarray = (rowIndices >= stageLengths + skippedRows) & (rowIndices < 2 * stageLengths)
+
+    enthalpy: np.ndarray = data[:, :, COLUMNS["H"]]
+    temperature: np.ndarray = data[:, :, COLUMNS["T"]]
+    lowH, lowHError = blockStatistics(enthalpy, lowMask, blockCount)
+    highH, highHError = blockStatistics(enthalpy, highMask, blockCount)
+    lowT, _ = blockStatistics(temperature, lowMask, blockCount)
+    highT, _ = blockStatistics(temperature, highMask, blockCount)
+
+    result: np.ndarray = np.zeros(len(csvPaths), dtype=[("T", "f8"), ("lowT", "f8"), ("highT", "f8"), ("Cp", "f8"), ("CpError", "f8")])
+    result["T"] = [cpFileTemperature(path) for path in csvPaths]
+    result["lowT"] = lowT
+    result["highT"] = highT
+    result["Cp"] = 1000 * (highH - lowH) / (highT - lowT)
+    result["CpError"] = 1000 * np.hypot(highHError, lowHError) / np.abs(highT - lowT)
+    return result
+
+
+def cpFromNptSweep(
+    directory: str,
+    equilibrationFraction: float = 0.2,
+    blockCount: int = 5,
+) -> np.ndarray:
+    """
+    Cp by finite differences between consecutive NPT-<T>K-<P>bar.csv stages at the same pressure.
+    One row per pair of neighbouring temperatures, reported at their mean temperature.
+    Temperatures and pressures may be decimal; the relaxation stage of a TemperatureSweep
+    (collected/relax_NPT-...) is left out.
+    """
+    csvPaths: list[Path] = sorted(
+        (path for path in Path(directory).glob("*NPT-*K-*bar.csv") if NPT_FILE_PATTERN.search(path.name) is not None),
+        key=lambda path: tuple(float(value) for value in NPT_FILE_PATTERN.search(path.name).groups()[::-1]),
+    )
+    data, rowCounts = loadStageFiles(csvPaths)
+
+    rowIndices: np.ndarray = np.arange(data.shape[1])[None, :]
+    mask: np.ndarray = (rowIndices >= np.ceil(equilibrationFraction * rowCounts)[:, None]) & (rowIndices < rowCounts[:, None])
+    meanH, errorH = blockStatistics(data[:, :, COLUMNS["H"]], mask, blockCount)
+    meanT, _ = blockStatistics(data[:, :, COLUMNS["T"]], mask, blockCount)
+    pressures: np.ndarray = np.array([float(NPT_FILE_PATTERN.search(path.name).group(2)) for path in csvPaths])
+
+    samePressure: np.ndarray = pressures[1:] == pressures[:-1]
+    result: np.ndarray = np.zeros(int(samePressure.sum()), dtype=[("T", "f8"), ("P", "f8"), ("Cp", "f8"), ("CpError", "f8")])
+    result["T"] = ((meanT[1:] + meanT[:-1]) / 2)[samePressure]
+    result["P"] = pressures[1:][samePressure]
+    result["Cp"] = (1000 * np.diff(meanH) / np.diff(meanT))[samePressure]
+    result["CpError"] = (1000 * np.hypot(errorH[1:], errorH[:-1]) / np.abs(np.diff(meanT)))[samePressure]
+    return result
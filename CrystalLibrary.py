@@ -0,0 +1,253 @@
+import numpy as np
+
+from LammPy.CrystalStructure import CrystalStructure
+
+# One row per atom of a bundled crystal
+ATOM_ROW_DTYPE: np.dtype = np.dtype([("label", "U16"), ("x", "f8"), ("y", "f8"), ("z", "f8"), ("mol", "i8")])
+
+
+class CrystalEntry:
+    """
+    Bundled crystal cell: description lines, orthogonal box bounds ((xlo, xhi), (ylo, yhi), (zlo, zhi))
+    and one (type label, x, y, z, molecule id) row per atom, in LAMMPS atom id order.
+    Arrays and command text are only built when asked for.
+    """
+
+    def __init__(
+        self,
+        description: tuple[str, ...],
+        boxBounds: tuple[tuple[float, float], ...],
+        atoms: tuple[tuple[str, float, float, float, int], ...],
+    ):
+        self.description: tuple[str, ...] = description
+        self.boxBounds: tuple[tuple[float, float], ...] = boxBounds
+        self.atoms: tuple[tuple[str, float, float, float, int], ...] = atoms
+        self._commands: str | None = None
+
+    def __len__(self) -> int:
+        return len(self.atoms)
+
+    def structure(self) -> CrystalStructure:
+        """A new CrystalStructure of the cell, free to be replicated or modified."""
+        rows: np.ndarray = np.array(list(self.atoms), dtype=ATOM_ROW_DTYPE)
+        return CrystalStructure(
+            typeLabels=rows["label"],
+            positions=np.column_stack((rows["x"], rows["y"], rows["z"])),
+            moleculeIds=rows["mol"],
+            boxBounds=np.array(self.boxBounds),
+        )
+
+    def commands(self) -> str:
+        """create_atoms/set atom/change_box block of the cell for LammpsScriptFactory.loadSystem, generated once."""
+        if self._commands is None:
+            self._commands = "\n" + "".join(f"# {line}\n" for line in self.description) + self.structure().toCommands()
+        return self._commands
+
+
+CRYSTALS: dict[str, CrystalEntry] = {
+    "Water": CrystalEntry(
+        description=(
+            "Water Crystal Conventional Cell (Ice-11)",
+            "Geometry optimized with CASTEP/RSCAN",
+        ),
+        boxBounds=((0.0, 4.3782347866542), (0.0, 7.63902793247404), (0.0, 7.1284790464561)),
+        atoms=(
+            ("H[Water]", -0.8164863157501667, 2.0590504918748076, 1.1638139454665992, 1),
+            ("H[Water]", 1.3726310775769335, 5.878564458111827, 1.1638139454665992, 2),
+            ("H[Water]", 0.8164863157501667, 5.579977440599233, 4.728053468694649, 3),
+            ("H[Water]", 3.005603709077267, 1.7604634743622123, 4.728053468694649, 4),
+            ("H[Water]", -0.8164863157501667, 5.579977440599233, 4.728053468694649, 3),
+            ("H[Water]", 1.3726310775769335, 1.7604634743622123, 4.728053468694649, 4),
+            ("H[Water]", 0.8164863157501667, 2.0590504918748076, 1.1638139454665992, 1),
+            ("H[Water]", 3.005603709077267, 5.878564458111827, 1.1638139454665992, 2),
+            ("O[Water]", 2.1891173933271, 1.2513417109430336, 1.7046670751815933, 5),
+            ("H[Water]", 2.1891173933271, 1.251879965657427, 2.704666930322516, 5),
+            ("H[Water]", 2.1891173933271, 0.30834629735991537, 1.3718613511304354, 5),
+            ("O[Water]", 1.139254000162102e-16, 5.070855677180054, 1.7046670751815933, 6),
+            ("H[Water]", 1.139254000162102e-16, 5.071393931894447, 2.704666930322516, 6),
+            ("H[Water]", 2.2310390836507833e-16, 4.127860263596936, 1.3718613511304354, 6),
+            ("O[Water]", 2.1891173933271, 6.3876862215310055, 5.268906598409643, 7),
+            ("H[Water]", 2.1891173933271, 6.387147966816612, 6.268906453550565, 7),
+            ("H[Water]", 2.1891173933271, 7.330681635114123, 4.936100874358486, 7),
+            ("O[Water]", 4.044351700575464e-16, 2.568172255293986, 5.268906598409643, 8),
+            ("H[Water]", 4.044351700575464e-16, 2.5676340005795923, 6.268906453550565, 8),
+            ("H[Water]", 2.952566617086783e-16, 3.511167668877103, 4.936100874358486, 8),
+            ("O[Water]", -3.009529317094888e-16, 2.5860338814019683, 0.9279468369540018, 1),
+            ("O[Water]", 2.1891173933271, 6.405547847638988, 0.9279468369540018, 2),
+            ("O[Water]", 3.009529317094888e-16, 5.052994051072072, 4.492186360182052, 3),
+            ("O[Water]", 2.1891173933271, 1.2334800848350518, 4.492186360182052, 4),
+        ),
+    ),
+    "Nitric": CrystalEntry(
+        description=(
+            "Nitric Crystal Cell",
+            "Geometry optimized with CASTEP/RSCAN",
+            "Optimization initialized from experimental cell of Allan et al. (2010). The crystal structures of the low-temperature and high-pressure polymorphs of nitric acid. Dalton Trans. Volume Number 39(15), 3736-3743. DOI: https://doi.org/10.1039/B923975H",
+        ),
+        boxBounds=((0.0, 6.13926195142583), (0.0, 8.450672172637), (0.0, 17.2546593119883)),
+        atoms=(
+            ("H[Nitric]", 3.029263056686041, 2.9836161709699334, 17.100567829294825, 1),
+            ("H[Nitric]", 0.03804715133467395, 1.7056730791425403, 15.01854538108791, 2),
+            ("H[Nitric]", 0.0636631874671588, 2.535364722848075, 10.639572013843967, 3),
+            ("H[Nitric]", 2.9651005736290252, 3.8970596076535395, 12.728609113594409, 4),
+            ("H[Nitric]", 3.0787951950782784, 5.418171767274984, 8.767378908803247, 5),
+            ("H[Nitric]", 6.0948992326213265, 6.7253291526893335, 10.87502436815919, 6),
+            ("H[Nitric]", 6.137068490198665, 5.907983889190034, 15.1580133421852, 7),
+            ("H[Nitric]", 3.125567979937462, 8.098870886034726, 13.016345447079084, 8),
+            ("N[Nitric]", 3.009571514361713, 4.842528192835353, 17.215402820811384, 1),
+            ("N[Nitric]", 0.006856172145505774, 3.5675418345220016, 15.058566430128325, 2),
+            ("N[Nitric]", 0.01298790944833865, 0.6812070448843923, 10.808848515133025, 3),
+            ("N[Nitric]", 3.0448737705631927, 2.044547437212355, 12.904609856757746, 4),
+            ("N[Nitric]", 3.11244983760357, 3.560724636469783, 8.633646641234844, 5),
+            ("N[Nitric]", 6.119011905747985, 4.863495133688807, 10.828952739618552, 6),
+            ("N[Nitric]", 6.13215531177211, 7.769052327937299, 15.083641439406255, 7),
+            ("N[Nitric]", 3.0841726879945526, 6.237100783407409, 12.981266739207618, 8),
+            ("O1[Nitric]", 3.7682605314696187, 4.680532733868712, 18.136433352933743, 1),
+            ("O1[Nitric]", 2.562660347037633, 5.857178468743443, 16.74579497539405, 1),
+            ("O2[Nitric]", 2.578464934345625, 3.66098096904876, 16.589045615969436, 1),
+            ("O1[Nitric]", -0.745362724066744, 3.4219910302536336, 15.987006384337612, 2),
+            ("O1[Nitric]", 0.413511884423978, 4.574049679793646, 14.537982113399874, 2),
+            ("O2[Nitric]", 0.4928257106034023, 2.373981867724898, 14.499065733939414, 2),
+            ("O1[Nitric]", -0.7392096026920181, 0.8987866388511214, 11.7231167150881, 3),
+            ("O1[Nitric]", 0.43089944551983383, -0.36222463440125147, 10.37749889499562, 3),
+            ("O2[Nitric]", 0.4739629157552642, 1.8260884569868125, 10.13764940009218, 3),
+            ("O1[Nitric]", 3.7851870466728337, 2.2767153878855075, 13.825571271964298, 4),
+            ("O2[Nitric]", 2.578793224148784, 3.179278122569871, 12.21946561277676, 4),
+            ("O1[Nitric]", 2.6403321489057605, 0.9935888259849293, 12.478488114416864, 4),
+            ("O1[Nitric]", 2.346437196109478, 3.7258663190225927, 7.719259929559632, 5),
+            ("O1[Nitric]", 3.572774977659724, 2.545424151527364, 9.088665030370633, 5),
+            ("O2[Nitric]", 3.535164748437684, 4.7390829020635055, 9.27162272850982, 5),
+            ("O1[Nitric]", 6.876485647257146, 5.009159727692499, 9.904813610257852, 6),
+            ("O1[Nitric]", 5.706578021322649, 3.8568845401602325, 11.344770077758907, 6),
+            ("O2[Nitric]", 5.634863404396803, 6.05709347406878, 11.389948532980938, 6),
+            ("O1[Nitric]", 6.88457795145532, 7.621451035706739, 14.155690339965021, 7),
+            ("O1[Nitric]", 5.681331470675029, 8.775616733970486, 15.56635901904073, 7),
+            ("O2[Nitric]", 5.71344585633327, 6.578353065569369, 15.70066739458119, 7),
+            ("O1[Nitric]", 2.3422512302568004, 6.383721327301792, 12.044143098349691, 8),
+            ("O1[Nitric]", 3.4795935692029425, 5.230103772415533, 13.509825541242375, 8),
+            ("O2[Nitric]", 3.5725365427807265, 7.429494198126892, 13.541563533053269, 8),
+            ("H[Nitric]", 3.109998894739789, -1.2417199153485674, 0.15409148269347506, 9),
+            ("H[Nitric]", 6.101214800091155, 5.93100916546104, 2.2361139309003883, 10),
+            ("H[Nitric]", 6.075598763958672, 6.7607008091665755, 6.615087298144331, 11),
+            ("H[Nitric]", 3.1741613777968047, 8.12239569397204, 4.526050198393888, 12),
+            ("H[Nitric]", 3.0604667563475516, 9.643507853593452, 8.48728040318505, 13),
+            ("H[Nitric]", 0.04436271880450237, 2.4999930663708327, 6.3796349438291085, 14),
+            ("H[Nitric]", 0.0021934612271659946, 1.6826478028715341, 2.0966459698031, 15),
+            ("H[Nitric]", 3.013693971488368, 3.873534799716225, 4.238313864909214, 16),
+            ("N[Nitric]", 3.129690437064117, 0.6171921065168533, 0.03925649117690974, 9),
+            ("N[Nitric]", 6.132405779280325, 7.7928779208405015, 2.196092881859973, 10),
+            ("N[Nitric]", 6.126274041977489, 4.906543131202896, 6.445810796855273, 11),
+            ("N[Nitric]", 3.0943881808626372, 6.269883523530855, 4.350049455230553, 12),
+            ("N[Nitric]", 3.0268121138222597, 7.7860607227882825, 8.621012670753455, 13),
+            ("N[Nitric]", 0.020250045677845985, 0.6381590473703066, 6.425706572369746, 14),
+            ("N[Nitric]", 0.007106639653719005, 3.5437162416187995, 2.171017872582044, 15),
+            ("N[Nitric]", 3.055089263431278, 2.0117646970889087, 4.273392572780682, 16),
+            ("O1[Nitric]", 2.3710014199562113, 0.4551966475502114, -0.8817740409454434, 9),
+            ("O1[Nitric]", 3.5766016043881965, 1.6318423824249424, 0.5088643365942561, 9),
+            ("O2[Nitric]", 3.5607970170802052, -0.5643551172697411, 0.6656136960188622, 9),
+            ("O1[Nitric]", 6.884624675492543, 7.647327116572133, 1.2676529276506878, 10),
+            ("O1[Nitric]", 5.725750067001854, 8.799385766112104, 2.7166771985884264, 10),
+            ("O2[Nitric]", 5.6464362408224265, 6.599317954043398, 2.755593578048884, 10),
+            ("O1[Nitric]", 6.878471554117847, 5.124122725169621, 5.5315425969001994, 11),
+            ("O1[Nitric]", 5.708362505905996, 3.8631114519172463, 6.8771604169926785, 11),
+            ("O2[Nitric]", 5.665299035670568, 6.051424543305313, 7.117009911896119, 11),
+            ("O1[Nitric]", 2.3540749047529963, 6.502051474204007, 3.4290880400240007, 12),
+            ("O2[Nitric]", 3.5604687272770454, 7.404614208888371, 5.035193699211539, 12),
+            ("O1[Nitric]", 3.49892980252007, 5.21892491230343, 4.776171197571435, 12),
+            ("O1[Nitric]", 3.792824755316352, 7.9512024053410935, 9.535399382428666, 13),
+            ("O1[Nitric]", 2.566486973766106, 6.770760237845864, 8.165994281617664, 13),
+            ("O2[Nitric]", 2.604097202988146, 8.964418988381981, 7.983036583478478, 13),
+            ("O1[Nitric]", -0.7372236958313159, 0.7838236413739995, 7.349845701730446, 14),
+            ("O1[Nitric]", 0.4326839301031805, -0.36845154615826714, 5.90988923422939, 14),
+            ("O2[Nitric]", 0.5043985470290253, 1.8317573877502793, 5.864710779007359, 14),
+            ("O1[Nitric]", -0.7453160000294912, 3.396114949388239, 3.0989689720232776, 15),
+            ("O1[Nitric]", 0.4579304807508018, 4.550280647651984, 1.6883002929475648, 15),
+            ("O2[Nitric]", 0.4258160950925607, 2.3530169792508695, 1.5539919174071066, 15),
+            ("O1[Nitric]", 3.79701072116903, 2.158385240983292, 5.210516213638607, 16),
+            ("O1[Nitric]", 2.6596683822228875, 1.0047676860970323, 3.7448337707459247, 16),
+            ("O2[Nitric]", 2.5667254086451035, 3.204158111808391, 3.7130957789350285, 16),
+        ),
+    ),
+    "NAM": CrystalEntry(
+        description=(
+            "Nitric Acid Monohydrate (NAM) Crystal Cell",
+            "Geometry optimized with CASTEP/RSCAN",
+            "Optimization initialized from experimental cell of Lebrun et al. (2001). Kinetic behaviour investigations and crystal structure of nitric acid dihydrate. Acta Cryst B. Volume Number 57(1). 27-35. DOI: https://doi.org/10.1107/S0108768100014506",
+        ),
+        boxBounds=((0.0, 5.5648360078484), (0.0, 8.96188739695653), (0.0, 6.41840583531675)),
+        atoms=(
+            ("H[Hydronium]", 3.7672952833150797, 2.165297947956077, 2.5230642741943523, 1),
+            ("H[Hydronium]", 2.210946378257988, 1.6256462369147173, 2.2449698970246432, 1),
+            ("H[Hydronium]", 2.5289216559868324, 3.251724598985764, 2.327000234935788, 1),
+            ("O[Hydronium]", 2.772683683438196, 2.3370792271013494, 2.737840892108796, 1),
+            ("O[Nitrate]", 1.2373556436491262, 0.4682053237594338, 1.8289338500595516, 2),
+            ("O[Nitrate]", -0.2719562171773933, 1.9609015450450593, 2.392228573831209, 2),
+            ("O[Nitrate]", -0.8889343306425594, 0.0814328733148276, 1.4380757980717076, 2),
+            ("N[Nitrate]", 0.025412139066260747, 0.8364755602798499, 1.8871916786545018, 2),
+            ("H[Hydronium]", 0.9848772793908797, 6.796589449000454, 3.8953415611223976, 3),
+            ("H[Hydronium]", -0.571471625666212, 7.336241160041813, 4.173435938292107, 3),
+            ("H[Hydronium]", -0.2534963479373675, 5.710162797970766, 4.091405600380962, 3),
+            ("O[Hydronium]", -0.00973432048600388, 6.624808169855181, 3.680564943207954, 3),
+            ("O[Nitrate]", 4.009212238606976, 8.453816866921978, 4.571465820499312, 4),
+            ("O[Nitrate]", 2.4999003777804556, 6.961120645636354, 4.008171096727655, 4),
+            ("O[Nitrate]", 1.8829222643152848, 8.840589317366584, 4.962323872487156, 4),
+            ("N[Nitrate]", 2.797268734024108, 8.085546630401563, 4.513207991904362, 4),
+            ("H[Hydronium]", 3.7672952833150797, 2.3156457505221884, 5.732267191852728, 5),
+            ("H[Hydronium]", 2.210946378257988, 2.855297461563548, 5.454172814683018, 5),
+            ("H[Hydronium]", 2.5289216559868324, 1.2292190994925012, 5.5362031525941635, 5),
+            ("O[Hydronium]", 2.772683683438196, 2.143864471376916, 5.947043809767171, 5),
+            ("O[Nitrate]", 1.2373556436491262, 4.012738374718831, 5.038136767717926, 6),
+            ("O[Nitrate]", -0.27195621717739166, 2.5200421534331974, 5.601431491489584, 6),
+            ("O[Nitrate]", -0.8889343306425594, 4.399510825163436, 4.647278715730082, 6),
+            ("N[Nitrate]", 0.025412139066261302, 3.644468138198415, 5.0963945963128765, 6),
+            ("H[Hydronium]", 0.9848772793908797, 6.646241646434342, 0.6861386434640226, 7),
+            ("H[Hydronium]", -0.571471625666212, 6.106589935392983, 0.964233020633732, 7),
+            ("H[Hydronium]", -0.2534963479373675, 7.73266829746403, 0.8822026827225865, 7),
+            ("O[Hydronium]", -0.00973432048600388, 6.818022925579615, 0.47136202554957785, 7),
+            ("O[Nitrate]", 4.019773647573326, 4.949149022237709, 1.3802690675988236, 8),
+            ("O[Nitrate]", 2.5104617867468058, 6.441845243523334, 0.8169743438271657, 8),
+            ("O[Nitrate]", 1.8934836732816347, 4.562376571793094, 1.7711271195866671, 8),
+            ("N[Nitrate]", 2.8078301429904635, 5.3174192587581155, 1.3220112390038732, 8),
+        ),
+    ),
+    "NAMExperimental": CrystalEntry(
+        description=(
+            "Nitric Acid Monohydrate (NAM) experimental cell, fractional coordinates of Lebrun et al. (2001) scaled by the cell lengths",
+        ),
+        boxBounds=((0.0, 5.5648), (0.0, 8.9619), (0.0, 6.4184)),
+        atoms=(
+            ("H[Hydronium]", 3.7672583040000003, 2.165284659, 2.52307304, 1),
+            ("H[Hydronium]", 2.210950688, 1.62568866, 2.2449637680000003, 1),
+            ("H[Hydronium]", 2.5289233600000003, 3.2517357959999997, 2.32699092, 1),
+            ("O[Hydronium]", 2.7726616, 2.337084282, 2.737832704, 1),
+            ("O[Nitrate]", 1.280349184, 0.455085282, 1.8269333760000002, 2),
+            ("O[Nitrate]", -0.282524896, 2.000744175, 2.4102375680000003, 2),
+            ("O[Nitrate]", -0.921363936, 0.054577970999999996, 1.422189072, 2),
+            ("N[Nitrate]", 0.025431136, 0.836414127, 1.8872663360000002, 2),
+            ("H[Hydronium]", 0.984858304, 6.796615341, 3.8953269600000002, 3),
+            ("H[Hydronium]", -0.571449312, 7.33621134, 4.173436232, 3),
+            ("H[Hydronium]", -0.25347664, 5.710164204, 4.09140908, 3),
+            ("O[Hydronium]", -0.0097384, 6.624815718, 3.6805672959999995, 3),
+            ("O[Nitrate]", 4.062749183999999, 8.506814718, 4.591466624, 4),
+            ("O[Nitrate]", 2.499875104, 6.9611558250000005, 4.008162432000001, 4),
+            ("O[Nitrate]", 1.861036064, 8.907322029, 4.996210928, 4),
+            ("N[Nitrate]", 2.807831136, 8.125485873, 4.531133664, 4),
+            ("H[Hydronium]", 3.7672583040000003, 2.315665341, 5.73227304, 5),
+            ("H[Hydronium]", 2.210950688, 2.8552613399999998, 5.454163768, 5),
+            ("H[Hydronium]", 2.5289233600000003, 1.229214204, 5.53619092, 5),
+            ("O[Hydronium]", 2.7726616, 2.143865718, 5.947032704000001, 5),
+            ("O[Nitrate]", 1.280349184, 4.025864718, 5.036133376, 6),
+            ("O[Nitrate]", -0.282524896, 2.480205825, 5.6194375679999995, 6),
+            ("O[Nitrate]", -0.921363936, 4.426372029, 4.631389072, 6),
+            ("N[Nitrate]", 0.025431136, 3.6445358729999997, 5.096466336, 6),
+            ("H[Hydronium]", 0.984858304, 6.646234659, 0.68612696, 7),
+            ("H[Hydronium]", -0.571449312, 6.10663866, 0.9642362320000001, 7),
+            ("H[Hydronium]", -0.25347664, 7.732685796, 0.88220908, 7),
+            ("O[Hydronium]", -0.0097384, 6.818034282, 0.47136729600000005, 7),
+            ("O[Nitrate]", 4.062749183999999, 4.936035282000001, 1.3822666239999999, 8),
+            ("O[Nitrate]", 2.499875104, 6.4816941749999994, 0.798962432, 8),
+            ("O[Nitrate]", 1.861036064, 4.5355279710000005, 1.787010928, 8),
+            ("N[Nitrate]", 2.807831136, 5.317364127, 1.3219336640000001, 8),
+        ),
+    ),
+}
@@ -0,0 +1,82 @@
+import numpy as np
+
+from LammPy.Topology import moleculeKindOf
+from LammPy.TrajectoryReader import TrajectoryReader
+
+# 1 A^2/fs = 1e-20 m^2 / 1e-15 s
+SQUARE_ANGSTROM_PER_FS: float = 1e-5
+
+
+def meanSquareDisplacement(positions: np.ndarray) -> np.ndarray:
+    """
+    MSD(lag) averaged over every time origin and particle, for unwrapped positions (nFrames, nParticles, 3).
+    MSD(m) = S1(m) - 2 S2(m), where S2 is the position autocorrelation computed by FFT,
+    so the cost is O(T log T) per particle instead of O(T^2).
+    """
+    frameCount: int = positions.shape[0]
+    squares: np.ndarray = (positions**2).sum(axis=2)
+    # S1(m) = 1/(T-m) sum_k r(k)^2 + r(k+m)^2, built from running sums of the squares
+    paddedSquares: np.ndarray = np.concatenate((squares, np.zeros((1, squares.shape[1]))))
+    doubledSum: float | np.ndarray = 2 * squares.sum(axis=0)
+    s1: np.ndarray = np.zeros(squares.shape)
+    for lag in range(frameCount):
+        doubledSum = doubledSum - paddedSquares[lag - 1] - paddedSquares[frameCount - lag]
+        s1[lag] = doubledSum / (frameCount - lag)
+
+    spectrum: np.ndarray = np.fft.rfft(positions, n=2 * frameCount, axis=0)
+    autocorrelation: np.ndarray = np.fft.irfft(spectrum * spectrum.conj(), axis=0)[:frameCount].sum(axis=2)
+    s2: np.ndarray = autocorrelation / (frameCount - np.arange(frameCount))[:, None]
+    return (s1 - 2 * s2).mean(axis=1)
+
+
+def centersOfMass(positions: np.ndarray, masses: np.ndarray, moleculeIds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(nMolecules, 3) centers of mass of positions (nAtoms, 3), molecules in increasing id order. Returns (ids, centers)."""
+    uniqueIds, moleculeIndices = np.unique(moleculeIds, return_inverse=True)
+    totalMasses: np.ndarray = np.bincount(moleculeIndices, weights=masses)
+    centers: np.ndarray = np.column_stack([np.bincount(moleculeIndices, weights=masses * positions[:, axis]) for axis in range(3)])
+    return uniqueIds, centers / totalMasses[:, None]
+
+
+def diffusionCoefficients(
+    trajectoryPath: str,
+    labelAtoms: dict[int, str],
+    timestepFs: float,
+    kinds: tuple[str, ...] = ("Water", "Hydronium", "Nitrate"),
+    fitRange: tuple[float, float] = (0.1, 0.5),
+) -> np.ndarray:
+    """
+    Self-diffusion coefficient of the molecule centers of mass of every kind, from a dump written
+    with LammpsScriptFactory.setUnwrappedTrajectoryDump (columns id mol type mass xu yu zu, sorted by id).
+    Molecule ids are the ones assigned by loadSystem/getCrystal; the kind of a molecule is the bracket
+    of its type labels ('O[Water]' -> 'Water').
+    D = slope / 6 of a linear fit of the MSD over the fitRange fraction of the lag times, in m^2/s.
+    """
+    with TrajectoryReader(trajectoryPath) as reader:
+        for column in ("mol", "type", "mass"):
+            if column not in reader.columns:
+                raise ValueError(f"{trajectoryPath} has no {column} column: use setUnwrappedTrajectoryDump")
+        firstFrame: np.ndarray = reader[0]
+        moleculeIds: np.ndarray = firstFrame[:, reader.columns.index("mol")].astype(np.int64)
+        masses: np.ndarray = firstFrame[:, reader.columns.index("mass")]
+        typeLabels: np.ndarray = np.array([labelAtoms[typeId] for typeId in firstFrame[:, reader.columns.index("type")].astype(np.int64).tolist()])
+
+        _, moleculeKindIndex = np.unique(moleculeIds, return_index=True)
+        moleculeKinds: np.ndarray = moleculeKindOf(typeLabels[moleculeKindIndex])
+        # Only the (nFrames, nMolecules, 3) centers of mass are kept in memory
+        centers: np.ndarray = np.stack([centersOfMass(reader.positions(frame), masses, moleculeIds)[1] for frame in range(len(reader))])
+        times: np.ndarray = (reader.timesteps - reader.timesteps[0]) * timestepFs
+
+    firstLag: int = max(1, int(fitRange[0] * len(times)))
+    lastLag: int = max(firstLag + 2, int(fitRange[1] * len(times)))
+    result: np.ndarray = np.zeros(len(kinds), dtype=[("kind", "U16"), ("molecules", "i8"), ("D", "f8")])
+    result["kind"] = kinds
+    for row, kind in enumerate(kinds):
+        selected: np.ndarray = moleculeKinds == kind
+        result["molecules"][row] = selected.sum()
+        if not selected.any() or len(times) < 3:
+            result["D"][row] = np.nan
+            continue
+        msd: np.ndarray = meanSquareDisplacement(centers[:, selected])
+        slope: float = np.polyfit(times[firstLag:lastLag], msd[firstLag:lastLag], 1)[0]
+        result["D"][row] = slope / 6 * SQUARE_ANGSTROM_PER_FS
+    return result
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def statisticalInefficiency(series: np.ndarray) -> float:
+    """
+    g = 1 + 2 sum_t (1 - t/N) C(t), the number of correlated samples worth one independent sample.
+    The normalised autocorrelation C is computed by FFT and summed up to its first negative value.
+    """
+    sampleCount: int = len(series)
+    fluctuations: np.ndarray = series - series.mean()
+    variance: float = float(fluctuations @ fluctuations) / sampleCount
+    if sampleCount < 3 or variance == 0:
+        return 1.0
+    spectrum: np.ndarray = np.fft.rfft(fluctuations, n=2 * sampleCount)
+    lags: np.ndarray = np.arange(1, sampleCount)
+    correlation: np.ndarray = np.fft.irfft(spectrum * spectrum.conj())[1:sampleCount] / (sampleCount - lags) / variance
+    negativeLags: np.ndarray = np.flatnonzero(correlation <= 0)
+    lastLag: int = negativeLags[0] if len(negativeLags) else sampleCount - 1
+    return max(1.0, 1 + 2 * float(((1 - lags[:lastLag] / sampleCount) * correlation[:lastLag]).sum()))
+
+
+def detectEquilibration(series: np.ndarray, candidateCount: int = 50) -> tuple[int, float, float]:
+    """
+    Start of the equilibrated region: the origin t0 maximising the number of effective samples
+    (N - t0) / g(t0), tried on candidateCount origins over the first half of the series.
+    Returns (t0, g, effective sample count).
+    """
+    origins: np.ndarray = np.unique(np.linspace(0, len(series) // 2, candidateCount).astype(np.int64))
+    inefficiencies: np.ndarray = np.array([statisticalInefficiency(series[origin:]) for origin in origins.tolist()])
+    effectiveSamples: np.ndarray = (len(series) - origins) / inefficiencies
+    best: int = int(np.argmax(effectiveSamples))
+    return int(origins[best]), float(inefficiencies[best]), float(effectiveSamples[best])
+
+
+def equilibratedMean(series: np.ndarray) -> tuple[float, float, int]:
+    """Mean and standard error of the equilibrated part of series. Returns (mean, standard error, t0)."""
+    origin, _, effectiveSamples = detectEquilibration(series)
+    production: np.ndarray = series[origin:]
+    return float(production.mean()), float(production.std() / np.sqrt(max(effectiveSamples - 1, 1))), origin
+
+
+class ConvergenceCriterion:
+    """
+    Stop rule of an adaptive stage: after minDurationPs, stop as soon as every observable of
+    tolerances (field of the LammpsRunner samples -> target standard error, in the CSV units)
+    has an equilibrated mean known to that precision from at least minEffectiveSamples
+    independent samples. maxDurationPs is the length written in the script.
+    """
+
+    def __init__(
+        self,
+        minDurationPs: float,
+        maxDurationPs: float,
+        tolerances: dict[str, float] | None = None,
+        minEffectiveSamples: int = 20,
+    ):
+        if minDurationPs > maxDurationPs:
+            raise ValueError("minDurationPs must not exceed maxDurationPs")
+        self.minDurationPs: float = minDurationPs
+        self.maxDurationPs: float = maxDurationPs
+        self.tolerances: dict[str, float] = {"H": 0.01, "Density": 0.001} if tolerances is None else tolerances
+        self.minEffectiveSamples: int = minEffectiveSamples
+
+    def isConverged(self, samples: np.ndarray, elapsedPs: float) -> bool:
+        if elapsedPs < self.minDurationPs:
+            return False
+        for field, tolerance in self.tolerances.items():
+            origin, _, effectiveSamples = detectEquilibration(samples[field])
+            if effectiveSamples < self.minEffectiveSamples:
+                return False
+            production: np.ndarray = samples[field][origin:]
+            if production.std() / np.sqrt(effectiveSamples - 1) > tolerance:
+                return False
+        return True
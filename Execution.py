@@ -0,0 +1,177 @@
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from LammPy.Equilibration import ConvergenceCriterion
+from LammPy.LammpsScriptBuilder import LammpsScriptFactory, ProtocolStage
+from LammPy.Telemetry import ThermoRingBuffer
+
+RUN_PATTERN: re.Pattern = re.compile(r"^\s*run\s+(\S+)\s*(?:#(.*))?$")
+
+# Equal-style variables defined by the thermo block of every factory script, with their field names
+OBSERVABLES: dict[str, str] = {
+    "sim_time": "Time",
+    "T": "T",
+    "P": "P",
+    "d": "Density",
+    "Vol": "Volume",
+    "H": "H",
+}
+
+
+def logicalCommands(script: str) -> list[str]:
+    """Split a LAMMPS script into single commands, joining the lines continued with '&'."""
+    commands: list[str] = []
+    pending: str = ""
+    for line in script.splitlines():
+        stripped: str = line.strip()
+        if stripped.endswith("&"):
+            pending += stripped[:-1] + " "
+            continue
+        command: str = (pending + stripped).strip()
+        pending = ""
+        if command and not command.startswith("#"):
+            commands.append(command)
+    return commands
+
+
+class LammpsRunner:
+    """
+    Runs a factory script inside the Python process through the LAMMPS library (import lammps).
+
+    Every command between two runs is sent as one commands_list batch. Each run is split into
+    chunks of sampleEverySteps steps (start/stop keep temperature ramps intact) and after each
+    chunk the thermo variables of OBSERVABLES are read with extract_variable, so stage
+    observables land in NumPy arrays without going through the CSV files.
+    Every sample is also pushed to the telemetry ring buffer, whose callbacks may stop a run early.
+    Runs of adaptive stages (ProtocolStage.convergence) stop as soon as their criterion is met;
+    stageReports records how long each of them ran and the time saved on its maximum duration.
+    A serial, CPU-only LAMMPS build is enough.
+    """
+
+    def __init__(
+        self,
+        factory: LammpsScriptFactory,
+        sampleEverySteps: int = 100,
+        lammpsArguments: list[str] | None = None,
+        telemetryCapacity: int = 1000,
+    ):
+        self.factory: LammpsScriptFactory = factory
+        self.sampleEverySteps: int = sampleEverySteps
+        self.lammpsArguments: list[str] = ["-screen", "none", "-nocite"] if lammpsArguments is None else lammpsArguments
+        self.telemetry: ThermoRingBuffer = ThermoRingBuffer(list(OBSERVABLES.values()), capacity=telemetryCapacity)
+        self.runs: list[tuple[str, np.ndarray]] = []
+        self.stageReports: list[dict] = []
+        self.lmp = None
+
+    @property
+    def timeSavedPs(self) -> float:
+        return sum(report["savedPs"] for report in self.stageReports)
+
+    def startJobAtPath(self, finalScriptPath: str) -> Future:
+        """
+        runJobAtPath on a background thread, so that the caller can iterate over telemetry.follow().
+        future.result() returns the runs, or re-raises the exception that stopped the job.
+        """
+        self.telemetry.closed = False
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1)
+        jobFuture: Future = executor.submit(self.runJobAtPath, finalScriptPath)
+        # Also ends follow() when the job fails before its run loop (missing lammps module, build error)
+        jobFuture.add_done_callback(lambda _: self.telemetry.close())
+        executor.shutdown(wait=False)
+        return jobFuture
+
+    def runJobAtPath(self, finalScriptPath: str) -> list[tuple[str, np.ndarray]]:
+        """
+        Build the job like buildJobAtPath, then execute it from its directory, which LAMMPS enters with
+        shell cd (the relative output, data and restart paths of the script depend on it). The log goes
+        to an absolute path; shell cd changes the working directory of the whole process for the
+        length of the job, so the caller's own relative paths should not be used meanwhile.
+        Returns one (run comment, observables) pair per run command, observables being a structured
+        array with a step field and one field per OBSERVABLES entry, sampled every sampleEverySteps.
+        """
+        # Imported here so that building scripts never requires the LAMMPS Python module
+        from lammps import lammps
+
+        self.factory.buildJobAtPath(finalScriptPath)
+        scriptPath: Path = Path(finalScriptPath).resolve()
+        with open(scriptPath) as file:
+            commands: list[str] = logicalCommands(file.read())
+        # Stage of every run command of the script, in order: run comments can repeat between stages
+        runStages: list[ProtocolStage] = [
+            stage
+            for stage in self.factory.fixes[self.factory.resumeStage :]
+            for stageCommand in logicalCommands(stage.commands)
+            if RUN_PATTERN.match(stageCommand) is not None
+        ]
+        if len(runStages) != sum(RUN_PATTERN.match(command) is not None for command in commands):
+            raise ValueError(f"{scriptPath.name}: its run commands do not match the stages of the factory")
+
+        self.telemetry.closed = False
+        previousDirectory: str = os.getcwd()
+        self.lmp = lammps(cmdargs=self.lammpsArguments + ["-log", (scriptPath.parent / "log.lammps").as_posix()])
+        try:
+            self.runs = []
+            self.stageReports = []
+            batch: list[str] = [f'shell cd "{scriptPath.parent.as_posix()}"']
+            for command in commands:
+                runMatch: re.Match | None = RUN_PATTERN.match(command)
+                if runMatch is None:
+                    batch.append(command)
+                    continue
+                self.lmp.commands_list(batch)
+                batch = []
+                comment: str = runMatch.group(2) or ""
+                stage: ProtocolStage = runStages[len(self.runs)]
+                samples: np.ndarray = self._sampledRun(runMatch.group(1), stage.convergence)
+                self.runs.append((comment, samples))
+                if stage.convergence is not None:
+                    ranPs: float = self._elapsedPs
+                    self.stageReports.append(
+                        {"name": stage.name, "ranPs": ranPs, "maxPs": stage.convergence.maxDurationPs, "savedPs": stage.convergence.maxDurationPs - ranPs}
+                    )
+            self.lmp.commands_list(batch)
+        finally:
+            try:
+                self.lmp.command(f'shell cd "{Path(previousDirectory).as_posix()}"')
+            except Exception:
+                # LAMMPS left in an error state: restore directly, so the first error is the one re-raised
+                os.chdir(previousDirectory)
+            try:
+                self.lmp.close()
+            finally:
+                self.lmp = None
+                self.telemetry.close()
+        return self.runs
+
+    def _evaluate(self, expression: str) -> float:
+        # $(...) immediate expressions are evaluated by LAMMPS itself through an equal-style variable
+        self.lmp.command(f"variable LammPyValue equal {expression.removeprefix('$(').removesuffix(')')}")
+        return self.lmp.extract_variable("LammPyValue")
+
+    def _sampledRun(self, stepsExpression: str, convergence: ConvergenceCriterion | None = None) -> np.ndarray:
+        totalSteps: int = int(round(self._evaluate(stepsExpression)))
+        firstStep: int = int(self.lmp.get_thermo("step"))
+        lastStep: int = firstStep + totalSteps
+        chunkEnds: list[int] = list(range(firstStep + self.sampleEverySteps, lastStep, self.sampleEverySteps)) + [lastStep]
+
+        samples: np.ndarray = np.zeros(len(chunkEnds), dtype=[("step", "i8")] + [(field, "f8") for field in OBSERVABLES.values()])
+        currentStep: int = firstStep
+        for index, chunkEnd in enumerate(chunkEnds):
+            setup: str = "pre yes" if index == 0 else "pre no"
+            finish: str = "post yes" if chunkEnd == lastStep else "post no"
+            self.lmp.command(f"run {chunkEnd - currentStep} start {firstStep} stop {lastStep} {setup} {finish}")
+            currentStep = chunkEnd
+            self._elapsedPs: float = (chunkEnd - firstStep) * self.factory.timestep / 1000
+            samples["step"][index] = chunkEnd
+            for variableName, field in OBSERVABLES.items():
+                samples[field][index] = self.lmp.extract_variable(variableName)
+            if self.telemetry.append((len(self.runs),) + samples[index].item()):
+                # Stopped by a telemetry callback: the next stage starts from the current step
+                return samples[: index + 1]
+            if convergence is not None and chunkEnd < lastStep and convergence.isConverged(samples[: index + 1], self._elapsedPs):
+                return samples[: index + 1]
+        return samples
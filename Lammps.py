@@ -1,6 +1,7 @@
 import os
 
 from lammps import PyLammps
+from LammPy.CrystalLibrary import CRYSTALS
 from LammPy.XSDtoLMP import getCrystal
 
 
@@ -92,91 +93,8 @@ angle_coeff HOH[Hydronium]  113.0
 angle_coeff ONO[Nitrate]    120.0
 """
 
-NitricAcidMonohydrateAtoms: str = """
-    variable x equal 5.5648
-    variable y equal 8.9619
-    variable z equal 6.4184
-
-    create_atoms H[Hydronium] single $(0.67698*v_x) $(0.24161*v_y) $(0.39310*v_z) remap yes #H1
-    create_atoms H[Hydronium] single $(0.39731*v_x) $(0.18140*v_y) $(0.34977*v_z) remap yes #H2
-    create_atoms H[Hydronium] single $(0.45445*v_x) $(0.36284*v_y) $(0.36255*v_z) remap yes #H3
-    create_atoms O[Hydronium] single $(0.49825*v_x) $(0.26078*v_y) $(0.42656*v_z) remap yes #O4
-
-    set atom 1 mol 1
-    set atom 2 mol 1
-    set atom 3 mol 1
-    set atom 4 mol 1
-
-    create_atoms O[Nitrate] single $(0.23008*v_x) $(0.05078*v_y) $(0.28464*v_z) remap yes #O5
-    create_atoms O[Nitrate] single $(-0.05077*v_x) $(0.22325*v_y) $(0.37552*v_z) remap yes #O6
-    create_atoms O[Nitrate] single $(-0.16557*v_x) $(0.00609*v_y) $(0.22158*v_z) remap yes #O7
-    create_atoms N[Nitrate] single $(0.00457*v_x) $(0.09333*v_y) $(0.29404*v_z) remap yes #N8
-
-    set atom 5 mol 2
-    set atom 6 mol 2
-    set atom 7 mol 2
-    set atom 8 mol 2
-
-    create_atoms H[Hydronium] single $(0.17698*v_x) $(0.75839*v_y) $(0.60690*v_z) remap yes #H9
-    create_atoms H[Hydronium] single $(-0.10269*v_x) $(0.81860*v_y) $(0.65023*v_z) remap yes #H10
-    create_atoms H[Hydronium] single $(-0.04555*v_x) $(0.63716*v_y) $(0.63745*v_z) remap yes #H11
-    create_atoms O[Hydronium] single $(-0.00175*v_x) $(0.73922*v_y) $(0.57344*v_z) remap yes #O12
-
-    set atom 9 mol 3
-    set atom 10 mol 3
-    set atom 11 mol 3
-    set atom 12 mol 3
-
-    create_atoms O[Nitrate] single $(0.73008*v_x) $(0.94922*v_y) $(0.71536*v_z) remap yes #O13
-    create_atoms O[Nitrate] single $(0.44923*v_x) $(0.77675*v_y) $(0.62448*v_z) remap yes #O14
-    create_atoms O[Nitrate] single $(0.33443*v_x) $(0.99391*v_y) $(0.77842*v_z) remap yes #O15
-    create_atoms N[Nitrate] single $(0.50457*v_x) $(0.90667*v_y) $(0.70596*v_z) remap yes #N16
-
-    set atom 13 mol 4
-    set atom 14 mol 4
-    set atom 15 mol 4
-    set atom 16 mol 4
-
-    create_atoms H[Hydronium] single $(0.67698*v_x) $(0.25839*v_y) $(0.89310*v_z) remap yes #H17
-    create_atoms H[Hydronium] single $(0.39731*v_x) $(0.31860*v_y) $(0.84977*v_z) remap yes #H18
-    create_atoms H[Hydronium] single $(0.45445*v_x) $(0.13716*v_y) $(0.86255*v_z) remap yes #H19
-    create_atoms O[Hydronium] single $(0.49825*v_x) $(0.23922*v_y) $(0.92656*v_z) remap yes #O20
-
-    set atom 17 mol 5
-    set atom 18 mol 5
-    set atom 19 mol 5
-    set atom 20 mol 5
-
-    create_atoms O[Nitrate] single $(0.23008*v_x) $(0.44922*v_y) $(0.78464*v_z) remap yes #O21
-    create_atoms O[Nitrate] single $(-0.05077*v_x) $(0.27675*v_y) $(0.87552*v_z) remap yes #O22
-    create_atoms O[Nitrate] single $(-0.16557*v_x) $(0.49391*v_y) $(0.72158*v_z) remap yes #O23
-    create_atoms N[Nitrate] single $(0.00457*v_x) $(0.40667*v_y) $(0.79404*v_z) remap yes #N24
-
-    set atom 21 mol 6
-    set atom 22 mol 6
-    set atom 23 mol 6
-    set atom 24 mol 6
-
-    create_atoms H[Hydronium] single $(0.17698*v_x) $(0.74161*v_y) $(0.10690*v_z) remap yes #H25
-    create_atoms H[Hydronium] single $(-0.10269*v_x) $(0.68140*v_y) $(0.15023*v_z) remap yes #H26
-    create_atoms H[Hydronium] single $(-0.04555*v_x) $(0.86284*v_y) $(0.13745*v_z) remap yes #H27
-    create_atoms O[Hydronium] single $(-0.00175*v_x) $(0.76078*v_y) $(0.07344*v_z) remap yes #O28
-
-    set atom 25 mol 7
-    set atom 26 mol 7
-    set atom 27 mol 7
-    set atom 28 mol 7
-
-    create_atoms O[Nitrate] single $(0.73008*v_x) $(0.55078*v_y) $(0.21536*v_z) remap yes #O29
-    create_atoms O[Nitrate] single $(0.44923*v_x) $(0.72325*v_y) $(0.12448*v_z) remap yes #O30
-    create_atoms O[Nitrate] single $(0.33443*v_x) $(0.50609*v_y) $(0.27842*v_z) remap yes #O31
-    create_atoms N[Nitrate] single $(0.50457*v_x) $(0.59333*v_y) $(0.20596*v_z) remap yes #N32
-
-    set atom 29 mol 8
-    set atom 30 mol 8
-    set atom 31 mol 8
-    set atom 32 mol 8
-
+# Groups, charges, bonds and supercell of the experimental NAM cell (CrystalLibrary.CRYSTALS["NAMExperimental"])
+NitricAcidMonohydrateSetup: str = """
     group NitrateNitrogenAtoms type 7
     group NitrateOxygenAtoms type 8
     group HydroniumHydrogenAtoms type 9
@@ -190,8 +108,6 @@ NitricAcidMonohydrateAtoms: str = """
     create_bonds many NitrateNitrogenAtoms NitrateOxygenAtoms 4 1.3 1.4
     create_bonds many HydroniumOxygenAtoms HydroniumHydrogenAtoms 5 0.98 1.1
 
-    change_box all x final 0 $x y final 0 $y z final 0 $z
-
     replicate 10 6 5
 
     group HNO3 type 1 2 3 4
@@ -200,6 +116,14 @@ NitricAcidMonohydrateAtoms: str = """
     group H3O type 9 10
 """
 
+
+def __getattr__(name: str) -> str:
+    # NitricAcidMonohydrateAtoms is generated from the crystal library on first access
+    if name == "NitricAcidMonohydrateAtoms":
+        return CRYSTALS["NAMExperimental"].commands() + NitricAcidMonohydrateSetup
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 ThermoVariables: str = """
 variable H equal 4.184*enthalpy
 variable Ec equal 4.184*ke
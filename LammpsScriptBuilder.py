@@ -1,6 +1,88 @@
+import json
+import os
 from io import StringIO
+from pathlib import Path
 from random import randint
 
+import numpy as np
+
+from LammPy.CrystalLibrary import CRYSTALS
+from LammPy.CrystalStructure import CrystalStructure
+from LammPy.Equilibration import ConvergenceCriterion
+from LammPy.Packing import moleculeGeometries
+from LammPy.Topology import MOLECULE_TEMPLATES, MoleculeTemplate, moleculeKindOf
+
+
+def countDataRows(csvFilePath: Path) -> int:
+    """Rows written by fix ave/time (comment lines excluded); 0 when the file does not exist."""
+    if not csvFilePath.exists():
+        return 0
+    with open(csvFilePath, "rb") as file:
+        return sum(1 for line in file if line.strip() and not line.startswith(b"#"))
+
+
+def temperatureTag(TempK: float) -> str:
+    """Temperature for fix IDs and file names, without truncation: 250 -> "250", 250.5 -> "250p5"."""
+    return f"{TempK:g}".replace(".", "p")
+
+
+class ProtocolStage:
+    """
+    One protocol block (fixes, runs, unfixes) with the CSV file it fills in the output directory.
+    A stage with a convergence criterion is written at its maximum duration; LammpsRunner stops it earlier once converged.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        commands: str,
+        durationPs: float = 0,
+        csvFileName: str | None = None,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
+        convergence: ConvergenceCriterion | None = None,
+    ):
+        self.name: str = name
+        self.commands: str = commands
+        self.durationPs: float = durationPs
+        self.csvFileName: str | None = csvFileName
+        self.production: bool = production
+        self.dumpEverySteps: int | None = dumpEverySteps
+        self.convergence: ConvergenceCriterion | None = convergence
+
+    def __str__(self) -> str:
+        return self.commands
+
+    def expectedRows(self, timestepFs: float) -> int:
+        # fix ave/time ... 1 100 100 writes one row every 100 steps
+        return int(round(1000 * self.durationPs / timestepFs)) // 100
+
+
+# package command (threads filled in) and suffix of every CPU accelerator package
+ACCELERATORS: dict[str, tuple[str, str]] = {
+    "omp": ("package omp {threads}", "omp"),
+    "intel": ("package intel 0 omp {threads} mode mixed", "intel"),
+}
+
+# Constraint modes of setConstraints, and the bond/angle labels held by fix shake/rattle
+CONSTRAINT_MODES: tuple[str, ...] = ("rigid", "shake", "rattle")
+CONSTRAINED_BONDS: tuple[str, ...] = ("OH[Water]",)
+CONSTRAINED_ANGLES: tuple[str, ...] = ("HOH[Water]",)
+
+# Below this many atoms per MPI rank, ghost-atom communication outweighs the pair work
+MIN_ATOMS_PER_RANK: int = 2000
+
+# LAMMPS dump style and file name suffix for every trajectory format
+DUMP_FORMATS: dict[str, tuple[str, str]] = {
+    "xyz": ("xyz", "xyz"),
+    "xyz/gz": ("xyz/gz", "xyz.gz"),
+    "atom": ("atom", "lammpstrj"),
+    "atom/gz": ("atom/gz", "lammpstrj.gz"),
+    "custom": ("custom", "lammpstrj"),
+    "custom/gz": ("custom/gz", "lammpstrj.gz"),
+    "binary": ("custom", "bin"),
+}
+
 
 class LammpsScriptFactory:
     labelAtoms = {
@@ -31,6 +113,18 @@ class LammpsScriptFactory:
         6: "ONO[Nitrate]",
         7: "HOH[Hydronium]",
     }
+    chargeAtoms = {
+        "H[Nitric]": 0.497,
+        "N[Nitric]": 0.964,
+        "O1[Nitric]": -0.445,
+        "O2[Nitric]": -0.571,
+        "O[Water]": -0.8476,
+        "H[Water]": 0.4238,
+        "N[Nitrate]": 0.65,
+        "O[Nitrate]": -0.55,
+        "H[Hydronium]": 0.578,
+        "O[Hydronium]": -0.734,
+    }
 
     @property
     def rng(self):
@@ -42,6 +136,20 @@ class LammpsScriptFactory:
         self.timestep: float = 0.5
         self.atomStyle: str = "full"
         self.pairStyle: str = "lj/cut/coul/wolf 0.2 10"
+        self.kspaceStyle: str | None = None
+        self.neighborSkin: float | None = None
+        self.neighborModify: str | None = None
+        self.accelerator: str | None = None
+        self.acceleratorThreads: int = 1
+        self.systemAtomCount: int = 0
+        self.systemBoxLengths: np.ndarray = np.zeros(3)
+        self.systemMoleculeKinds: set[str] = set()
+        # None until a system is loaded
+        self.systemHasAngles: bool | None = None
+        self.processorGrid: tuple[int, int, int] | None = None
+        self.balanceThreshold: float | None = None
+        self.balanceEverySteps: int = 1000
+        self.constraintMode: str = "rigid"
         self.bondStyle: str = "zero"
         self.angleStyle: str = "zero"
         self.dihedralStyle: str = "none"
@@ -55,8 +163,18 @@ class LammpsScriptFactory:
         self.zlo: float = -20.0
         self.zhi: float = 20.0
         self.system: str = "#No system loaded"
+        self.systemData: CrystalStructure | None = None
+        self.restartFile: str | None = None
+        self.partitionTemperatures: list[float] = []
+        self.partitionPressures: list[float] = []
         self.replicates: list[str] = []
-        self.fixes: list[str] = []
+        self.fixes: list[ProtocolStage] = []
+        self.checkpoints: bool = False
+        self.dumpFormat: str = "xyz"
+        self.dumpEverySteps: int = 100
+        self.dumpColumns: str = "id mol type xu yu zu"
+        self.dumpProductionOnly: bool = False
+        self.resumeStage: int = 0
         self.atomTypes: int = 10
         self.bondTypes: int = 5
         self.angleTypes: int = 7
@@ -69,59 +187,191 @@ class LammpsScriptFactory:
         self.extraImproperPerAtom: int = 1
 
     def buildJobAtPath(self, finalScriptPath: str) -> None:
+        if self.systemData is not None and self.restartFile is None:
+            self.writeSystemDataFile(str(Path(finalScriptPath).with_suffix(".data")))
         with open(finalScriptPath, "w") as file:
             file.write(self._getScript(name=finalScriptPath.split("/")[-1]))
+        if self.checkpoints:
+            self.writeStageManifest(self.stageManifestPath(finalScriptPath))
+
+    def writeSystemDataFile(self, dataFilePath: str) -> None:
+        self.systemData.writeDataFile(
+            dataFilePath,
+            labelAtoms=self.labelAtoms,
+            labelBonds=self.labelBonds,
+            labelAngles=self.labelAngles,
+            charges=self.chargeAtoms,
+            extraPerAtom={
+                "bond": self.extraBondPerAtom,
+                "angle": self.extraAnglePerAtom,
+                "special": self.extraSpecialPerAtom,
+            },
+        )
+
+    @staticmethod
+    def stageManifestPath(finalScriptPath: str) -> Path:
+        return Path(finalScriptPath).with_suffix(".stages.json")
+
+    @staticmethod
+    def checkpointFileName(stageIndex: int) -> str:
+        return f"Checkpoint-stage{stageIndex}.restart"
+
+    def enableCheckpoints(self) -> None:
+        """write_restart after every stage that runs, plus a <script>.stages.json manifest used by buildResumeJobAtPath."""
+        self.checkpoints = True
+
+    def writeStageManifest(self, manifestPath: Path) -> None:
+        stages: list[dict] = [
+            {
+                "index": index,
+                "name": stage.name,
+                "csvFile": stage.csvFileName,
+                "expectedRows": stage.expectedRows(self.timestep),
+                # Adaptive stages stop early with fewer rows: their checkpoint alone marks them finished
+                "adaptive": stage.convergence is not None,
+                "checkpoint": self.checkpointFileName(index) if stage.durationPs else None,
+            }
+            for index, stage in enumerate(self.fixes)
+        ]
+        with open(manifestPath, "w") as file:
+            json.dump({"timestep": self.timestep, "stages": stages}, file, indent=4)
+
+    def buildResumeJobAtPath(self, finalScriptPath: str, originalScriptPath: str) -> int:
+        """
+        Write a script restarting from the last checkpoint of an interrupted job and running only the
+        stages left. A stage counts as finished when its checkpoint exists and its CSV holds every row;
+        for adaptive stages, which may stop before maxDurationPs, the checkpoint is enough.
+        Returns the number of skipped stages.
+        """
+        if self.partitionTemperatures:
+            raise ValueError("Partitioned jobs cannot be resumed from a single checkpoint")
+        with open(self.stageManifestPath(originalScriptPath)) as file:
+            manifest: dict = json.load(file)
+        if [stage["name"] for stage in manifest["stages"]] != [stage.name for stage in self.fixes]:
+            raise ValueError("The stage manifest does not match the stages of this factory")
+
+        outputDirectory: Path = Path(originalScriptPath).parent / "output"
+        lastCheckpoint: str | None = None
+        for stage in manifest["stages"]:
+            if stage["checkpoint"] is None:
+                continue
+            if not (outputDirectory / stage["checkpoint"]).exists():
+                break
+            if stage["csvFile"] is not None and not stage.get("adaptive", False) and countDataRows(outputDirectory / stage["csvFile"]) < stage["expectedRows"]:
+                break
+            lastCheckpoint = stage["checkpoint"]
+            self.resumeStage = stage["index"] + 1
+
+        if lastCheckpoint is not None:
+            self.loadRestart(f"./output/{lastCheckpoint}")
+        self.checkpoints = True
+        self.buildJobAtPath(finalScriptPath)
+        return self.resumeStage
 
     def _getScript(self, name: str) -> str:
         self._script = StringIO()
+        self._script.write(self._getSettingsCommands(dataFilePath=str(Path(name).with_suffix(".data"))))
+        self._script.write(self._getForceFieldCommands())
+        self._script.write(self._getSystemCommands())
+        self._script.write(self._getThermoCommands())
+        self._script.write(self._getJobCommands(name))
+        return self._script.getvalue()
 
-        self._script.write(f"units {self.units}\n")
-        self._script.write(f"boundary {self.boundary}\n")
-        self._script.write(f"timestep {self.timestep}\n")
-
-        self._script.write(f"atom_style {self.atomStyle}\n")
-        self._script.write(f"pair_style {self.pairStyle}\n")
-        self._script.write(f"bond_style {self.bondStyle}\n")
-        self._script.write(f"angle_style {self.angleStyle}\n")
-        self._script.write(f"dihedral_style {self.dihedralStyle}\n")
-        self._script.write(f"improper_style {self.improperStyle}\n")
-
-        self._script.write(f"region {self.regionName} block {self.xlo} {self.xhi} {self.ylo} {self.yhi} {self.zlo} {self.zhi}\n")
-
-        self._script.write(f"create_box {self.atomTypes} {self.regionName} &\n")
-        self._script.write(f"bond/types {self.bondTypes} &\n")
-        self._script.write(f"angle/types {self.angleTypes} &\n")
-        self._script.write(f"dihedral/types {self.dihedralTypes} &\n")
-        self._script.write(f"improper/types {self.improperTypes} &\n")
-        self._script.write(f"extra/bond/per/atom {self.extraBondPerAtom} &\n")
-        self._script.write(f"extra/angle/per/atom {self.extraAnglePerAtom} &\n")
-        self._script.write(f"extra/special/per/atom {self.extraSpecialPerAtom} &\n")
-        self._script.write(f"extra/dihedral/per/atom {self.extraDihedralPerAtom} &\n")
-        self._script.write(f"extra/improper/per/atom {self.extraImproperPerAtom}\n")
-
-        self._script.write("labelmap atom")
+    def sharedBlocks(self, dataFilePath: str) -> dict[str, str]:
+        """The job-independent parts of the script (used by Campaign to write them once as include files)."""
+        return {
+            "settings": self._getSettingsCommands(dataFilePath),
+            "forcefield": self._getForceFieldCommands(),
+            "system": self._getSystemCommands(),
+            "thermo": self._getThermoCommands(),
+        }
+
+    def getIncludingScript(self, name: str, includePaths: list[str]) -> str:
+        """Script made of include commands for the shared blocks followed by this job's own commands."""
+        return "".join(f"include {includePath}\n" for includePath in includePaths) + self._getJobCommands(name)
+
+    def _getSettingsCommands(self, dataFilePath: str) -> str:
+        settings: StringIO = StringIO()
+        if self.accelerator is not None:
+            # Before read_restart/read_data and the styles, so that every style gets the suffix
+            packageCommand, suffix = ACCELERATORS[self.accelerator]
+            settings.write(packageCommand.format(threads=self.acceleratorThreads) + "\n")
+            settings.write(f"suffix {suffix}\n")
+        if self.processorGrid is not None:
+            settings.write(f"processors {' '.join(map(str, self.processorGrid))}\n")
+        if self.restartFile is not None:
+            # units, boundary, atom_style, groups and the replicated box come from the restart file
+            settings.write(f"read_restart {self.restartFile}\n")
+        else:
+            settings.write(f"units {self.units}\n")
+            settings.write(f"boundary {self.boundary}\n")
+        settings.write(f"timestep {self.timestep}\n")
+
+        if self.restartFile is None:
+            settings.write(f"atom_style {self.atomStyle}\n")
+        settings.write(f"pair_style {self.pairStyle}\n")
+        settings.write(f"bond_style {self.bondStyle}\n")
+        settings.write(f"angle_style {self.angleStyle}\n")
+        settings.write(f"dihedral_style {self.dihedralStyle}\n")
+        settings.write(f"improper_style {self.improperStyle}\n")
+        if self.neighborSkin is not None:
+            settings.write(f"neighbor {self.neighborSkin} bin\n")
+        if self.neighborModify is not None:
+            settings.write(f"neigh_modify {self.neighborModify}\n")
+
+        if self.restartFile is None and self.systemData is not None:
+            settings.write(f"read_data {dataFilePath}\n")
+        elif self.restartFile is None:
+            settings.write(f"region {self.regionName} block {self.xlo} {self.xhi} {self.ylo} {self.yhi} {self.zlo} {self.zhi}\n")
+
+            settings.write(f"create_box {self.atomTypes} {self.regionName} &\n")
+            settings.write(f"bond/types {self.bondTypes} &\n")
+            settings.write(f"angle/types {self.angleTypes} &\n")
+            settings.write(f"dihedral/types {self.dihedralTypes} &\n")
+            settings.write(f"improper/types {self.improperTypes} &\n")
+            settings.write(f"extra/bond/per/atom {self.extraBondPerAtom} &\n")
+            settings.write(f"extra/angle/per/atom {self.extraAnglePerAtom} &\n")
+            settings.write(f"extra/special/per/atom {self.extraSpecialPerAtom} &\n")
+            settings.write(f"extra/dihedral/per/atom {self.extraDihedralPerAtom} &\n")
+            settings.write(f"extra/improper/per/atom {self.extraImproperPerAtom}\n")
+        return settings.getvalue()
+
+    def _getForceFieldCommands(self) -> str:
+        forceField: StringIO = StringIO()
+        forceField.write("labelmap atom")
         for key, value in self.labelAtoms.items():
-            self._script.write(f" &\n\t{key} {value}")
-        self._script.write("\n")
+            forceField.write(f" &\n\t{key} {value}")
+        forceField.write("\n")
 
-        self._script.write("labelmap bond")
+        forceField.write("labelmap bond")
         for key, value in self.labelBonds.items():
-            self._script.write(f" &\n\t{key} {value}")
-        self._script.write("\n")
+            forceField.write(f" &\n\t{key} {value}")
+        forceField.write("\n")
 
-        self._script.write("labelmap angle")
+        forceField.write("labelmap angle")
         for key, value in self.labelAngles.items():
-            self._script.write(f" &\n\t{key} {value}")
-        self._script.write("\n")
-
-        self._script.write(MASSES)
-        self._script.write(FORCEFIELD)
-
-        self._script.write(self.system)
-        for replicate in self.replicates:
-            self._script.write(replicate)
-
-        self._script.write(f"""
+            forceField.write(f" &\n\t{key} {value}")
+        forceField.write("\n")
+
+        forceField.write(MASSES)
+        forceField.write(FORCEFIELD)
+        forceField.write(self.constraintCoefficients)
+        if self.kspaceStyle is not None:
+            forceField.write(f"kspace_style {self.kspaceStyle}\n")
+        return forceField.getvalue()
+
+    def _getSystemCommands(self) -> str:
+        system: str = "" if self.restartFile is not None else self.system + "".join(self.replicates)
+        if self.balanceThreshold is None:
+            return system
+        # Static balance of the replicated box, then fix balance follows density changes during the stages
+        return system + (
+            f"\nbalance {self.balanceThreshold} shift xyz 10 {self.balanceThreshold}\n"
+            f"fix loadBalance all balance {self.balanceEverySteps} {self.balanceThreshold} shift xyz 10 {self.balanceThreshold}\n"
+        )
+
+    def _getThermoCommands(self) -> str:
+        return """
 variable H equal 4.184*enthalpy
 variable Ec equal 4.184*ke
 variable Ep equal 4.184*pe
@@ -133,22 +383,6 @@ variable Vol equal vol
 variable cpu_time equal cpu
 variable sim_time equal time/1000
 
-shell mkdir output
-if $(is_os(^Windows)) then &
-    "shell copy {name} output" &
-    else &
-    "shell cp {name} output"
-""")
-
-        self._script.write("""fix dataOutput all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ./output/FixDataGlobal.csv &
-        title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
-        """)
-
-        self._script.write("""
-dump trajectory all xyz 100 ./output/Trajectory.xyz
-dump_modify trajectory element H N O O O H N O H O
-""")
-        self._script.write("""
 thermo 100
 thermo_style custom step v_sim_time cpu cpuremain temp press density econserve ke pe enthalpy
 thermo_modify norm yes
@@ -164,22 +398,333 @@ colname 8 "Econserve(kcal/mol.at)" &
 colname 9 "Ec(kcal/mol.at)" &
 colname 10 "Ep(kcal/mol.at)" &
 colname 11 "H(kcal/mol.at)"
+"""
+
+    def _getJobCommands(self, name: str) -> str:
+        """Output directories, global outputs and the stages: the part of the script that changes from job to job."""
+        job: StringIO = StringIO()
+        job.write(f"""{self._getOutputVariables()}
+shell mkdir output
+shell mkdir ${{outputDir}}
+if $(is_os(^Windows)) then &
+    "shell copy {name} output" &
+    else &
+    "shell cp {name} output"
 """)
 
-        for fix in self.fixes:
-            self._script.write(f"{fix}\n")
+        # A resumed job keeps appending to the files of the interrupted one
+        globalDataMode: str = "append" if self.resumeStage else "file"
+        job.write(f"""fix dataOutput all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H {globalDataMode} ${{outputDir}}/FixDataGlobal.csv &
+        title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
+        """)
+
+        if not self.dumpProductionOnly:
+            job.write(self._getDumpCommands(append=bool(self.resumeStage)))
 
-        self._script.write("""
+        self._trajectoryOpened: bool = bool(self.resumeStage)
+        for index, stage in enumerate(self.fixes):
+            if index < self.resumeStage:
+                continue
+            job.write(self._getStageCommands(stage))
+            if self.checkpoints and stage.durationPs:
+                job.write(f"write_restart ${{outputDir}}/{self.checkpointFileName(index)}\n")
+
+        # -partition runs write one log.lammps.<partition> each, copied to the partition's output directory
+        logFile, logDirectory = ("${partitionLog}", "${outputDir}") if self.partitionTemperatures else ("log.lammps", "output")
+        job.write(f"""
 if $(is_os(^Windows)) then &
-"shell copy log.lammps output" &
+"shell copy {logFile} {logDirectory}" &
 else &
-"shell cp log.lammps output"
+"shell cp {logFile} {logDirectory}"
 """)
+        return job.getvalue()
+
+    def _getDumpCommands(self, append: bool, everySteps: int | None = None) -> str:
+        dumpStyle, fileSuffix = DUMP_FORMATS[self.dumpFormat]
+        columns: str = f" {self.dumpColumns}" if dumpStyle.startswith("custom") else ""
+        modifiers: str = "element H N O O O H N O H O" if dumpStyle.startswith("xyz") else "sort id"
+        if append:
+            modifiers += " append yes"
+        return f"""
+dump trajectory all {dumpStyle} {everySteps or self.dumpEverySteps} ${{outputDir}}/Trajectory.{fileSuffix}{columns}
+dump_modify trajectory {modifiers}
+"""
 
-        return self._script.getvalue()
+    def _getStageCommands(self, stage: ProtocolStage) -> str:
+        if self.dumpProductionOnly:
+            if not stage.production or not stage.durationPs:
+                return f"{stage}\n"
+            # Production stages share one trajectory file, the dump only exists while they run
+            dumpCommands: str = self._getDumpCommands(append=self._trajectoryOpened, everySteps=stage.dumpEverySteps)
+            self._trajectoryOpened = True
+            return dumpCommands + f"{stage}\nundump trajectory\n"
+        if stage.dumpEverySteps is None:
+            return f"{stage}\n"
+        return f"dump_modify trajectory every {stage.dumpEverySteps}\n{stage}\ndump_modify trajectory every {self.dumpEverySteps}\n"
+
+    def setTrajectoryDump(
+        self,
+        dumpFormat: str = "xyz",
+        everySteps: int = 100,
+        columns: str | None = None,
+        productionOnly: bool = False,
+    ) -> None:
+        """
+        dumpFormat: one of DUMP_FORMATS; "binary" writes a LAMMPS binary custom dump (.bin).
+        columns: per-atom columns of custom and binary dumps.
+        productionOnly: only stages added with production=True write the trajectory.
+        """
+        if dumpFormat not in DUMP_FORMATS:
+            raise ValueError(f"Unknown dump format {dumpFormat!r}, expected one of {list(DUMP_FORMATS)}")
+        self.dumpFormat = dumpFormat
+        self.dumpEverySteps = everySteps
+        if columns is not None:
+            self.dumpColumns = columns
+        self.dumpProductionOnly = productionOnly
+
+    def setNeighborList(self, skin: float = 2.0, every: int = 1, delay: int = 0, check: bool = True) -> None:
+        """neighbor <skin> bin and neigh_modify every/delay/check; the LAMMPS defaults are used until this is called."""
+        self.neighborSkin = skin
+        self.neighborModify = f"every {every} delay {delay} check {'yes' if check else 'no'}"
+
+    def setUnwrappedTrajectoryDump(self, everySteps: int = 100, productionOnly: bool = True) -> None:
+        """Custom text dump of unwrapped coordinates with molecule ids and masses, as read by Diffusion.diffusionCoefficients."""
+        self.setTrajectoryDump("custom", everySteps, "id mol type mass xu yu zu", productionOnly)
+
+    def _getOutputVariables(self) -> str:
+        if not self.partitionTemperatures:
+            return "variable outputDir string ./output\n"
+        # One output directory per partition keeps every CSV and dump file name unique
+        partitionDirectories: str = " ".join(f"./output/partition{i + 1}" for i in range(len(self.partitionTemperatures)))
+        return f"""
+variable outputDir world {partitionDirectories}
+variable Tpartition world {" ".join(f"{temp:g}" for temp in self.partitionTemperatures)}
+variable Ppartition world {" ".join(f"{pressure:g}" for pressure in self.partitionPressures)}
+variable partitionLog world {" ".join(f"log.lammps.{i}" for i in range(len(self.partitionTemperatures)))}
+"""
 
-    def loadSystem(self, lammpsSystem: str) -> None:
-        setGroupCharges: str = """
+    def setPartitions(self, temperaturesK: list[float], pressuresBar: list[float]) -> None:
+        if len(pressuresBar) == 1:
+            pressuresBar = list(pressuresBar) * len(temperaturesK)
+        if len(pressuresBar) != len(temperaturesK):
+            raise ValueError("One pressure (or a single shared one) is needed per temperature")
+        self.partitionTemperatures = list(temperaturesK)
+        self.partitionPressures = list(pressuresBar)
+
+    def setConstraints(self, mode: str, timestepFs: float | None = None) -> None:
+        """
+        mode "rigid": rigid/small integrators, every molecule a rigid body (timestep 0.5 fs by default).
+        mode "shake"/"rattle": plain Nose-Hoover nve/nvt/npt with the CONSTRAINED_BONDS/ANGLES held by
+        fix shake or fix rattle, allowing 1-2 fs timesteps (2 fs by default). Only water can be fully held
+        that way: with bond_style/angle_style zero, nitric, nitrate and hydronium need rigid mode.
+        Call it before adding the stages, whose fixes are written when they are added.
+        """
+        if mode not in CONSTRAINT_MODES:
+            raise ValueError(f"Unknown constraint mode {mode!r}, expected one of {CONSTRAINT_MODES}")
+        self._checkConstraints(mode, self.systemMoleculeKinds, self.systemHasAngles is not False)
+        self.constraintMode = mode
+        self.timestep = timestepFs if timestepFs is not None else (0.5 if mode == "rigid" else 2.0)
+
+    @staticmethod
+    def _checkConstraints(mode: str, moleculeKinds: set[str], hasAngles: bool = True) -> None:
+        if mode == "rigid":
+            return
+        if not hasAngles:
+            raise ValueError(f"fix {mode} holds the water angle: load the system with generateTopology=True")
+        # A molecule is only held together when every one of its bonds and angles is constrained
+        unconstrainedKinds: list[str] = sorted(
+            kind
+            for kind in moleculeKinds
+            if any(bond[2] not in CONSTRAINED_BONDS for bond in MOLECULE_TEMPLATES[kind].bonds)
+            or any(angle[3] not in CONSTRAINED_ANGLES for angle in MOLECULE_TEMPLATES[kind].angles)
+        )
+        if unconstrainedKinds:
+            raise ValueError(f"{unconstrainedKinds} molecules cannot be held by fix {mode}: use the rigid constraint mode")
+
+    def integratorStyle(self, ensemble: str) -> str:
+        """Fix style and arguments up to the thermostat keywords for ensemble nve, nvt or npt."""
+        return f"rigid/{ensemble}/small molecule" if self.constraintMode == "rigid" else ensemble
+
+    @property
+    def constraintFix(self) -> str:
+        # Defined after the integrator of each stage, as fix rattle must follow every integration fix
+        if self.constraintMode == "rigid":
+            return ""
+        bondTypes: list[str] = [str(typeId) for typeId, label in self.labelBonds.items() if label in CONSTRAINED_BONDS]
+        angleTypes: list[str] = [str(typeId) for typeId, label in self.labelAngles.items() if label in CONSTRAINED_ANGLES]
+        return f"fix constraints all {self.constraintMode} 0.0001 20 0 b {' '.join(bondTypes)} a {' '.join(angleTypes)}\n"
+
+    @property
+    def constraintCoefficients(self) -> str:
+        """
+        fix shake/rattle hold bonds at the bond_coeff r0 and angles at the angle_coeff theta0, which are 0 in
+        FORCEFIELD: the constrained ones are redefined with the geometry of the bundled molecules.
+        """
+        if self.constraintMode == "rigid":
+            return ""
+        # Label -> "bond_coeff ..." line, once per label
+        coefficients: dict[str, str] = {}
+        for kind, geometry in moleculeGeometries().items():
+            template: MoleculeTemplate = MOLECULE_TEMPLATES[kind]
+            for first, second, label in template.bonds:
+                if label in CONSTRAINED_BONDS:
+                    coefficients[label] = f"bond_coeff {label} {np.linalg.norm(geometry[second] - geometry[first]):.4f}\n"
+            for first, vertex, third, label in template.angles:
+                if label in CONSTRAINED_ANGLES:
+                    armA: np.ndarray = geometry[first] - geometry[vertex]
+                    armB: np.ndarray = geometry[third] - geometry[vertex]
+                    cosine: float = float(armA @ armB / np.linalg.norm(armA) / np.linalg.norm(armB))
+                    coefficients[label] = f"angle_coeff {label} {np.degrees(np.arccos(cosine)):.2f}\n"
+        return "".join(coefficients.values())
+
+    @property
+    def constraintUnfix(self) -> str:
+        return "" if self.constraintMode == "rigid" else "unfix constraints\n"
+
+    def replicationFactors(self) -> np.ndarray:
+        """Total x, y, z replication of every replicate command."""
+        factors: np.ndarray = np.ones(3, dtype=np.int64)
+        for replicate in self.replicates:
+            factors *= np.array(replicate.split()[1:4], dtype=np.int64)
+        return factors
+
+    def atomCount(self) -> int:
+        """Atoms of the loaded system after every replicate."""
+        return self.systemAtomCount * int(self.replicationFactors().prod())
+
+    def planReplication(self, targetAtomCount: int, tolerance: float = 0.1) -> tuple[int, int, int]:
+        """
+        Replication factors of the loaded cell reaching targetAtomCount (within tolerance, relative)
+        with the most cubic box: the ratio of the longest to the shortest edge is minimised.
+        Without any candidate within tolerance, the closest atom count wins.
+        """
+        if not self.systemAtomCount:
+            raise ValueError("Load a system with literal coordinates before planning its replication")
+        boxLengths: np.ndarray = self.systemBoxLengths * self.replicationFactors()
+        targetCells: float = targetAtomCount / self.atomCount()
+        cubeEdge: float = (targetCells * boxLengths.prod()) ** (1 / 3)
+        maxFactors: np.ndarray = np.maximum(np.ceil(2 * cubeEdge / boxLengths).astype(np.int64), 1)
+        candidates: np.ndarray = np.stack(np.meshgrid(*(np.arange(1, maxFactor + 1) for maxFactor in maxFactors), indexing="ij"), axis=-1).reshape(-1, 3)
+
+        atomErrors: np.ndarray = np.abs(candidates.prod(axis=1) / targetCells - 1)
+        edges: np.ndarray = candidates * boxLengths
+        aspectRatios: np.ndarray = edges.max(axis=1) / edges.min(axis=1)
+        accepted: np.ndarray = atomErrors <= tolerance
+        if not accepted.any():
+            accepted = atomErrors == atomErrors.min()
+        best: int = np.flatnonzero(accepted)[np.lexsort((atomErrors[accepted], aspectRatios[accepted]))[0]]
+        return tuple(int(factor) for factor in candidates[best])
+
+    def replicateToTarget(self, targetAtomCount: int, ranks: int | None = None, tolerance: float = 0.1, balanceThreshold: float | None = 1.1) -> tuple[int, int, int]:
+        """replicate with planReplication; with ranks, also set a matching processor grid and load balancing."""
+        factors: tuple[int, int, int] = self.planReplication(targetAtomCount, tolerance)
+        self.replicate(*factors)
+        if ranks is not None:
+            self.setProcessorGrid(ranks, balanceThreshold)
+        return factors
+
+    @staticmethod
+    def bestProcessorGrid(ranks: int, boxLengths: np.ndarray) -> tuple[int, int, int]:
+        """Factorisation px*py*pz of ranks with the smallest sub-domain surface, i.e. the least ghost communication."""
+        grids: list[tuple[int, int, int]] = [
+            (px, py, ranks // (px * py)) for px in range(1, ranks + 1) if ranks % px == 0 for py in range(1, ranks // px + 1) if (ranks // px) % py == 0
+        ]
+        subDomains: np.ndarray = np.asarray(boxLengths, dtype=np.float64) / np.array(grids)
+        surfaces: np.ndarray = subDomains[:, 0] * subDomains[:, 1] + subDomains[:, 1] * subDomains[:, 2] + subDomains[:, 0] * subDomains[:, 2]
+        return grids[int(np.argmin(surfaces))]
+
+    def setProcessorGrid(self, ranks: int, balanceThreshold: float | None = 1.1) -> tuple[int, int, int]:
+        """processors command for the replicated box on ranks MPI ranks, plus balance/fix balance above balanceThreshold imbalance."""
+        if not self.systemAtomCount:
+            raise ValueError("Load a system with literal coordinates before choosing its processor grid")
+        self.processorGrid = self.bestProcessorGrid(ranks, self.systemBoxLengths * self.replicationFactors())
+        self.balanceThreshold = balanceThreshold if ranks > 1 else None
+        return self.processorGrid
+
+    def setAccelerator(self, accelerator: str | None, threads: int = 1) -> None:
+        """accelerator: one of ACCELERATORS ("omp", "intel") or None for plain styles."""
+        if accelerator is not None and accelerator not in ACCELERATORS:
+            raise ValueError(f"Unknown accelerator {accelerator!r}, expected one of {list(ACCELERATORS)}")
+        self.accelerator = accelerator
+        self.acceleratorThreads = threads
+
+    @staticmethod
+    def suggestLayout(atomCount: int, coreCount: int | None = None, minAtomsPerRank: int = MIN_ATOMS_PER_RANK) -> tuple[int, int]:
+        """
+        (MPI ranks, OpenMP threads per rank) using every core: as many ranks as keep at least
+        minAtomsPerRank atoms each, the other cores becoming threads. Ranks divide the core count.
+        """
+        coreCount = coreCount or os.cpu_count() or 1
+        maxRanks: int = max(1, min(coreCount, atomCount // minAtomsPerRank))
+        ranks: int = max(divisor for divisor in range(1, maxRanks + 1) if coreCount % divisor == 0)
+        return ranks, coreCount // ranks
+
+    def acceleratedLaunchCommand(
+        self,
+        scriptName: str,
+        coreCount: int | None = None,
+        atomCount: int | None = None,
+        lammpsExecutable: str = "lmp",
+        mpiLauncher: str = "mpirun",
+    ) -> str:
+        """
+        Pick the rank x thread split with suggestLayout, set the accelerator threads (omp when no
+        accelerator was chosen and more than one thread fits) and return the launch command line.
+        Build the job afterwards so that its package command matches. atomCount defaults to atomCount().
+        A processor grid set for another rank count is recomputed for the chosen ranks.
+        """
+        ranks, threads = self.suggestLayout(self.atomCount() if atomCount is None else atomCount, coreCount)
+        if self.processorGrid is not None and int(np.prod(self.processorGrid)) != ranks:
+            # A single-rank grid dropped the balance threshold: fall back to the default one
+            self.setProcessorGrid(ranks, 1.1 if self.balanceThreshold is None and int(np.prod(self.processorGrid)) == 1 else self.balanceThreshold)
+        if self.accelerator is None and threads > 1:
+            self.accelerator = "omp"
+        if self.accelerator is None:
+            threads = 1
+        self.acceleratorThreads = threads
+        launcher: str = f"{mpiLauncher} -np {ranks} " if ranks > 1 else ""
+        return f"OMP_NUM_THREADS={threads} {launcher}{lammpsExecutable} -in {scriptName}"
+
+    def partitionLaunchCommand(self, scriptName: str, ranksPerPartition: int = 1, lammpsExecutable: str = "lmp") -> str:
+        partitionCount: int = len(self.partitionTemperatures)
+        return f"mpirun -np {partitionCount * ranksPerPartition} {lammpsExecutable} -partition {partitionCount}x{ranksPerPartition} -in {scriptName}"
+
+    def buildPartitionedJobAtPath(
+        self,
+        finalScriptPath: str,
+        temperaturesK: list[float],
+        pressuresBar: list[float],
+        fixDurationPs: int,
+    ) -> str:
+        """
+        Write one script running every (temperature, pressure) point in its own partition.
+        Stages added before this call are shared by all partitions; the partition NPT stage is only
+        added to the written script, so the builder can be called again. Returns the mpirun command line.
+        """
+        self.setPartitions(temperaturesK, pressuresBar)
+        sharedStages: list[ProtocolStage] = self.fixes
+        self.fixes = list(sharedStages)
+        try:
+            self.addPartitionNPT(fixDurationPs=fixDurationPs)
+            self.buildJobAtPath(finalScriptPath)
+        finally:
+            self.fixes = sharedStages
+        return self.partitionLaunchCommand(scriptName=finalScriptPath.split("/")[-1])
+
+    def loadSystem(self, lammpsSystem: str | CrystalStructure, asDataFile: bool = False, generateTopology: bool = False) -> None:
+        """
+        lammpsSystem: create_atoms/set/change_box commands (such as WATER_CRYSTAL) or a CrystalStructure.
+        Bonds are found by create_bonds many distance searches, unless the system already holds them.
+        generateTopology=True builds bonds and angles from the molecule templates instead: it needs
+        labels such as "O[Water]" and also creates the angles (required by the shake/rattle constraint
+        modes) and the nitric N-O2 bonds, which lie outside the 1.19-1.21 A search window. The generated
+        topology always goes to the Bonds/Angles sections of a read_data file (asDataFile is implied):
+        one create_bonds single command per bond and angle would cost a parse each.
+        Commands that CrystalStructure.fromCommands cannot parse ($() coordinates, no change_box) are
+        loaded as text: atomCount, replication planning and processor grids then know nothing of the
+        system, and asDataFile/generateTopology raise a ValueError.
+        """
+        atomGroups: str = """
 group NitricHydrogenAtoms type 1
 group NitricNitrogenAtoms type 2
 group NitricOxygen1Atoms type 3
@@ -190,18 +735,23 @@ group NitrateNitrogenAtoms type 7
 group NitrateOxygenAtoms type 8
 group HydroniumHydrogenAtoms type 9
 group HydroniumOxygenAtoms type 10
-
-set group WaterOxygenAtoms charge -0.8476
-set group WaterHydrogenAtoms charge 0.4238
-set group NitricHydrogenAtoms charge 0.497
-set group NitricNitrogenAtoms charge 0.964
-set group NitricOxygen1Atoms charge -0.445
-set group NitricOxygen2Atoms charge -0.571
-set group NitrateNitrogenAtoms charge 0.65
-set group NitrateOxygenAtoms charge -0.55
-set group HydroniumHydrogenAtoms charge 0.578
-set group HydroniumOxygenAtoms charge -0.734
-
+"""
+        setGroupCharges: str = "\n".join(
+            f"set group {groupName} charge {self.chargeAtoms[label]}"
+            for groupName, label in (
+                ("WaterOxygenAtoms", "O[Water]"),
+                ("WaterHydrogenAtoms", "H[Water]"),
+                ("NitricHydrogenAtoms", "H[Nitric]"),
+                ("NitricNitrogenAtoms", "N[Nitric]"),
+                ("NitricOxygen1Atoms", "O1[Nitric]"),
+                ("NitricOxygen2Atoms", "O2[Nitric]"),
+                ("NitrateNitrogenAtoms", "N[Nitrate]"),
+                ("NitrateOxygenAtoms", "O[Nitrate]"),
+                ("HydroniumHydrogenAtoms", "H[Hydronium]"),
+                ("HydroniumOxygenAtoms", "O[Hydronium]"),
+            )
+        )
+        createBonds: str = """
 create_bonds many NitricOxygen2Atoms NitricHydrogenAtoms 1 0.95 1.0
 create_bonds many NitricNitrogenAtoms NitricOxygen1Atoms 2 1.19 1.21
 create_bonds many NitricNitrogenAtoms NitricOxygen2Atoms 2 1.19 1.21
@@ -209,7 +759,52 @@ create_bonds many WaterOxygenAtoms WaterHydrogenAtoms 3 0.98 1.1
 create_bonds many NitrateNitrogenAtoms NitrateOxygenAtoms 4 1.25 1.3
 create_bonds many HydroniumOxygenAtoms HydroniumHydrogenAtoms 5 0.98 1.1
 """
-        self.system = lammpsSystem + setGroupCharges
+        structure: CrystalStructure | None
+        if isinstance(lammpsSystem, CrystalStructure):
+            structure = lammpsSystem
+        else:
+            try:
+                structure = CrystalStructure.fromCommands(lammpsSystem)
+            except ValueError:
+                # $() coordinates or no change_box: the commands are used as they are
+                structure = None
+        if structure is None:
+            if asDataFile or generateTopology:
+                raise ValueError("asDataFile and generateTopology need literal create_atoms coordinates and a change_box command")
+            self._checkConstraints(self.constraintMode, set(), False)
+            self.systemAtomCount = 0
+            self.systemBoxLengths = np.zeros(3)
+            self.systemMoleculeKinds = set()
+            self.systemHasAngles = False
+            self.systemData = None
+            self.system = lammpsSystem + atomGroups + "\n" + setGroupCharges + "\n" + createBonds
+            return
+
+        moleculeKinds: set[str] = set(np.unique(moleculeKindOf(structure.typeLabels)).tolist())
+        if generateTopology and not len(structure.bonds):
+            # Bonds and angles come from the molecule templates instead of create_bonds many distance searches
+            structure.generateTopology()
+        asDataFile = asDataFile or generateTopology
+        self._checkConstraints(self.constraintMode, moleculeKinds, len(structure.angles) > 0)
+        self.systemAtomCount = len(structure)
+        self.systemBoxLengths = structure.boxLengths
+        self.systemMoleculeKinds = moleculeKinds
+        self.systemHasAngles = len(structure.angles) > 0
+        # Bonds given with the system (create_bonds single) or generated replace the distance searches
+        topology: str = "" if len(structure.bonds) else createBonds
+
+        if asDataFile:
+            # Atoms, charges, molecule ids and topology go to a read_data file written next to the script
+            self.systemData = structure
+            self.system = atomGroups + topology
+        else:
+            if isinstance(lammpsSystem, CrystalStructure):
+                raise TypeError("A CrystalStructure can only be loaded with asDataFile=True")
+            self.systemData = None
+            self.system = lammpsSystem + atomGroups + "\n" + setGroupCharges + "\n" + topology
+
+    def loadRestart(self, restartFilePath: str) -> None:
+        self.restartFile = restartFilePath
 
     def replicate(self, x: int, y: int, z: int) -> None:
         self.replicates.append(f"replicate {x} {y} {z}\n")
@@ -217,34 +812,56 @@ create_bonds many HydroniumOxygenAtoms HydroniumHydrogenAtoms 5 0.98 1.1
     def addNVE(
         self,
         fixDurationPs: int,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
     ) -> None:
-        self.fixes.append(f"""
-fix DataNVE all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ./output/NVE.csv &
+        self.fixes.append(
+            ProtocolStage(
+                name="NVE",
+                durationPs=fixDurationPs,
+                csvFileName="NVE.csv",
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                commands=f"""
+fix DataNVE all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/NVE.csv &
 title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
                           
-fix NVE all rigid/nve/small molecule
-run $(1000*{fixDurationPs}/dt) #NVE for {fixDurationPs}ps
-unfix NVE
+fix NVE all {self.integratorStyle("nve")}
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #NVE for {fixDurationPs}ps
+{self.constraintUnfix}unfix NVE
 
 unfix DataNVE
-""")
+""",
+            )
+        )
 
     def addNVT(
         self,
         Temp1K: float,
         Temp2K: float,
         fixDurationPs: int,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
     ) -> None:
-        self.fixes.append(f"""
-fix DataNVT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ./output/NVT-{int(Temp1K)}K.csv &
+        self.fixes.append(
+            ProtocolStage(
+                name=f"NVT-{int(Temp1K)}K",
+                durationPs=fixDurationPs,
+                csvFileName=f"NVT-{int(Temp1K)}K.csv",
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                commands=f"""
+fix DataNVT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/NVT-{int(Temp1K)}K.csv &
 title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
                           
-fix NVT all rigid/nvt/small molecule temp {Temp1K} {Temp2K} $(100*dt)
-run $(1000*{fixDurationPs}/dt) #NVT from {Temp1K}K to {Temp2K}K in {fixDurationPs}ps
-unfix NVT
+fix NVT all {self.integratorStyle("nvt")} temp {Temp1K} {Temp2K} $(100*dt)
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #NVT from {Temp1K}K to {Temp2K}K in {fixDurationPs}ps
+{self.constraintUnfix}unfix NVT
 
 unfix DataNVT
-""")
+""",
+            )
+        )
 
     def addNPT(
         self,
@@ -252,345 +869,161 @@ unfix DataNVT
         Temp2K: float,
         PressureBar: float,
         fixDurationPs: int,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
     ) -> None:
-        self.fixes.append(f"""
-fix DataNPT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ./output/NPT-{int(Temp1K)}K-{int(PressureBar)}bar.csv &
+        stageName: str = f"NPT-{int(Temp1K)}K-{int(PressureBar)}bar"
+        self.fixes.append(
+            ProtocolStage(
+                name=stageName,
+                durationPs=fixDurationPs,
+                csvFileName=f"{stageName}.csv",
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                commands=f"""
+fix DataNPT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/NPT-{int(Temp1K)}K-{int(PressureBar)}bar.csv &
 title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
 
-fix NPT all rigid/npt/small molecule temp {Temp1K} {Temp2K} $(100*dt) iso {PressureBar * 0.987} {PressureBar * 0.987} $(1000*dt)
-run $(1000*{fixDurationPs}/dt) #NPT from {Temp1K}K to {Temp2K}K at {PressureBar}bar in {fixDurationPs}ps
-unfix NPT
+fix NPT all {self.integratorStyle("npt")} temp {Temp1K} {Temp2K} $(100*dt) iso {PressureBar * 0.987} {PressureBar * 0.987} $(1000*dt)
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #NPT from {Temp1K}K to {Temp2K}K at {PressureBar}bar in {fixDurationPs}ps
+{self.constraintUnfix}unfix NPT
 
 unfix DataNPT
-""")
+""",
+            )
+        )
 
+    def addAdaptiveNPT(
+        self,
+        TempK: float,
+        PressureBar: float,
+        minDurationPs: float = 2,
+        maxDurationPs: float = 20,
+        tolerances: dict[str, float] | None = None,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
+    ) -> None:
+        """
+        NPT stage ending once enthalpy and density are equilibrated to the target standard errors
+        (see Equilibration.ConvergenceCriterion) when run by LammpsRunner; plain LAMMPS runs maxDurationPs.
+        """
+        stageName: str = f"NPT-{int(TempK)}K-{int(PressureBar)}bar"
+        self.fixes.append(
+            ProtocolStage(
+                name=stageName,
+                durationPs=maxDurationPs,
+                csvFileName=f"{stageName}.csv",
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                convergence=ConvergenceCriterion(minDurationPs, maxDurationPs, tolerances),
+                commands=f"""
+fix DataNPT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/{stageName}.csv &
+title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
 
-WATER_CRYSTAL: str = """
-    # Water Crystal Conventional Cell (Ice-11)
-    # Geometry optimized with CASTEP/RSCAN
-        create_atoms H[Water] single -0.8164863157501667 2.0590504918748076 1.1638139454665992 remap yes
-        create_atoms H[Water] single 1.3726310775769335 5.878564458111827 1.1638139454665992 remap yes
-        create_atoms H[Water] single 0.8164863157501667 5.579977440599233 4.728053468694649 remap yes
-        create_atoms H[Water] single 3.005603709077267 1.7604634743622123 4.728053468694649 remap yes
-        create_atoms H[Water] single -0.8164863157501667 5.579977440599233 4.728053468694649 remap yes
-        create_atoms H[Water] single 1.3726310775769335 1.7604634743622123 4.728053468694649 remap yes
-        create_atoms H[Water] single 0.8164863157501667 2.0590504918748076 1.1638139454665992 remap yes
-        create_atoms H[Water] single 3.005603709077267 5.878564458111827 1.1638139454665992 remap yes
-        create_atoms O[Water] single 2.1891173933271 1.2513417109430336 1.7046670751815933 remap yes
-        create_atoms H[Water] single 2.1891173933271 1.251879965657427 2.704666930322516 remap yes
-        create_atoms H[Water] single 2.1891173933271 0.30834629735991537 1.3718613511304354 remap yes
-        create_atoms O[Water] single 1.139254000162102e-16 5.070855677180054 1.7046670751815933 remap yes
-        create_atoms H[Water] single 1.139254000162102e-16 5.071393931894447 2.704666930322516 remap yes
-        create_atoms H[Water] single 2.2310390836507833e-16 4.127860263596936 1.3718613511304354 remap yes
-        create_atoms O[Water] single 2.1891173933271 6.3876862215310055 5.268906598409643 remap yes
-        create_atoms H[Water] single 2.1891173933271 6.387147966816612 6.268906453550565 remap yes
-        create_atoms H[Water] single 2.1891173933271 7.330681635114123 4.936100874358486 remap yes
-        create_atoms O[Water] single 4.044351700575464e-16 2.568172255293986 5.268906598409643 remap yes
-        create_atoms H[Water] single 4.044351700575464e-16 2.5676340005795923 6.268906453550565 remap yes
-        create_atoms H[Water] single 2.952566617086783e-16 3.511167668877103 4.936100874358486 remap yes
-        create_atoms O[Water] single -3.009529317094888e-16 2.5860338814019683 0.9279468369540018 remap yes
-        create_atoms O[Water] single 2.1891173933271 6.405547847638988 0.9279468369540018 remap yes
-        create_atoms O[Water] single 3.009529317094888e-16 5.052994051072072 4.492186360182052 remap yes
-        create_atoms O[Water] single 2.1891173933271 1.2334800848350518 4.492186360182052 remap yes
-
-        set atom 1 mol 1 #H[Water]
-        set atom 21 mol 1 #O[Water]
-        set atom 7 mol 1 #H[Water]
-
-        set atom 2 mol 2 #H[Water]
-        set atom 22 mol 2 #O[Water]
-        set atom 8 mol 2 #H[Water]
-
-        set atom 3 mol 3 #H[Water]
-        set atom 23 mol 3 #O[Water]
-        set atom 5 mol 3 #H[Water]
-
-        set atom 4 mol 4 #H[Water]
-        set atom 24 mol 4 #O[Water]
-        set atom 6 mol 4 #H[Water]
-
-        set atom 10 mol 5 #H[Water]
-        set atom 9 mol 5 #O[Water]
-        set atom 11 mol 5 #H[Water]
-
-        set atom 13 mol 6 #H[Water]
-        set atom 12 mol 6 #O[Water]
-        set atom 14 mol 6 #H[Water]
-
-        set atom 16 mol 7 #H[Water]
-        set atom 15 mol 7 #O[Water]
-        set atom 17 mol 7 #H[Water]
-
-        set atom 19 mol 8 #H[Water]
-        set atom 18 mol 8 #O[Water]
-        set atom 20 mol 8 #H[Water]
-
-        change_box all x final 0.0 4.3782347866542 y final 0.0 7.63902793247404 z final 0.0 7.1284790464561
-"""
+fix NPT all {self.integratorStyle("npt")} temp {TempK} {TempK} $(100*dt) iso {PressureBar * 0.987} {PressureBar * 0.987} $(1000*dt)
+{self.constraintFix}run $(1000*{maxDurationPs}/dt) #Adaptive NPT at {TempK}K and {PressureBar}bar, {minDurationPs} to {maxDurationPs}ps
+{self.constraintUnfix}unfix NPT
 
-NITRIC_CRYSTAL: str = """
-    # Nitric Crystal Cell 
-    # Geometry optimized with CASTEP/RSCAN
-    # Optimization initialized from experimental cell of Allan et al. (2010). The crystal structures of the low-temperature and high-pressure polymorphs of nitric acid. Dalton Trans. Volume Number 39(15), 3736-3743. DOI: https://doi.org/10.1039/B923975H
-        create_atoms H[Nitric] single 3.029263056686041 2.9836161709699334 17.100567829294825 remap yes
-        create_atoms H[Nitric] single 0.03804715133467395 1.7056730791425403 15.01854538108791 remap yes
-        create_atoms H[Nitric] single 0.0636631874671588 2.535364722848075 10.639572013843967 remap yes
-        create_atoms H[Nitric] single 2.9651005736290252 3.8970596076535395 12.728609113594409 remap yes
-        create_atoms H[Nitric] single 3.0787951950782784 5.418171767274984 8.767378908803247 remap yes
-        create_atoms H[Nitric] single 6.0948992326213265 6.7253291526893335 10.87502436815919 remap yes
-        create_atoms H[Nitric] single 6.137068490198665 5.907983889190034 15.1580133421852 remap yes
-        create_atoms H[Nitric] single 3.125567979937462 8.098870886034726 13.016345447079084 remap yes
-        create_atoms N[Nitric] single 3.009571514361713 4.842528192835353 17.215402820811384 remap yes
-        create_atoms N[Nitric] single 0.006856172145505774 3.5675418345220016 15.058566430128325 remap yes
-        create_atoms N[Nitric] single 0.01298790944833865 0.6812070448843923 10.808848515133025 remap yes
-        create_atoms N[Nitric] single 3.0448737705631927 2.044547437212355 12.904609856757746 remap yes
-        create_atoms N[Nitric] single 3.11244983760357 3.560724636469783 8.633646641234844 remap yes
-        create_atoms N[Nitric] single 6.119011905747985 4.863495133688807 10.828952739618552 remap yes
-        create_atoms N[Nitric] single 6.13215531177211 7.769052327937299 15.083641439406255 remap yes
-        create_atoms N[Nitric] single 3.0841726879945526 6.237100783407409 12.981266739207618 remap yes
-        create_atoms O1[Nitric] single 3.7682605314696187 4.680532733868712 18.136433352933743 remap yes
-        create_atoms O1[Nitric] single 2.562660347037633 5.857178468743443 16.74579497539405 remap yes
-        create_atoms O2[Nitric] single 2.578464934345625 3.66098096904876 16.589045615969436 remap yes
-        create_atoms O1[Nitric] single -0.745362724066744 3.4219910302536336 15.987006384337612 remap yes
-        create_atoms O1[Nitric] single 0.413511884423978 4.574049679793646 14.537982113399874 remap yes
-        create_atoms O2[Nitric] single 0.4928257106034023 2.373981867724898 14.499065733939414 remap yes
-        create_atoms O1[Nitric] single -0.7392096026920181 0.8987866388511214 11.7231167150881 remap yes
-        create_atoms O1[Nitric] single 0.43089944551983383 -0.36222463440125147 10.37749889499562 remap yes
-        create_atoms O2[Nitric] single 0.4739629157552642 1.8260884569868125 10.13764940009218 remap yes
-        create_atoms O1[Nitric] single 3.7851870466728337 2.2767153878855075 13.825571271964298 remap yes
-        create_atoms O2[Nitric] single 2.578793224148784 3.179278122569871 12.21946561277676 remap yes
-        create_atoms O1[Nitric] single 2.6403321489057605 0.9935888259849293 12.478488114416864 remap yes
-        create_atoms O1[Nitric] single 2.346437196109478 3.7258663190225927 7.719259929559632 remap yes
-        create_atoms O1[Nitric] single 3.572774977659724 2.545424151527364 9.088665030370633 remap yes
-        create_atoms O2[Nitric] single 3.535164748437684 4.7390829020635055 9.27162272850982 remap yes
-        create_atoms O1[Nitric] single 6.876485647257146 5.009159727692499 9.904813610257852 remap yes
-        create_atoms O1[Nitric] single 5.706578021322649 3.8568845401602325 11.344770077758907 remap yes
-        create_atoms O2[Nitric] single 5.634863404396803 6.05709347406878 11.389948532980938 remap yes
-        create_atoms O1[Nitric] single 6.88457795145532 7.621451035706739 14.155690339965021 remap yes
-        create_atoms O1[Nitric] single 5.681331470675029 8.775616733970486 15.56635901904073 remap yes
-        create_atoms O2[Nitric] single 5.71344585633327 6.578353065569369 15.70066739458119 remap yes
-        create_atoms O1[Nitric] single 2.3422512302568004 6.383721327301792 12.044143098349691 remap yes
-        create_atoms O1[Nitric] single 3.4795935692029425 5.230103772415533 13.509825541242375 remap yes
-        create_atoms O2[Nitric] single 3.5725365427807265 7.429494198126892 13.541563533053269 remap yes
-        create_atoms H[Nitric] single 3.109998894739789 -1.2417199153485674 0.15409148269347506 remap yes
-        create_atoms H[Nitric] single 6.101214800091155 5.93100916546104 2.2361139309003883 remap yes
-        create_atoms H[Nitric] single 6.075598763958672 6.7607008091665755 6.615087298144331 remap yes
-        create_atoms H[Nitric] single 3.1741613777968047 8.12239569397204 4.526050198393888 remap yes
-        create_atoms H[Nitric] single 3.0604667563475516 9.643507853593452 8.48728040318505 remap yes
-        create_atoms H[Nitric] single 0.04436271880450237 2.4999930663708327 6.3796349438291085 remap yes
-        create_atoms H[Nitric] single 0.0021934612271659946 1.6826478028715341 2.0966459698031 remap yes
-        create_atoms H[Nitric] single 3.013693971488368 3.873534799716225 4.238313864909214 remap yes
-        create_atoms N[Nitric] single 3.129690437064117 0.6171921065168533 0.03925649117690974 remap yes
-        create_atoms N[Nitric] single 6.132405779280325 7.7928779208405015 2.196092881859973 remap yes
-        create_atoms N[Nitric] single 6.126274041977489 4.906543131202896 6.445810796855273 remap yes
-        create_atoms N[Nitric] single 3.0943881808626372 6.269883523530855 4.350049455230553 remap yes
-        create_atoms N[Nitric] single 3.0268121138222597 7.7860607227882825 8.621012670753455 remap yes
-        create_atoms N[Nitric] single 0.020250045677845985 0.6381590473703066 6.425706572369746 remap yes
-        create_atoms N[Nitric] single 0.007106639653719005 3.5437162416187995 2.171017872582044 remap yes
-        create_atoms N[Nitric] single 3.055089263431278 2.0117646970889087 4.273392572780682 remap yes
-        create_atoms O1[Nitric] single 2.3710014199562113 0.4551966475502114 -0.8817740409454434 remap yes
-        create_atoms O1[Nitric] single 3.5766016043881965 1.6318423824249424 0.5088643365942561 remap yes
-        create_atoms O2[Nitric] single 3.5607970170802052 -0.5643551172697411 0.6656136960188622 remap yes
-        create_atoms O1[Nitric] single 6.884624675492543 7.647327116572133 1.2676529276506878 remap yes
-        create_atoms O1[Nitric] single 5.725750067001854 8.799385766112104 2.7166771985884264 remap yes
-        create_atoms O2[Nitric] single 5.6464362408224265 6.599317954043398 2.755593578048884 remap yes
-        create_atoms O1[Nitric] single 6.878471554117847 5.124122725169621 5.5315425969001994 remap yes
-        create_atoms O1[Nitric] single 5.708362505905996 3.8631114519172463 6.8771604169926785 remap yes
-        create_atoms O2[Nitric] single 5.665299035670568 6.051424543305313 7.117009911896119 remap yes
-        create_atoms O1[Nitric] single 2.3540749047529963 6.502051474204007 3.4290880400240007 remap yes
-        create_atoms O2[Nitric] single 3.5604687272770454 7.404614208888371 5.035193699211539 remap yes
-        create_atoms O1[Nitric] single 3.49892980252007 5.21892491230343 4.776171197571435 remap yes
-        create_atoms O1[Nitric] single 3.792824755316352 7.9512024053410935 9.535399382428666 remap yes
-        create_atoms O1[Nitric] single 2.566486973766106 6.770760237845864 8.165994281617664 remap yes
-        create_atoms O2[Nitric] single 2.604097202988146 8.964418988381981 7.983036583478478 remap yes
-        create_atoms O1[Nitric] single -0.7372236958313159 0.7838236413739995 7.349845701730446 remap yes
-        create_atoms O1[Nitric] single 0.4326839301031805 -0.36845154615826714 5.90988923422939 remap yes
-        create_atoms O2[Nitric] single 0.5043985470290253 1.8317573877502793 5.864710779007359 remap yes
-        create_atoms O1[Nitric] single -0.7453160000294912 3.396114949388239 3.0989689720232776 remap yes
-        create_atoms O1[Nitric] single 0.4579304807508018 4.550280647651984 1.6883002929475648 remap yes
-        create_atoms O2[Nitric] single 0.4258160950925607 2.3530169792508695 1.5539919174071066 remap yes
-        create_atoms O1[Nitric] single 3.79701072116903 2.158385240983292 5.210516213638607 remap yes
-        create_atoms O1[Nitric] single 2.6596683822228875 1.0047676860970323 3.7448337707459247 remap yes
-        create_atoms O2[Nitric] single 2.5667254086451035 3.204158111808391 3.7130957789350285 remap yes
-
-        set atom 19 mol 1 #O2[Nitric]
-        set atom 1 mol 1 #H[Nitric]
-        set atom 9 mol 1 #N[Nitric]
-        set atom 17 mol 1 #O1[Nitric]
-        set atom 18 mol 1 #O1[Nitric]
-
-        set atom 22 mol 2 #O2[Nitric]
-        set atom 2 mol 2 #H[Nitric]
-        set atom 10 mol 2 #N[Nitric]
-        set atom 20 mol 2 #O1[Nitric]
-        set atom 21 mol 2 #O1[Nitric]
-
-        set atom 25 mol 3 #O2[Nitric]
-        set atom 3 mol 3 #H[Nitric]
-        set atom 11 mol 3 #N[Nitric]
-        set atom 23 mol 3 #O1[Nitric]
-        set atom 24 mol 3 #O1[Nitric]
-
-        set atom 27 mol 4 #O2[Nitric]
-        set atom 4 mol 4 #H[Nitric]
-        set atom 12 mol 4 #N[Nitric]
-        set atom 26 mol 4 #O1[Nitric]
-        set atom 28 mol 4 #O1[Nitric]
-
-        set atom 31 mol 5 #O2[Nitric]
-        set atom 5 mol 5 #H[Nitric]
-        set atom 13 mol 5 #N[Nitric]
-        set atom 30 mol 5 #O1[Nitric]
-        set atom 29 mol 5 #O1[Nitric]
-
-        set atom 34 mol 6 #O2[Nitric]
-        set atom 6 mol 6 #H[Nitric]
-        set atom 14 mol 6 #N[Nitric]
-        set atom 33 mol 6 #O1[Nitric]
-        set atom 32 mol 6 #O1[Nitric]
-
-        set atom 37 mol 7 #O2[Nitric]
-        set atom 15 mol 7 #N[Nitric]
-        set atom 36 mol 7 #O1[Nitric]
-        set atom 35 mol 7 #O1[Nitric]
-        set atom 7 mol 7 #H[Nitric]
-
-        set atom 40 mol 8 #O2[Nitric]
-        set atom 16 mol 8 #N[Nitric]
-        set atom 38 mol 8 #O1[Nitric]
-        set atom 39 mol 8 #O1[Nitric]
-        set atom 8 mol 8 #H[Nitric]
-
-        set atom 59 mol 9 #O2[Nitric]
-        set atom 49 mol 9 #N[Nitric]
-        set atom 58 mol 9 #O1[Nitric]
-        set atom 57 mol 9 #O1[Nitric]
-        set atom 41 mol 9 #H[Nitric]
-
-        set atom 62 mol 10 #O2[Nitric]
-        set atom 42 mol 10 #H[Nitric]
-        set atom 50 mol 10 #N[Nitric]
-        set atom 60 mol 10 #O1[Nitric]
-        set atom 61 mol 10 #O1[Nitric]
-
-        set atom 65 mol 11 #O2[Nitric]
-        set atom 51 mol 11 #N[Nitric]
-        set atom 64 mol 11 #O1[Nitric]
-        set atom 63 mol 11 #O1[Nitric]
-        set atom 43 mol 11 #H[Nitric]
-
-        set atom 67 mol 12 #O2[Nitric]
-        set atom 52 mol 12 #N[Nitric]
-        set atom 68 mol 12 #O1[Nitric]
-        set atom 66 mol 12 #O1[Nitric]
-        set atom 44 mol 12 #H[Nitric]
-
-        set atom 71 mol 13 #O2[Nitric]
-        set atom 45 mol 13 #H[Nitric]
-        set atom 53 mol 13 #N[Nitric]
-        set atom 70 mol 13 #O1[Nitric]
-        set atom 69 mol 13 #O1[Nitric]
-
-        set atom 74 mol 14 #O2[Nitric]
-        set atom 54 mol 14 #N[Nitric]
-        set atom 72 mol 14 #O1[Nitric]
-        set atom 73 mol 14 #O1[Nitric]
-        set atom 46 mol 14 #H[Nitric]
-
-        set atom 77 mol 15 #O2[Nitric]
-        set atom 55 mol 15 #N[Nitric]
-        set atom 75 mol 15 #O1[Nitric]
-        set atom 76 mol 15 #O1[Nitric]
-        set atom 47 mol 15 #H[Nitric]
-
-        set atom 80 mol 16 #O2[Nitric]
-        set atom 56 mol 16 #N[Nitric]
-        set atom 78 mol 16 #O1[Nitric]
-        set atom 79 mol 16 #O1[Nitric]
-        set atom 48 mol 16 #H[Nitric]
-
-        change_box all x final 0.0 6.13926195142583 y final 0.0 8.450672172637 z final 0.0 17.2546593119883
-"""
+unfix DataNPT
+""",
+            )
+        )
+
+    def addPartitionNPT(
+        self,
+        fixDurationPs: int,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
+    ) -> None:
+        self.fixes.append(
+            ProtocolStage(
+                name="NPT-partition",
+                durationPs=fixDurationPs,
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                commands=f"""
+fix DataNPT all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/NPT-${{Tpartition}}K-${{Ppartition}}bar.csv &
+title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
+
+fix NPT all {self.integratorStyle("npt")} temp ${{Tpartition}} ${{Tpartition}} $(100*dt) iso $(v_Ppartition*0.987) $(v_Ppartition*0.987) $(1000*dt)
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #NPT at the partition temperature and pressure in {fixDurationPs}ps
+{self.constraintUnfix}unfix NPT
+
+unfix DataNPT
+""",
+            )
+        )
+
+    def addCpMeasurement(
+        self,
+        TempK: float,
+        diffTempK: float = 5,
+        PressureBar: float = 1.0,
+        fixDurationPs: int = 10,
+        production: bool = True,
+        dumpEverySteps: int | None = None,
+    ) -> None:
+        lowTemp: float = TempK - diffTempK
+        highTemp: float = TempK + diffTempK
+        if lowTemp <= 0:
+            lowTemp = 1.0 + diffTempK
+            highTemp = 1.0 + 2 * diffTempK
+
+        dataFixName: str = f"DataWritingT{temperatureTag(TempK)}"
+        self.fixes.append(
+            ProtocolStage(
+                name=f"Cp-{TempK:g}K",
+                durationPs=2 * fixDurationPs,
+                csvFileName=f"{dataFixName}.csv",
+                production=production,
+                dumpEverySteps=dumpEverySteps,
+                commands=f"""
+fix {dataFixName} all ave/time 1 100 100 v_sim_time v_cpu_time v_T v_P v_d v_Vol v_H file ${{outputDir}}/{dataFixName}.csv &
+title2 "TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)"
+
+fix NPT all {self.integratorStyle("npt")} temp {lowTemp} {lowTemp} $(100*dt) iso {PressureBar * 0.987} {PressureBar * 0.987} $(1000*dt)
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #Cp at {TempK}K: NPT at {lowTemp}K and {PressureBar}bar in {fixDurationPs}ps
+{self.constraintUnfix}unfix NPT
+
+fix NPT all {self.integratorStyle("npt")} temp {highTemp} {highTemp} $(100*dt) iso {PressureBar * 0.987} {PressureBar * 0.987} $(1000*dt)
+{self.constraintFix}run $(1000*{fixDurationPs}/dt) #Cp at {TempK}K: NPT at {highTemp}K and {PressureBar}bar in {fixDurationPs}ps
+{self.constraintUnfix}unfix NPT
+
+unfix {dataFixName}
+""",
+            )
+        )
+
+    def writeRestart(self, restartFilePath: str) -> None:
+        self.fixes.append(ProtocolStage(name="write_restart", commands=f"write_restart {restartFilePath}\n"))
+
+    def addForceEvaluation(self) -> None:
+        """Forces of the current configuration (Forces.dump, sorted by id) and its potential energy per atom (PotentialEnergy.txt)."""
+        self.fixes.append(
+            ProtocolStage(
+                name="Forces",
+                commands="""
+run 0 #Force evaluation
+write_dump all custom ${outputDir}/Forces.dump id fx fy fz modify sort id
+print "$(pe)" file ${outputDir}/PotentialEnergy.txt
+""",
+            )
+        )
+
+
+# Command blocks of the bundled crystals (CrystalLibrary.CRYSTALS), generated on first access
+CRYSTAL_CONSTANTS: dict[str, str] = {
+    "WATER_CRYSTAL": "Water",
+    "NITRIC_CRYSTAL": "Nitric",
+    "NAM_CRYSTAL": "NAM",
+}
+
+
+def __getattr__(name: str) -> str:
+    if name in CRYSTAL_CONSTANTS:
+        return CRYSTALS[CRYSTAL_CONSTANTS[name]].commands()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-NAM_CRYSTAL: str = """
-    # Nitric Acid Monohydrate (NAM) Crystal Cell
-    # Geometry optimized with CASTEP/RSCAN
-    # Optimization initialized from experimental cell of Lebrun et al. (2001). Kinetic behaviour investigations and crystal structure of nitric acid dihydrate. Acta Cryst B. Volume Number 57(1). 27-35. DOI: https://doi.org/10.1107/S0108768100014506
-        create_atoms H[Hydronium] single 3.7672952833150797 2.165297947956077 2.5230642741943523 remap yes
-        create_atoms H[Hydronium] single 2.210946378257988 1.6256462369147173 2.2449698970246432 remap yes
-        create_atoms H[Hydronium] single 2.5289216559868324 3.251724598985764 2.327000234935788 remap yes
-        create_atoms O[Hydronium] single 2.772683683438196 2.3370792271013494 2.737840892108796 remap yes
-        create_atoms O[Nitrate] single 1.2373556436491262 0.4682053237594338 1.8289338500595516 remap yes
-        create_atoms O[Nitrate] single -0.2719562171773933 1.9609015450450593 2.392228573831209 remap yes
-        create_atoms O[Nitrate] single -0.8889343306425594 0.0814328733148276 1.4380757980717076 remap yes
-        create_atoms N[Nitrate] single 0.025412139066260747 0.8364755602798499 1.8871916786545018 remap yes
-        create_atoms H[Hydronium] single 0.9848772793908797 6.796589449000454 3.8953415611223976 remap yes
-        create_atoms H[Hydronium] single -0.571471625666212 7.336241160041813 4.173435938292107 remap yes
-        create_atoms H[Hydronium] single -0.2534963479373675 5.710162797970766 4.091405600380962 remap yes
-        create_atoms O[Hydronium] single -0.00973432048600388 6.624808169855181 3.680564943207954 remap yes
-        create_atoms O[Nitrate] single 4.009212238606976 8.453816866921978 4.571465820499312 remap yes
-        create_atoms O[Nitrate] single 2.4999003777804556 6.961120645636354 4.008171096727655 remap yes
-        create_atoms O[Nitrate] single 1.8829222643152848 8.840589317366584 4.962323872487156 remap yes
-        create_atoms N[Nitrate] single 2.797268734024108 8.085546630401563 4.513207991904362 remap yes
-        create_atoms H[Hydronium] single 3.7672952833150797 2.3156457505221884 5.732267191852728 remap yes
-        create_atoms H[Hydronium] single 2.210946378257988 2.855297461563548 5.454172814683018 remap yes
-        create_atoms H[Hydronium] single 2.5289216559868324 1.2292190994925012 5.5362031525941635 remap yes
-        create_atoms O[Hydronium] single 2.772683683438196 2.143864471376916 5.947043809767171 remap yes
-        create_atoms O[Nitrate] single 1.2373556436491262 4.012738374718831 5.038136767717926 remap yes
-        create_atoms O[Nitrate] single -0.27195621717739166 2.5200421534331974 5.601431491489584 remap yes
-        create_atoms O[Nitrate] single -0.8889343306425594 4.399510825163436 4.647278715730082 remap yes
-        create_atoms N[Nitrate] single 0.025412139066261302 3.644468138198415 5.0963945963128765 remap yes
-        create_atoms H[Hydronium] single 0.9848772793908797 6.646241646434342 0.6861386434640226 remap yes
-        create_atoms H[Hydronium] single -0.571471625666212 6.106589935392983 0.964233020633732 remap yes
-        create_atoms H[Hydronium] single -0.2534963479373675 7.73266829746403 0.8822026827225865 remap yes
-        create_atoms O[Hydronium] single -0.00973432048600388 6.818022925579615 0.47136202554957785 remap yes
-        create_atoms O[Nitrate] single 4.019773647573326 4.949149022237709 1.3802690675988236 remap yes
-        create_atoms O[Nitrate] single 2.5104617867468058 6.441845243523334 0.8169743438271657 remap yes
-        create_atoms O[Nitrate] single 1.8934836732816347 4.562376571793094 1.7711271195866671 remap yes
-        create_atoms N[Nitrate] single 2.8078301429904635 5.3174192587581155 1.3220112390038732 remap yes
-
-        set atom 4 mol 1 #O[Hydronium]
-        set atom 1 mol 1 #H[Hydronium]
-        set atom 2 mol 1 #H[Hydronium]
-        set atom 3 mol 1 #H[Hydronium]
-
-        set atom 8 mol 2 #N[Nitrate]
-        set atom 5 mol 2 #O[Nitrate]
-        set atom 6 mol 2 #O[Nitrate]
-        set atom 7 mol 2 #O[Nitrate]
-
-        set atom 12 mol 3 #O[Hydronium]
-        set atom 9 mol 3 #H[Hydronium]
-        set atom 10 mol 3 #H[Hydronium]
-        set atom 11 mol 3 #H[Hydronium]
-
-        set atom 16 mol 4 #N[Nitrate]
-        set atom 13 mol 4 #O[Nitrate]
-        set atom 14 mol 4 #O[Nitrate]
-        set atom 15 mol 4 #O[Nitrate]
-
-        set atom 20 mol 5 #O[Hydronium]
-        set atom 17 mol 5 #H[Hydronium]
-        set atom 18 mol 5 #H[Hydronium]
-        set atom 19 mol 5 #H[Hydronium]
-
-        set atom 24 mol 6 #N[Nitrate]
-        set atom 21 mol 6 #O[Nitrate]
-        set atom 22 mol 6 #O[Nitrate]
-        set atom 23 mol 6 #O[Nitrate]
-
-        set atom 28 mol 7 #O[Hydronium]
-        set atom 25 mol 7 #H[Hydronium]
-        set atom 26 mol 7 #H[Hydronium]
-        set atom 27 mol 7 #H[Hydronium]
-
-        set atom 32 mol 8 #N[Nitrate]
-        set atom 29 mol 8 #O[Nitrate]
-        set atom 30 mol 8 #O[Nitrate]
-        set atom 31 mol 8 #O[Nitrate]
-
-        change_box all x final 0.0 5.5648360078484 y final 0.0 8.96188739695653 z final 0.0 6.41840583531675
-"""
 
 MASSES: str = """
     # Hydrogens
@@ -656,7 +1089,7 @@ FORCEFIELD: str = """
 
 if __name__ == "__main__":
     script = LammpsScriptFactory()
-    script.loadSystem(WATER_CRYSTAL)
+    script.loadSystem(CRYSTALS["Water"].commands())
     script.replicate(5, 3, 3)
     script.replicate(2, 2, 2)
     # script.addNVE(fixDurationPs=50)
@@ -0,0 +1,151 @@
+import re
+from pathlib import Path
+
+import numpy as np
+
+from LammPy.Execution import RUN_PATTERN, logicalCommands
+from LammPy.LammpsScriptBuilder import ProtocolStage
+
+LOG_RUN_PATTERN: re.Pattern = re.compile(r"^\s*run\s+\S+[^#]*(?:#\s*(.*))?$")
+LOOP_PATTERN: re.Pattern = re.compile(r"^Loop time of (\S+) on (\d+) procs for (\d+) steps with (\d+) atoms")
+PERFORMANCE_PATTERN: re.Pattern = re.compile(r"^Performance:(?:\s*(\S+) ns/day)?.*?(\S+) timesteps/s")
+SECTION_PATTERN: re.Pattern = re.compile(r"^(Pair|Bond|Kspace|Neigh|Comm|Output|Modify|Other)\s*\|.*\|\s*(\S+)\s*$")
+NEIGHBOR_PATTERNS: dict[str, re.Pattern] = {
+    "totalNeighbors": re.compile(r"^Total # of neighbors = (\S+)"),
+    "neighborsPerAtom": re.compile(r"^Ave neighs/atom = (\S+)"),
+    "neighborBuilds": re.compile(r"^Neighbor list builds = (\S+)"),
+    # "Dangerous builds not checked" with neigh_modify check no: the count stays NaN (unknown)
+    "dangerousBuilds": re.compile(r"^Dangerous builds(?: = (\S+)| not checked)"),
+}
+
+# % of the loop time spent in each section of the MPI task timing breakdown
+SECTIONS: tuple[str, ...] = ("Pair", "Bond", "Kspace", "Neigh", "Comm", "Output", "Modify", "Other")
+
+RUN_DTYPE: np.dtype = np.dtype(
+    [("stage", "U64"), ("comment", "U128"), ("loopSeconds", "f8"), ("procs", "i8"), ("steps", "i8"), ("atoms", "i8")]
+    + [("nsPerDay", "f8"), ("timestepsPerSecond", "f8")]
+    + [(section, "f8") for section in SECTIONS]
+    + [(field, "f8") for field in NEIGHBOR_PATTERNS]
+)
+
+
+def stageOfRunComments(stages: list[ProtocolStage]) -> dict[str, str]:
+    """Run comment -> name of the factory stage holding that run command."""
+    stageNames: dict[str, str] = {}
+    for stage in stages:
+        for command in logicalCommands(stage.commands):
+            runMatch: re.Match | None = RUN_PATTERN.match(command)
+            if runMatch is not None and runMatch.group(2):
+                stageNames[runMatch.group(2).strip()] = stage.name
+    return stageNames
+
+
+def parseLog(logPath: str, stages: list[ProtocolStage] | None = None) -> np.ndarray:
+    """
+    One RUN_DTYPE row per run block of a log.lammps: loop time, performance, timing breakdown
+    (% of the loop time per section) and neighbor statistics. The file is read line by line.
+    stages (LammpsScriptFactory.fixes) name each block after the stage whose run comment it echoes.
+    Values missing from a block (Kspace without long-range solver, ...) are NaN.
+    """
+    stageNames: dict[str, str] = {} if stages is None else stageOfRunComments(stages)
+    rows: list[np.void] = []
+    comment: str = ""
+    row: np.ndarray | None = None
+    with open(logPath) as file:
+        for line in file:
+            runMatch: re.Match | None = LOG_RUN_PATTERN.match(line)
+            if runMatch is not None:
+                # LAMMPS echoes "run $(...) #comment" then the substituted "run N" without comment:
+                # the comment is kept until the block's Loop time line
+                if runMatch.group(1):
+                    comment = runMatch.group(1).strip()
+                continue
+            loopMatch: re.Match | None = LOOP_PATTERN.match(line)
+            if loopMatch is not None:
+                if row is not None:
+                    rows.append(row[0])
+                row = np.zeros(1, dtype=RUN_DTYPE)
+                for field in RUN_DTYPE.names[6:]:
+                    row[field] = np.nan
+                row["comment"] = comment
+                row["stage"] = stageNames.get(comment, "")
+                comment = ""
+                row["loopSeconds"], row["procs"], row["steps"], row["atoms"] = loopMatch.groups()
+                continue
+            if row is None:
+                continue
+            performanceMatch: re.Match | None = PERFORMANCE_PATTERN.match(line)
+            if performanceMatch is not None:
+                if performanceMatch.group(1) is not None:
+                    row["nsPerDay"] = performanceMatch.group(1)
+                row["timestepsPerSecond"] = performanceMatch.group(2)
+                continue
+            sectionMatch: re.Match | None = SECTION_PATTERN.match(line)
+            if sectionMatch is not None:
+                row[sectionMatch.group(1)] = sectionMatch.group(2)
+                continue
+            for field, pattern in NEIGHBOR_PATTERNS.items():
+                neighborMatch: re.Match | None = pattern.match(line)
+                if neighborMatch is not None:
+                    if neighborMatch.group(1) is not None:
+                        row[field] = neighborMatch.group(1)
+                    if field == "dangerousBuilds":
+                        # Last line of a run block
+                        rows.append(row[0])
+                        row = None
+                    break
+    if row is not None:
+        rows.append(row[0])
+    return np.array(rows, dtype=RUN_DTYPE)
+
+
+def stageSummary(runs: np.ndarray) -> np.ndarray:
+    """Runs of the same stage merged: times and steps summed, percentages weighted by loop time."""
+    stageNames, stageIndices = np.unique(runs["stage"], return_inverse=True)
+    summary: np.ndarray = np.zeros(len(stageNames), dtype=RUN_DTYPE)
+    summary["stage"] = stageNames
+    summary["comment"] = [runs["comment"][stageIndices == index][0] for index in range(len(stageNames))]
+    loopSeconds: np.ndarray = np.bincount(stageIndices, weights=runs["loopSeconds"], minlength=len(stageNames))
+    summary["loopSeconds"] = loopSeconds
+    summary["steps"] = np.bincount(stageIndices, weights=runs["steps"], minlength=len(stageNames))
+    np.maximum.at(summary["procs"], stageIndices, runs["procs"])
+    np.maximum.at(summary["atoms"], stageIndices, runs["atoms"])
+    summary["timestepsPerSecond"] = summary["steps"] / loopSeconds
+    summary["nsPerDay"] = np.nan
+    for section in SECTIONS:
+        summary[section] = np.bincount(stageIndices, weights=np.nan_to_num(runs[section]) * runs["loopSeconds"], minlength=len(stageNames)) / loopSeconds
+    for field in ("totalNeighbors", "neighborsPerAtom"):
+        summary[field] = np.nan
+    summary["neighborBuilds"] = np.bincount(stageIndices, weights=np.nan_to_num(runs["neighborBuilds"]), minlength=len(stageNames))
+    # One unchecked run leaves the stage's dangerous builds unknown (NaN)
+    summary["dangerousBuilds"] = np.bincount(stageIndices, weights=runs["dangerousBuilds"], minlength=len(stageNames))
+    return summary
+
+
+def profileReport(
+    logPath: str,
+    stages: list[ProtocolStage] | None = None,
+    outputThresholdPercent: float = 10,
+    commThresholdPercent: float = 20,
+) -> str:
+    """
+    Text report of a log.lammps per stage. Stages spending more than outputThresholdPercent of their
+    loop time in Output (dumps, thermo, restarts) are output-bound, those above commThresholdPercent
+    in Comm are communication-bound; dangerous neighbor builds are flagged too.
+    fix ave/time files are written from Modify, next to the rigid integrators, so they show up there.
+    """
+    summary: np.ndarray = stageSummary(parseLog(logPath, stages))
+    lines: list[str] = [f"Profile of {Path(logPath).as_posix()}"]
+    for stage in summary:
+        name: str = stage["stage"] or stage["comment"] or "(unnamed runs)"
+        breakdown: str = ", ".join(f"{section} {stage[section]:.1f}%" for section in SECTIONS if stage[section] > 0)
+        lines.append(f"{name}: {stage['steps']} steps in {stage['loopSeconds']:.2f}s on {stage['procs']} procs ({stage['timestepsPerSecond']:.1f} steps/s) - {breakdown}")
+        if stage["Output"] > outputThresholdPercent:
+            lines.append(f"    output-bound: {stage['Output']:.1f}% in Output, dump less often or with a binary/gz format")
+        if stage["Comm"] > commThresholdPercent:
+            lines.append(f"    communication-bound: {stage['Comm']:.1f}% in Comm, use fewer ranks or a larger system")
+        if stage["dangerousBuilds"] > 0:
+            lines.append(f"    {int(stage['dangerousBuilds'])} dangerous neighbor list builds")
+        elif np.isnan(stage["dangerousBuilds"]):
+            lines.append("    dangerous neighbor list builds not checked (neigh_modify check no)")
+    return "\n".join(lines)
@@ -0,0 +1,207 @@
+import numpy as np
+
+from LammPy.CellList import neighbourPairs
+from LammPy.CrystalLibrary import CRYSTALS
+from LammPy.CrystalStructure import CrystalStructure
+from LammPy.Topology import MOLECULE_TEMPLATES, minimumImage, templateMembers
+
+# g/mol, by element (first letter of the type label)
+ATOMIC_MASSES: dict[str, float] = {"H": 1.008, "N": 14.0067, "O": 15.9994}
+
+AVOGADRO: float = 6.02214076e23
+
+
+def moleculeGeometries() -> dict[str, np.ndarray]:
+    """
+    Kind -> (templateSize, 3) atom positions of one molecule around its center of mass, in the
+    slot order of MOLECULE_TEMPLATES, taken from the first molecule of that kind in the bundled crystals
+    (CrystalLibrary.CRYSTALS, optimized cells first).
+    """
+    geometries: dict[str, np.ndarray] = {}
+    for entry in CRYSTALS.values():
+        crystal: CrystalStructure = entry.structure()
+        for kind in MOLECULE_TEMPLATES:
+            members: np.ndarray = templateMembers(crystal.typeLabels, crystal.moleculeIds, kind)
+            if kind in geometries or not len(members):
+                continue
+            # Molecules may straddle the periodic boundary: unwrap around the first atom
+            positions: np.ndarray = crystal.positions[members[0]]
+            positions = positions[0] + minimumImage(positions - positions[0], crystal.boxLengths)
+            masses: np.ndarray = moleculeMasses(kind)
+            geometries[kind] = positions - masses @ positions / masses.sum()
+    return geometries
+
+
+def moleculeMasses(kind: str) -> np.ndarray:
+    return np.array([ATOMIC_MASSES[label[0]] for label in MOLECULE_TEMPLATES[kind].atomLabels])
+
+
+def moleculeCounts(totalMolecules: int, moleFractions: dict[str, float]) -> dict[str, int]:
+    """
+    Integer molecule counts closest to the mole fractions ({"Nitric": 0.25, "Water": 0.75}) summing to
+    totalMolecules: the remainders of the rounding go to the kinds with the largest fractional parts.
+    """
+    kinds: list[str] = list(moleFractions)
+    fractions: np.ndarray = np.array([moleFractions[kind] for kind in kinds], dtype=np.float64)
+    exactCounts: np.ndarray = totalMolecules * fractions / fractions.sum()
+    counts: np.ndarray = np.floor(exactCounts).astype(np.int64)
+    counts[np.argsort(counts - exactCounts)[: totalMolecules - counts.sum()]] += 1
+    return dict(zip(kinds, counts.tolist()))
+
+
+def randomRotations(count: int, rng: np.random.Generator) -> np.ndarray:
+    """(count, 3, 3) rotation matrices of uniformly distributed random unit quaternions (Shoemake's method)."""
+    u1, u2, u3 = rng.random((3, count))
+    w: np.ndarray = np.sqrt(1 - u1) * np.sin(2 * np.pi * u2)
+    x: np.ndarray = np.sqrt(1 - u1) * np.cos(2 * np.pi * u2)
+    y: np.ndarray = np.sqrt(u1) * np.sin(2 * np.pi * u3)
+    z: np.ndarray = np.sqrt(u1) * np.cos(2 * np.pi * u3)
+    return np.stack(
+        (
+            np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)), axis=-1),
+            np.stack((2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)), axis=-1),
+            np.stack((2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)), axis=-1),
+        ),
+        axis=1,
+    )
+
+
+def packMolecules(
+    counts: dict[str, int],
+    densityGcm3: float,
+    minDistance: float = 1.6,
+    boxAspect: tuple[float, float, float] = (1, 1, 1),
+    maxShift: float = 0.25,
+    maxIterations: int = 1000,
+    seed: int | None = None,
+) -> CrystalStructure:
+    """
+    Amorphous starting configuration of rigid molecules (MOLECULE_TEMPLATES kinds, geometry of
+    moleculeGeometries) at the given mass density, in an orthogonal box of the given aspect ratio.
+
+    Every molecule gets its own site of a lattice with at least as many sites, kinds shuffled over
+    the sites, and a random orientation. Atoms of different molecules closer than minDistance are
+    found with a cell list; then one molecule of every clashing pair gets a new orientation and a
+    shift of up to maxShift site spacings, kept unless it clashes with more molecules than before
+    (moves with as many clashes are kept, so jammed molecules can drift). Molecules never leave
+    the neighbourhood of their site, so the new clashes are searched among the molecules of the
+    nearby sites only. Raises ValueError after maxIterations: lower the density
+    or minDistance. The result has its topology generated and is loaded with
+    loadSystem(structure, asDataFile=True).
+    """
+    unknownKinds: set[str] = set(counts) - set(MOLECULE_TEMPLATES)
+    if unknownKinds:
+        raise ValueError(f"No molecule template for {sorted(unknownKinds)}")
+    rng: np.random.Generator = np.random.default_rng(seed)
+    geometries: dict[str, np.ndarray] = moleculeGeometries()
+    kinds: list[str] = [kind for kind, count in counts.items() if count > 0]
+
+    totalMassG: float = sum(counts[kind] * moleculeMasses(kind).sum() for kind in kinds) / AVOGADRO
+    volume: float = totalMassG / densityGcm3 * 1e24
+    aspect: np.ndarray = np.asarray(boxAspect, dtype=np.float64)
+    boxLengths: np.ndarray = aspect * np.cbrt(volume / aspect.prod())
+
+    moleculeCount: int = sum(counts[kind] for kind in kinds)
+    sitesPerAxis: np.ndarray = np.ceil(boxLengths / np.cbrt(volume / moleculeCount)).astype(np.int64)
+    while sitesPerAxis.prod() < moleculeCount:
+        sitesPerAxis[np.argmin(sitesPerAxis / boxLengths)] += 1
+    siteSpacings: np.ndarray = boxLengths / sitesPerAxis
+    siteOfMolecule: np.ndarray = rng.permutation(int(sitesPerAxis.prod()))[:moleculeCount]
+    moleculeOfSite: np.ndarray = np.full(int(sitesPerAxis.prod()), -1, dtype=np.int64)
+    moleculeOfSite[siteOfMolecule] = np.arange(moleculeCount)
+    siteIndices: np.ndarray = np.column_stack(np.unravel_index(siteOfMolecule, sitesPerAxis))
+    siteCenters: np.ndarray = (siteIndices + 0.5) * siteSpacings
+
+    # One block of molecules per kind, atoms of a molecule contiguous and in template slot order
+    moleculeKinds: np.ndarray = np.repeat(np.arange(len(kinds)), [counts[kind] for kind in kinds])
+    atomsPerMolecule: np.ndarray = np.array([len(MOLECULE_TEMPLATES[kind]) for kind in kinds])[moleculeKinds]
+    firstAtoms: np.ndarray = np.cumsum(atomsPerMolecule) - atomsPerMolecule
+    moleculeOfAtom: np.ndarray = np.repeat(np.arange(moleculeCount), atomsPerMolecule)
+    localPositions: np.ndarray = np.concatenate([np.tile(geometries[kind], (counts[kind], 1)) for kind in kinds])
+    typeLabels: np.ndarray = np.concatenate([np.tile(MOLECULE_TEMPLATES[kind].atomLabels, counts[kind]) for kind in kinds])
+    radii: np.ndarray = np.array([np.linalg.norm(geometries[kind], axis=1).max() for kind in kinds])[moleculeKinds]
+
+    # Site offsets close enough for two shifted molecules to touch
+    reach: float = 2 * radii.max() + minDistance + 2 * maxShift * float(np.linalg.norm(siteSpacings))
+    axisReach: np.ndarray = np.minimum(np.ceil(reach / siteSpacings).astype(np.int64), sitesPerAxis // 2)
+    siteOffsets: np.ndarray = np.array(np.meshgrid(*[np.arange(-count, count + 1) for count in axisReach.tolist()], indexing="ij")).reshape(3, -1).T
+    siteOffsets = siteOffsets[np.linalg.norm(siteOffsets * siteSpacings, axis=1) <= reach]
+
+    def atomsOf(molecules: np.ndarray) -> np.ndarray:
+        # Atoms of a molecule are contiguous: no search over every atom of the box
+        sizes: np.ndarray = atomsPerMolecule[molecules]
+        return np.repeat(firstAtoms[molecules] - np.cumsum(sizes) + sizes, sizes) + np.arange(int(sizes.sum()))
+
+    def placeAtoms(atoms: np.ndarray) -> np.ndarray:
+        return centers[moleculeOfAtom[atoms]] + np.einsum("aij,aj->ai", rotations[moleculeOfAtom[atoms]], localPositions[atoms])
+
+    def uniquePairs(first: np.ndarray, second: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        pairKeys: np.ndarray = np.unique(np.minimum(first, second) * moleculeCount + np.maximum(first, second))
+        return pairKeys // moleculeCount, pairKeys % moleculeCount
+
+    def clashingPairs(molecules: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(molecule, other molecule) pairs with atoms closer than minDistance, once per other molecule of each of molecules."""
+        neighbourSites: np.ndarray = np.ravel_multi_index(((siteIndices[molecules, None, :] + siteOffsets) % sitesPerAxis).transpose(2, 0, 1), sitesPerAxis)
+        first: np.ndarray = np.repeat(molecules, len(siteOffsets))
+        second: np.ndarray = moleculeOfSite[neighbourSites.ravel()]
+        kept: np.ndarray = (second >= 0) & (second != first)
+        first, second = first[kept], second[kept]
+        centerSeparations: np.ndarray = minimumImage(centers[second] - centers[first], boxLengths)
+        touching: np.ndarray = np.einsum("ij,ij->i", centerSeparations, centerSeparations) < (radii[first] + radii[second] + minDistance) ** 2
+        first, second = first[touching], second[touching]
+
+        # Every atom of the first molecule against every atom of the second one
+        pairSizes: np.ndarray = atomsPerMolecule[first] * atomsPerMolecule[second]
+        pairOfAtoms: np.ndarray = np.repeat(np.arange(len(first)), pairSizes)
+        rankInPair: np.ndarray = np.arange(len(pairOfAtoms)) - np.repeat(np.cumsum(pairSizes) - pairSizes, pairSizes)
+        secondSizes: np.ndarray = atomsPerMolecule[second][pairOfAtoms]
+        firstAtomIndices: np.ndarray = firstAtoms[first][pairOfAtoms] + rankInPair // secondSizes
+        secondAtomIndices: np.ndarray = firstAtoms[second][pairOfAtoms] + rankInPair % secondSizes
+        atomSeparations: np.ndarray = minimumImage(positions[secondAtomIndices] - positions[firstAtomIndices], boxLengths)
+        clashing: np.ndarray = pairOfAtoms[np.einsum("ij,ij->i", atomSeparations, atomSeparations) < minDistance**2]
+        # In a small lattice, offsets wrapping around the box reach the same site twice
+        pairKeys: np.ndarray = np.unique(first[clashing] * moleculeCount + second[clashing])
+        return pairKeys // moleculeCount, pairKeys % moleculeCount
+
+    centers: np.ndarray = siteCenters.copy()
+    rotations: np.ndarray = randomRotations(moleculeCount, rng)
+    positions: np.ndarray = placeAtoms(np.arange(len(typeLabels)))
+    i, j, _ = neighbourPairs(positions, boxLengths, minDistance)
+    clashing: np.ndarray = moleculeOfAtom[i] != moleculeOfAtom[j]
+    first, second = uniquePairs(moleculeOfAtom[i[clashing]], moleculeOfAtom[j[clashing]])
+    for _ in range(maxIterations):
+        if not len(first):
+            break
+        clashCounts: np.ndarray = np.bincount(np.concatenate((first, second)), minlength=moleculeCount)
+        moved: np.ndarray = np.unique(np.where(rng.random(len(first)) < 0.5, first, second))
+        movedAtoms: np.ndarray = atomsOf(moved)
+        previousRotations: np.ndarray = rotations[moved]
+        previousCenters: np.ndarray = centers[moved]
+        rotations[moved] = randomRotations(len(moved), rng)
+        centers[moved] = siteCenters[moved] + (rng.random((len(moved), 3)) - 0.5) * 2 * maxShift * siteSpacings
+        positions[movedAtoms] = placeAtoms(movedAtoms)
+
+        # Pairs without a moved molecule were clash-free already
+        first, second = clashingPairs(moved)
+        rejectedMask: np.ndarray = np.bincount(first, minlength=moleculeCount)[moved] > clashCounts[moved]
+        if rejectedMask.any():
+            rejected: np.ndarray = moved[rejectedMask]
+            rejectedAtoms: np.ndarray = atomsOf(rejected)
+            rotations[rejected] = previousRotations[rejectedMask]
+            centers[rejected] = previousCenters[rejectedMask]
+            positions[rejectedAtoms] = placeAtoms(rejectedAtoms)
+            unaffected: np.ndarray = ~(np.isin(first, rejected) | np.isin(second, rejected))
+            rejectedFirst, rejectedSecond = clashingPairs(rejected)
+            first, second = np.concatenate((first[unaffected], rejectedFirst)), np.concatenate((second[unaffected], rejectedSecond))
+        first, second = uniquePairs(first, second)
+    if len(first):
+        raise ValueError(f"{len(first)} molecule pairs still closer than {minDistance} A after {maxIterations} iterations: lower the density or minDistance")
+
+    structure: CrystalStructure = CrystalStructure(
+        typeLabels=typeLabels,
+        positions=positions,
+        moleculeIds=moleculeOfAtom + 1,
+        boxBounds=np.column_stack((np.zeros(3), boxLengths)),
+    )
+    structure.generateTopology()
+    return structure
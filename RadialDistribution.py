@@ -0,0 +1,96 @@
+import numpy as np
+
+from LammPy.CellList import neighbourPairs
+from LammPy.CrystalStructure import CrystalStructure
+from LammPy.TrajectoryReader import TrajectoryReader
+
+
+class RadialDistribution:
+    """
+    Partial radial distribution functions g(r) between type labels, e.g.
+    ("O[Water]", "H[Hydronium]") or ("N[Nitrate]", "O[Water]").
+
+    Frames are added one at a time and only the histograms are kept, so a whole
+    trajectory streams through in constant memory. Each frame is normalised with the
+    volume of the box it is given: the frame's own box for LAMMPS dumps, which keeps NPT
+    trajectories correct, but the fixed structure box for xyz dumps (constant volume only).
+    """
+
+    def __init__(self, labelPairs: list[tuple[str, str]], rMax: float, binWidth: float = 0.02):
+        self.labelPairs: list[tuple[str, str]] = [tuple(pair) for pair in labelPairs]
+        self.rMax: float = rMax
+        self.binEdges: np.ndarray = np.arange(0, rMax + binWidth / 2, binWidth)
+        self.histograms: np.ndarray = np.zeros((len(self.labelPairs), len(self.binEdges) - 1))
+        self.frameCount: int = 0
+
+    @property
+    def r(self) -> np.ndarray:
+        return (self.binEdges[1:] + self.binEdges[:-1]) / 2
+
+    def addFrame(self, positions: np.ndarray, typeLabels: np.ndarray, boxLengths: np.ndarray) -> None:
+        typeLabels = np.asarray(typeLabels, dtype=str)
+        boxLengths = np.asarray(boxLengths, dtype=np.float64)
+        i, j, distances = neighbourPairs(positions, boxLengths, self.rMax)
+        labelsI: np.ndarray = typeLabels[i]
+        labelsJ: np.ndarray = typeLabels[j]
+
+        for pairIndex, (labelA, labelB) in enumerate(self.labelPairs):
+            countA: int = int((typeLabels == labelA).sum())
+            countB: int = int((typeLabels == labelB).sum())
+            if labelA == labelB:
+                selected: np.ndarray = (labelsI == labelA) & (labelsJ == labelA)
+                # Unordered pairs of one species: N(N-1)/2 of them
+                pairCount: float = countA * (countA - 1) / 2
+            else:
+                selected = ((labelsI == labelA) & (labelsJ == labelB)) | ((labelsI == labelB) & (labelsJ == labelA))
+                pairCount = countA * countB
+            if not pairCount:
+                continue
+            counts, _ = np.histogram(distances[selected], bins=self.binEdges)
+            self.histograms[pairIndex] += counts * boxLengths.prod() / pairCount
+        self.frameCount += 1
+
+    def addTrajectory(
+        self,
+        reader: TrajectoryReader,
+        labelAtoms: dict[int, str] | None = None,
+        structure: CrystalStructure | None = None,
+        frames: slice = slice(None),
+    ) -> None:
+        """
+        Add the frames of a dump read by TrajectoryReader.
+        LAMMPS dumps with a type column take their labels from labelAtoms (LammpsScriptFactory.labelAtoms)
+        and their box from each frame; scaled xs ys zs coordinates are mapped through that box.
+        xyz dumps carry no box: labels and box (the change_box bounds) come from structure, so only
+        constant-volume trajectories are normalised correctly. Their atoms must be in id order, which
+        only a single-rank run guarantees.
+        """
+        typeLabels: np.ndarray | None = None
+        if "type" in reader.columns:
+            if labelAtoms is None:
+                raise ValueError("labelAtoms is needed to turn the dump type column into labels")
+            typeIds: np.ndarray = np.array(list(labelAtoms))
+            labelOfType: np.ndarray = np.full(typeIds.max() + 1, "", dtype=object)
+            labelOfType[typeIds] = list(labelAtoms.values())
+            typeColumn: int = reader.columns.index("type")
+        elif structure is None:
+            raise ValueError(f"{reader.trajectoryPath.name} has no type column: pass the structure it was built from")
+        else:
+            if len(structure) != reader.atomCount:
+                raise ValueError(f"Structure has {len(structure)} atoms, trajectory {reader.atomCount}")
+            typeLabels = structure.typeLabels
+
+        for frame in range(*frames.indices(len(reader))):
+            if typeLabels is None:
+                values: np.ndarray = reader[frame]
+                frameLabels: np.ndarray = labelOfType[values[:, typeColumn].astype(np.int64)].astype(str)
+                boxLengths: np.ndarray = reader.boxes[frame, :, 1] - reader.boxes[frame, :, 0]
+                self.addFrame(reader.cartesian(values, frame), frameLabels, boxLengths)
+            else:
+                self.addFrame(reader.positions(frame), typeLabels, structure.boxLengths)
+
+    def result(self) -> dict[tuple[str, str], np.ndarray]:
+        """g(r) of every label pair, averaged over the frames added so far."""
+        shellVolumes: np.ndarray = 4 / 3 * np.pi * np.diff(self.binEdges**3)
+        g: np.ndarray = self.histograms / shellVolumes / max(self.frameCount, 1)
+        return dict(zip(self.labelPairs, g))
@@ -0,0 +1,71 @@
+import threading
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+
+class ThermoRingBuffer:
+    """
+    Bounded in-memory history of thermo rows, filled by LammpsRunner while a run is going.
+    Only the last capacity rows are kept, in a preallocated structured array.
+
+    Driver code can either register callbacks, called on the runner thread with every new row
+    (a callback returning True stops the current run), or iterate over follow() from another
+    thread while the job runs (LammpsRunner.startJobAtPath).
+    """
+
+    def __init__(self, fields: list[str], capacity: int = 1000):
+        self.dtype: np.dtype = np.dtype([("run", "i8"), ("step", "i8")] + [(field, "f8") for field in fields])
+        self.capacity: int = capacity
+        self._rows: np.ndarray = np.zeros(capacity, dtype=self.dtype)
+        # Total number of rows ever appended: row n lives at n % capacity while n >= rowsWritten - capacity
+        self.rowsWritten: int = 0
+        self.closed: bool = False
+        self.callbacks: list[Callable[[np.void], bool | None]] = []
+        self._condition: threading.Condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return min(self.rowsWritten, self.capacity)
+
+    def subscribe(self, callback: Callable[[np.void], bool | None]) -> None:
+        self.callbacks.append(callback)
+
+    def append(self, row: tuple) -> bool:
+        """Store one row and call the callbacks. Returns True when a callback asks to stop the run."""
+        with self._condition:
+            self._rows[self.rowsWritten % self.capacity] = row
+            self.rowsWritten += 1
+            self._condition.notify_all()
+        storedRow: np.void = self._rows[(self.rowsWritten - 1) % self.capacity].copy()
+        stopRequests: list[bool | None] = [callback(storedRow) for callback in self.callbacks]
+        return any(stopRequests)
+
+    def close(self) -> None:
+        """Mark the end of the job: follow() returns once the remaining rows are consumed."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def latest(self, rowCount: int | None = None) -> np.ndarray:
+        """Copy of the last rowCount rows (all the kept ones by default), oldest first."""
+        with self._condition:
+            rowCount = len(self) if rowCount is None else min(rowCount, len(self))
+            rowNumbers: np.ndarray = np.arange(self.rowsWritten - rowCount, self.rowsWritten)
+            return self._rows[rowNumbers % self.capacity].copy()
+
+    def follow(self, timeoutS: float | None = None) -> Iterator[np.void]:
+        """
+        Yield the rows still kept, then every new row as it arrives, until close(). A consumer slower
+        than the run skips the rows already overwritten instead of blocking the simulation.
+        """
+        nextRow: int = max(0, self.rowsWritten - self.capacity)
+        while True:
+            with self._condition:
+                if not self._condition.wait_for(lambda: self.rowsWritten > nextRow or self.closed, timeout=timeoutS):
+                    return
+                if self.rowsWritten <= nextRow:
+                    return
+                nextRow = max(nextRow, self.rowsWritten - self.capacity)
+                row: np.void = self._rows[nextRow % self.capacity].copy()
+            nextRow += 1
+            yield row
@@ -0,0 +1,120 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from pathlib import Path
+
+from LammPy.LammpsScriptBuilder import LammpsScriptFactory
+
+
+class TemperatureSweep:
+    """
+    Cp campaign split into independent jobs: one relaxation job writes a shared restart,
+    then every temperature restarts from it in its own directory and process.
+
+    sweepDirectory/
+        relax/relax.lammps          -> output/Relaxed.restart
+        T<temp>K/T<temp>K.lammps    -> output/DataWritingT<temp>.csv
+        collected/                  <- every job's CSV, prefixed with the job name
+    """
+
+    relaxJobName: str = "relax"
+    restartFileName: str = "Relaxed.restart"
+
+    def __init__(
+        self,
+        factory: LammpsScriptFactory,
+        sweepDirectory: str,
+        relaxTempK: float = 5,
+        relaxDurationPs: int = 5,
+        PressureBar: float = 1.0,
+    ):
+        self.factory: LammpsScriptFactory = factory
+        self.sweepDirectory: Path = Path(sweepDirectory)
+        self.relaxTempK: float = relaxTempK
+        self.relaxDurationPs: int = relaxDurationPs
+        self.PressureBar: float = PressureBar
+
+    @staticmethod
+    def jobName(TempK: float) -> str:
+        return f"T{TempK:g}K"
+
+    def writeJobs(
+        self,
+        temperaturesK: list[float],
+        diffTempK: float = 5,
+        fixDurationPs: int = 10,
+    ) -> list[Path]:
+        """Write the relaxation script and one script per temperature. Returns the job scripts, relaxation first."""
+        relaxFactory: LammpsScriptFactory = deepcopy(self.factory)
+        relaxFactory.fixes = []
+        relaxFactory.addNVT(Temp1K=self.relaxTempK, Temp2K=self.relaxTempK, fixDurationPs=self.relaxDurationPs, production=False)
+        relaxFactory.addNPT(
+            Temp1K=self.relaxTempK, Temp2K=self.relaxTempK, PressureBar=self.PressureBar, fixDurationPs=self.relaxDurationPs, production=False
+        )
+        relaxFactory.writeRestart(f"./output/{self.restartFileName}")
+        jobScripts: list[Path] = [self._writeJob(relaxFactory, self.relaxJobName)]
+
+        for TempK in temperaturesK:
+            temperatureFactory: LammpsScriptFactory = deepcopy(self.factory)
+            temperatureFactory.fixes = []
+            temperatureFactory.loadRestart(f"../{self.relaxJobName}/output/{self.restartFileName}")
+            temperatureFactory.addCpMeasurement(TempK=TempK, diffTempK=diffTempK, PressureBar=self.PressureBar, fixDurationPs=fixDurationPs)
+            jobScripts.append(self._writeJob(temperatureFactory, self.jobName(TempK)))
+        return jobScripts
+
+    def _writeJob(self, factory: LammpsScriptFactory, jobName: str) -> Path:
+        jobDirectory: Path = self.sweepDirectory / jobName
+        jobDirectory.mkdir(parents=True, exist_ok=True)
+        scriptPath: Path = jobDirectory / f"{jobName}.lammps"
+        factory.buildJobAtPath(scriptPath.as_posix())
+        return scriptPath
+
+    @staticmethod
+    def launchCommand(scriptPath: Path, ranksPerJob: int, lammpsExecutable: str, mpiLauncher: str) -> list[str]:
+        command: list[str] = [lammpsExecutable, "-in", scriptPath.name]
+        if ranksPerJob > 1:
+            command = [mpiLauncher, "-np", str(ranksPerJob)] + command
+        return command
+
+    def run(
+        self,
+        temperaturesK: list[float],
+        ranksPerJob: int = 1,
+        maxParallelJobs: int | None = None,
+        diffTempK: float = 5,
+        fixDurationPs: int = 10,
+        lammpsExecutable: str = "lmp",
+        mpiLauncher: str = "mpirun",
+    ) -> Path:
+        """
+        Write and run the sweep: relaxation first, then the temperatures through a local pool
+        of LAMMPS processes (ranksPerJob MPI ranks each, all cores used by default).
+        Returns the directory holding the collected CSV files.
+        """
+        relaxScript, *temperatureScripts = self.writeJobs(temperaturesK, diffTempK=diffTempK, fixDurationPs=fixDurationPs)
+        if maxParallelJobs is None:
+            maxParallelJobs = max(1, (os.cpu_count() or 1) // ranksPerJob)
+
+        def runJob(scriptPath: Path) -> None:
+            subprocess.run(
+                self.launchCommand(scriptPath, ranksPerJob, lammpsExecutable, mpiLauncher),
+                cwd=scriptPath.parent,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+
+        runJob(relaxScript)
+        # Each worker only waits on its LAMMPS subprocess, so threads are enough to drive the pool
+        with ThreadPoolExecutor(max_workers=maxParallelJobs) as pool:
+            list(pool.map(runJob, temperatureScripts))
+        return self.collectOutputs()
+
+    def collectOutputs(self) -> Path:
+        collectedDirectory: Path = self.sweepDirectory / "collected"
+        collectedDirectory.mkdir(parents=True, exist_ok=True)
+        for csvFile in sorted(self.sweepDirectory.glob("*/output/*.csv")):
+            jobName: str = csvFile.parent.parent.name
+            shutil.copyfile(csvFile, collectedDirectory / f"{jobName}_{csvFile.name}")
+        return collectedDirectory
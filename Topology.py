@@ -0,0 +1,159 @@
+import numpy as np
+
+
+def findMoleculeIds(atomCount: int, bonds: np.ndarray) -> np.ndarray:
+    """
+    Connected components of the bond graph, computed on integer atom indices.
+
+    bonds: (M, 2) array of 0-based atom indices.
+    Returns one 1-based molecule id per atom; molecules are numbered in order of their
+    lowest atom index, and an atom without any bond forms its own molecule.
+
+    Vectorized union-find (hook and compress): every root is hooked onto the smallest
+    root it is bonded to, then pointer jumping flattens the forest. No recursion, so
+    long chains do not hit the interpreter's recursion limit.
+    """
+    parent: np.ndarray = np.arange(atomCount, dtype=np.int64)
+    bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+
+    while True:
+        rootsA: np.ndarray = parent[bonds[:, 0]]
+        rootsB: np.ndarray = parent[bonds[:, 1]]
+        unmerged: np.ndarray = rootsA != rootsB
+        if not unmerged.any():
+            break
+        lowRoots: np.ndarray = np.minimum(rootsA[unmerged], rootsB[unmerged])
+        highRoots: np.ndarray = np.maximum(rootsA[unmerged], rootsB[unmerged])
+        np.minimum.at(parent, highRoots, lowRoots)
+        while True:
+            grandParent: np.ndarray = parent[parent]
+            if np.array_equal(grandParent, parent):
+                break
+            parent = grandParent
+
+    _, moleculeIds = np.unique(parent, return_inverse=True)
+    return moleculeIds.astype(np.int64) + 1
+
+
+class MoleculeTemplate:
+    """
+    Atom slots of one molecule kind with its bonds and angles, given as slot indices
+    and the bond/angle type labels of LammpsScriptFactory.labelBonds/labelAngles.
+    """
+
+    def __init__(
+        self,
+        atomLabels: tuple[str, ...],
+        bonds: tuple[tuple[int, int, str], ...],
+        angles: tuple[tuple[int, int, int, str], ...],
+    ):
+        self.atomLabels: tuple[str, ...] = atomLabels
+        self.bonds: tuple[tuple[int, int, str], ...] = bonds
+        self.angles: tuple[tuple[int, int, int, str], ...] = angles
+
+    def __len__(self) -> int:
+        return len(self.atomLabels)
+
+
+MOLECULE_TEMPLATES: dict[str, MoleculeTemplate] = {
+    "Water": MoleculeTemplate(
+        atomLabels=("O[Water]", "H[Water]", "H[Water]"),
+        bonds=((0, 1, "OH[Water]"), (0, 2, "OH[Water]")),
+        angles=((1, 0, 2, "HOH[Water]"),),
+    ),
+    # Slot 1 is the O1 trans to the hydrogen, slot 2 the cis one (reordered from the geometry)
+    "Nitric": MoleculeTemplate(
+        atomLabels=("N[Nitric]", "O1[Nitric]", "O1[Nitric]", "O2[Nitric]", "H[Nitric]"),
+        bonds=((0, 1, "NO[Nitric]"), (0, 2, "NO[Nitric]"), (0, 3, "NO[Nitric]"), (3, 4, "OH[Nitric]")),
+        angles=((1, 0, 2, "ONO_1[Nitric]"), (1, 0, 3, "ONO_2[Nitric]"), (2, 0, 3, "ONO_3[Nitric]"), (0, 3, 4, "NOH[Nitric]")),
+    ),
+    "Hydronium": MoleculeTemplate(
+        atomLabels=("O[Hydronium]", "H[Hydronium]", "H[Hydronium]", "H[Hydronium]"),
+        bonds=((0, 1, "OH[Hydronium]"), (0, 2, "OH[Hydronium]"), (0, 3, "OH[Hydronium]")),
+        angles=((1, 0, 2, "HOH[Hydronium]"), (1, 0, 3, "HOH[Hydronium]"), (2, 0, 3, "HOH[Hydronium]")),
+    ),
+    "Nitrate": MoleculeTemplate(
+        atomLabels=("N[Nitrate]", "O[Nitrate]", "O[Nitrate]", "O[Nitrate]"),
+        bonds=((0, 1, "NO[Nitrate]"), (0, 2, "NO[Nitrate]"), (0, 3, "NO[Nitrate]")),
+        angles=((1, 0, 2, "ONO[Nitrate]"), (1, 0, 3, "ONO[Nitrate]"), (2, 0, 3, "ONO[Nitrate]")),
+    ),
+}
+
+
+def moleculeKindOf(typeLabels: np.ndarray) -> np.ndarray:
+    """'O[Water]' -> 'Water', vectorized over an array of type labels."""
+    return np.char.rstrip(np.char.partition(np.asarray(typeLabels, dtype=str), "[")[:, 2], "]")
+
+
+def minimumImage(vectors: np.ndarray, boxLengths: np.ndarray) -> np.ndarray:
+    return vectors - boxLengths * np.round(vectors / boxLengths)
+
+
+def templateMembers(typeLabels: np.ndarray, moleculeIds: np.ndarray, kind: str) -> np.ndarray:
+    """
+    (nMolecules, templateSize) atom indices of every molecule of one kind,
+    columns ordered like the template slots.
+    """
+    template: MoleculeTemplate = MOLECULE_TEMPLATES[kind]
+    slotOrder: dict[str, int] = {}
+    for slot, label in enumerate(template.atomLabels):
+        slotOrder.setdefault(label, slot)
+
+    atomIndices: np.ndarray = np.flatnonzero(moleculeKindOf(typeLabels) == kind)
+    if not len(atomIndices):
+        return np.empty((0, len(template)), dtype=np.int64)
+    uniqueLabels, labelIndices = np.unique(typeLabels[atomIndices], return_inverse=True)
+    slotRanks: np.ndarray = np.array([slotOrder.get(label, len(template)) for label in uniqueLabels.tolist()])[labelIndices]
+    atomIndices = atomIndices[np.lexsort((atomIndices, slotRanks, moleculeIds[atomIndices]))]
+
+    _, atomCounts = np.unique(moleculeIds[atomIndices], return_counts=True)
+    if (atomCounts != len(template)).any():
+        raise ValueError(f"{kind} molecules do not match the template {template.atomLabels}")
+    members: np.ndarray = atomIndices.reshape(-1, len(template))
+    if (typeLabels[members] != np.array(template.atomLabels)).any():
+        raise ValueError(f"{kind} molecules do not match the template {template.atomLabels}")
+    return members
+
+
+def buildTopology(
+    typeLabels: np.ndarray,
+    moleculeIds: np.ndarray,
+    positions: np.ndarray,
+    boxLengths: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bonds and angles of every molecule from MOLECULE_TEMPLATES.
+    Returns (bonds, bondLabels, angles, angleLabels), atoms as 0-based indices.
+    """
+    typeLabels = np.asarray(typeLabels, dtype=str)
+    bondBlocks: list[np.ndarray] = []
+    bondLabelBlocks: list[np.ndarray] = []
+    angleBlocks: list[np.ndarray] = []
+    angleLabelBlocks: list[np.ndarray] = []
+
+    unknownKinds: set[str] = set(np.unique(moleculeKindOf(typeLabels)).tolist()) - set(MOLECULE_TEMPLATES)
+    if unknownKinds:
+        raise ValueError(f"No molecule template for {sorted(unknownKinds)}")
+
+    for kind, template in MOLECULE_TEMPLATES.items():
+        members: np.ndarray = templateMembers(typeLabels, moleculeIds, kind)
+        if not len(members):
+            continue
+        if kind == "Nitric":
+            # The O1 closest to the hydrogen is cis (ONO_3), the other one trans (ONO_2)
+            hydrogens: np.ndarray = positions[members[:, 4]]
+            firstDistance: np.ndarray = np.linalg.norm(minimumImage(positions[members[:, 1]] - hydrogens, boxLengths), axis=1)
+            secondDistance: np.ndarray = np.linalg.norm(minimumImage(positions[members[:, 2]] - hydrogens, boxLengths), axis=1)
+            swapped: np.ndarray = firstDistance < secondDistance
+            members[swapped, 1:3] = members[swapped][:, [2, 1]]
+
+        bondSlots: np.ndarray = np.array([bond[:2] for bond in template.bonds])
+        bondBlocks.append(members[:, bondSlots].reshape(-1, 2))
+        bondLabelBlocks.append(np.tile([bond[2] for bond in template.bonds], len(members)))
+        angleSlots: np.ndarray = np.array([angle[:3] for angle in template.angles])
+        angleBlocks.append(members[:, angleSlots].reshape(-1, 3))
+        angleLabelBlocks.append(np.tile([angle[3] for angle in template.angles], len(members)))
+
+    if not bondBlocks:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=str), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=str)
+    return np.concatenate(bondBlocks), np.concatenate(bondLabelBlocks), np.concatenate(angleBlocks), np.concatenate(angleLabelBlocks)
@@ -0,0 +1,189 @@
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+
+NEWLINE: int = ord("\n")
+INDEX_CHUNK_BYTES: int = 64 * 1024 * 1024
+
+
+class TrajectoryReader:
+    """
+    Random access to the text trajectories written by LammpsScriptFactory
+    (dump xyz, or atom/custom dumps such as Trajectory.lammpstrj).
+
+    The first opening scans the file once, in fixed-size chunks, and saves the byte offsets of
+    every frame in a <trajectory>.index.npz sidecar; later openings only load that index.
+    Frames are read through mmap: rawFrame returns a zero-copy uint8 view of the atom lines and
+    indexing returns the parsed (nAtoms, nColumns) values of one frame, or (nFrames, nAtoms, nColumns) of a slice.
+    Compressed (.gz) and binary (.bin) dumps cannot be memory-mapped and are rejected.
+    """
+
+    def __init__(self, trajectoryPath: str, rebuildIndex: bool = False):
+        self.trajectoryPath: Path = Path(trajectoryPath)
+        if self.trajectoryPath.suffix in (".gz", ".bin"):
+            raise ValueError(f"{self.trajectoryPath.name}: only uncompressed text dumps can be memory-mapped")
+        self.indexPath: Path = self.trajectoryPath.with_name(self.trajectoryPath.name + ".index.npz")
+        if self.trajectoryPath.stat().st_size == 0:
+            raise ValueError(f"{self.trajectoryPath.name} is empty: no frame has been dumped yet")
+
+        self._file = open(self.trajectoryPath, "rb")
+        self._map: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._bytes: np.ndarray = np.frombuffer(self._map, dtype=np.uint8)
+        self.isXyz: bool = not self._map[:14].startswith(b"ITEM: TIMESTEP")
+
+        fileStat: os.stat_result = self.trajectoryPath.stat()
+        if rebuildIndex or not self._loadIndex(fileStat):
+            self._buildIndex()
+            try:
+                np.savez(
+                    self.indexPath,
+                    frameOffsets=self.frameOffsets,
+                    dataOffsets=self.dataOffsets,
+                    dataEnds=self.dataEnds,
+                    timesteps=self.timesteps,
+                    boxes=self.boxes,
+                    columns=np.array(self.columns),
+                    atomCount=self.atomCount,
+                    fileSize=fileStat.st_size,
+                    fileMtime=fileStat.st_mtime_ns,
+                )
+            except OSError:
+                # Read-only directory: keep the in-memory index, the next opening scans again
+                pass
+
+    def _loadIndex(self, fileStat: os.stat_result) -> bool:
+        if not self.indexPath.exists():
+            return False
+        with np.load(self.indexPath) as index:
+            if int(index["fileSize"]) != fileStat.st_size or int(index["fileMtime"]) != fileStat.st_mtime_ns:
+                return False
+            self.frameOffsets: np.ndarray = index["frameOffsets"]
+            self.dataOffsets: np.ndarray = index["dataOffsets"]
+            self.dataEnds: np.ndarray = index["dataEnds"]
+            self.timesteps: np.ndarray = index["timesteps"]
+            self.boxes: np.ndarray = index["boxes"]
+            self.columns: list[str] = index["columns"].tolist()
+            self.atomCount: int = int(index["atomCount"])
+        return True
+
+    def _readLines(self, offset: int, lineCount: int) -> list[bytes]:
+        lines: list[bytes] = []
+        for _ in range(lineCount):
+            end: int = self._map.find(b"\n", offset)
+            end = len(self._map) if end < 0 else end
+            lines.append(self._map[offset:end])
+            offset = end + 1
+        return lines
+
+    def _buildIndex(self) -> None:
+        # xyz frame: count, comment, atoms. LAMMPS dump: 9 ITEM/header lines, atoms.
+        if self.isXyz:
+            headerLineCount: int = 2
+            self.atomCount = int(self._readLines(0, 1)[0])
+            self.columns = ["element", "x", "y", "z"]
+        else:
+            headerLineCount = 9
+            header: list[bytes] = self._readLines(0, headerLineCount)
+            self.atomCount = int(header[3])
+            self.columns = header[8].decode().split()[2:]
+        frameLineCount: int = self.atomCount + headerLineCount
+
+        frameOffsets: list[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+        dataOffsets: list[np.ndarray] = []
+        linesSeen: int = 0
+        for chunkStart in range(0, len(self._bytes), INDEX_CHUNK_BYTES):
+            newlines: np.ndarray = np.flatnonzero(self._bytes[chunkStart : chunkStart + INDEX_CHUNK_BYTES] == NEWLINE) + chunkStart
+            nextLineIndices: np.ndarray = np.arange(linesSeen + 1, linesSeen + 1 + len(newlines)) % frameLineCount
+            frameOffsets.append(newlines[nextLineIndices == 0] + 1)
+            dataOffsets.append(newlines[nextLineIndices == headerLineCount] + 1)
+            linesSeen += len(newlines)
+
+        starts: np.ndarray = np.concatenate(frameOffsets)
+        self.dataOffsets = np.concatenate(dataOffsets)
+        # The last start is the end of file (or of an incomplete frame still being written)
+        completeFrames: int = min(len(starts) - 1, len(self.dataOffsets))
+        self.frameOffsets = starts[:completeFrames]
+        self.dataOffsets = self.dataOffsets[:completeFrames]
+        self.dataEnds = starts[1 : completeFrames + 1]
+
+        self.timesteps = np.zeros(completeFrames, dtype=np.int64)
+        self.boxes = np.zeros((completeFrames, 3, 2), dtype=np.float64)
+        for frame, frameOffset in enumerate(self.frameOffsets.tolist()):
+            header = self._readLines(frameOffset, headerLineCount)
+            if self.isXyz:
+                if int(header[0]) != self.atomCount:
+                    raise ValueError(f"Frame {frame} has {int(header[0])} atoms instead of {self.atomCount}")
+                self.timesteps[frame] = int(header[1].rsplit(b":", 1)[-1]) if b"Timestep" in header[1] else frame
+            else:
+                if int(header[3]) != self.atomCount:
+                    raise ValueError(f"Frame {frame} has {int(header[3])} atoms instead of {self.atomCount}")
+                self.timesteps[frame] = int(header[1])
+                self.boxes[frame] = [line.split()[:2] for line in header[5:8]]
+
+    def __len__(self) -> int:
+        return len(self.frameOffsets)
+
+    def __enter__(self) -> "TrajectoryReader":
+        return self
+
+    def __exit__(self, *exceptionInfo) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the memory map. Raises BufferError while views returned by rawFrame are still
+        referenced: delete them first, or take rawFrame(frame).copy() to keep the bytes.
+        """
+        del self._bytes
+        self._map.close()
+        self._file.close()
+
+    def rawFrame(self, frame: int) -> np.ndarray:
+        """Zero-copy view of the atom lines of one frame, straight from the memory map; it blocks close() while alive."""
+        return self._bytes[self.dataOffsets[frame] : self.dataEnds[frame]]
+
+    def _parse(self, rawBytes: np.ndarray, frameCount: int) -> np.ndarray:
+        fields: np.ndarray = np.array(rawBytes.tobytes().split()).reshape(frameCount, self.atomCount, len(self.columns))
+        if self.isXyz:
+            fields = fields[:, :, 1:]
+        return fields.astype(np.float64)
+
+    def __getitem__(self, frames: int | slice) -> np.ndarray:
+        if isinstance(frames, slice):
+            frameBlocks: list[np.ndarray] = [self.rawFrame(frame) for frame in range(*frames.indices(len(self)))]
+            if not frameBlocks:
+                return np.empty((0, self.atomCount, len(self.columns) - self.isXyz))
+            return self._parse(np.concatenate(frameBlocks), len(frameBlocks))
+        return self._parse(self.rawFrame(frames), 1)[0]
+
+    def elements(self, frame: int = 0) -> np.ndarray:
+        """Element symbols of an xyz frame."""
+        return np.array(self.rawFrame(frame).tobytes().split()[:: len(self.columns)]).astype(str)
+
+    @property
+    def coordinateColumns(self) -> list[int]:
+        """Column indices of x y z in xyz dumps, of the first x/xu/xs triplet in LAMMPS dumps (element column excluded)."""
+        if self.isXyz:
+            return [0, 1, 2]
+        for names in (("x", "y", "z"), ("xu", "yu", "zu"), ("xs", "ys", "zs")):
+            if set(names) <= set(self.columns):
+                return [self.columns.index(name) for name in names]
+        raise ValueError(f"No coordinate columns in {self.columns}")
+
+    @property
+    def scaledCoordinates(self) -> bool:
+        """True when coordinateColumns are the box fractions xs ys zs (dump atom and atom/gz)."""
+        return not self.isXyz and self.columns[self.coordinateColumns[0]] == "xs"
+
+    def cartesian(self, values: np.ndarray, frame: int) -> np.ndarray:
+        """(nAtoms, 3) Cartesian coordinates in A from the parsed values of one frame; scaled ones are mapped through that frame's box."""
+        coordinates: np.ndarray = values[:, self.coordinateColumns]
+        if not self.scaledCoordinates:
+            return coordinates
+        return self.boxes[frame, :, 0] + coordinates * (self.boxes[frame, :, 1] - self.boxes[frame, :, 0])
+
+    def positions(self, frame: int) -> np.ndarray:
+        """(nAtoms, 3) Cartesian coordinates of one frame."""
+        return self.cartesian(self[frame], frame)
@@ -0,0 +1,208 @@
+import subprocess
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+
+from LammPy.LammpsScriptBuilder import LammpsScriptFactory
+from LammPy.LogParser import parseLog
+from LammPy.TemperatureSweep import TemperatureSweep
+from LammPy.TrajectoryReader import TrajectoryReader
+
+REFERENCE_SETTING: tuple[str, str | None] = ("lj/cut/coul/long 12", "pppm 1e-6")
+
+
+def runTrials(scriptPaths: list[Path], ranks: int, lammpsExecutable: str, mpiLauncher: str) -> None:
+    """Run the trial scripts one after the other, each from its own directory, so that timings do not compete."""
+    for scriptPath in scriptPaths:
+        subprocess.run(
+            TemperatureSweep.launchCommand(scriptPath, ranks, lammpsExecutable, mpiLauncher),
+            cwd=scriptPath.parent,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+def wolfSettings(dampings: list[float], cutoffs: list[float]) -> list[tuple[str, str | None]]:
+    return [(f"lj/cut/coul/wolf {damping:g} {cutoff:g}", None) for damping in dampings for cutoff in cutoffs]
+
+
+def pppmSettings(cutoffs: list[float], accuracies: list[float]) -> list[tuple[str, str | None]]:
+    return [(f"lj/cut/coul/long {cutoff:g}", f"pppm {accuracy:g}") for cutoff in cutoffs for accuracy in accuracies]
+
+
+class PairStyleTuner:
+    """
+    Trial runs of (pair_style, kspace_style) settings on the factory's system. Each trial evaluates the
+    forces and potential energy of the starting configuration, then times a short NVT stage.
+    Errors are measured against REFERENCE_SETTING (coul/long with a tight PPPM accuracy):
+    forceError = RMS(F - Fref) / RMS(Fref), energyError = |pe - pe_ref| in kcal/mol per atom.
+
+    tuningDirectory/
+        trial<index>/trial.lammps   -> output/Forces.dump, output/PotentialEnergy.txt, log.lammps
+    """
+
+    def __init__(
+        self,
+        factory: LammpsScriptFactory,
+        tuningDirectory: str,
+        settings: list[tuple[str, str | None]] | None = None,
+        reference: tuple[str, str | None] = REFERENCE_SETTING,
+        trialDurationPs: float = 0.5,
+        TempK: float = 100,
+    ):
+        self.factory: LammpsScriptFactory = factory
+        self.tuningDirectory: Path = Path(tuningDirectory)
+        self.settings: list[tuple[str, str | None]] = (
+            wolfSettings([0.15, 0.2, 0.25], [8, 9, 10, 12]) + pppmSettings([8, 10, 12], [1e-4, 1e-5]) if settings is None else settings
+        )
+        self.reference: tuple[str, str | None] = reference
+        self.trialDurationPs: float = trialDurationPs
+        self.TempK: float = TempK
+        self.results: np.ndarray | None = None
+
+    def _writeTrial(self, trialIndex: int, pairStyle: str, kspaceStyle: str | None) -> Path:
+        trialFactory: LammpsScriptFactory = deepcopy(self.factory)
+        trialFactory.pairStyle = pairStyle
+        trialFactory.kspaceStyle = kspaceStyle
+        trialFactory.fixes = []
+        trialFactory.setTrajectoryDump(productionOnly=True)
+        trialFactory.addForceEvaluation()
+        trialFactory.addNVT(Temp1K=self.TempK, Temp2K=self.TempK, fixDurationPs=self.trialDurationPs, production=False)
+        trialDirectory: Path = self.tuningDirectory / f"trial{trialIndex}"
+        trialDirectory.mkdir(parents=True, exist_ok=True)
+        scriptPath: Path = trialDirectory / "trial.lammps"
+        trialFactory.buildJobAtPath(scriptPath.as_posix())
+        return scriptPath
+
+    @staticmethod
+    def _readTrial(trialDirectory: Path) -> tuple[np.ndarray, float, float]:
+        """(forces, potential energy, timesteps/s of the NVT stage) of a finished trial."""
+        with TrajectoryReader((trialDirectory / "output" / "Forces.dump").as_posix()) as reader:
+            forces: np.ndarray = reader[0][:, [reader.columns.index(column) for column in ("fx", "fy", "fz")]]
+        with open(trialDirectory / "output" / "PotentialEnergy.txt") as file:
+            potentialEnergy: float = float(file.read().split()[0])
+        runs: np.ndarray = parseLog((trialDirectory / "log.lammps").as_posix())
+        timedRuns: np.ndarray = runs[runs["steps"] > 0]
+        return forces, potentialEnergy, float(timedRuns["steps"].sum() / timedRuns["loopSeconds"].sum())
+
+    def run(self, ranks: int = 1, lammpsExecutable: str = "lmp", mpiLauncher: str = "mpirun") -> np.ndarray:
+        """
+        Run the reference then every setting, one at a time. Returns one row per setting
+        (pairStyle, kspaceStyle, forceError, energyError, timestepsPerSecond), also kept in results.
+        """
+        trialSettings: list[tuple[str, str | None]] = [self.reference] + self.settings
+        runTrials(
+            [self._writeTrial(trialIndex, pairStyle, kspaceStyle) for trialIndex, (pairStyle, kspaceStyle) in enumerate(trialSettings)],
+            ranks,
+            lammpsExecutable,
+            mpiLauncher,
+        )
+
+        referenceForces, referenceEnergy, _ = self._readTrial(self.tuningDirectory / "trial0")
+        referenceRms: float = float(np.sqrt((referenceForces**2).sum(axis=1).mean()))
+        self.results = np.zeros(
+            len(self.settings),
+            dtype=[("pairStyle", "U64"), ("kspaceStyle", "U64"), ("forceError", "f8"), ("energyError", "f8"), ("timestepsPerSecond", "f8")],
+        )
+        for row, (pairStyle, kspaceStyle) in enumerate(self.settings):
+            forces, potentialEnergy, timestepsPerSecond = self._readTrial(self.tuningDirectory / f"trial{row + 1}")
+            self.results[row] = (
+                pairStyle,
+                kspaceStyle or "",
+                np.sqrt(((forces - referenceForces) ** 2).sum(axis=1).mean()) / referenceRms,
+                abs(potentialEnergy - referenceEnergy),
+                timestepsPerSecond,
+            )
+        return self.results
+
+    def best(self, forceTolerance: float = 0.01, energyTolerance: float = 0.01) -> tuple[str, str | None]:
+        """Fastest setting whose errors are within the tolerances, as (pairStyle, kspaceStyle)."""
+        if self.results is None:
+            raise ValueError("run the tuner first")
+        accepted: np.ndarray = self.results[(self.results["forceError"] <= forceTolerance) & (self.results["energyError"] <= energyTolerance)]
+        if not len(accepted):
+            raise ValueError(f"No setting within forceError <= {forceTolerance} and energyError <= {energyTolerance}")
+        fastest: np.void = accepted[np.argmax(accepted["timestepsPerSecond"])]
+        return str(fastest["pairStyle"]), str(fastest["kspaceStyle"]) or None
+
+    def applyBest(self, forceTolerance: float = 0.01, energyTolerance: float = 0.01) -> tuple[str, str | None]:
+        """Set the fastest accepted setting on the factory. Returns it."""
+        self.factory.pairStyle, self.factory.kspaceStyle = self.best(forceTolerance, energyTolerance)
+        return self.factory.pairStyle, self.factory.kspaceStyle
+
+
+class NeighborTuner:
+    """
+    Trial NVT runs over neighbor skins and neigh_modify every/delay/check settings.
+    The fastest setting without any dangerous neighbor list build in log.lammps wins. With check no
+    LAMMPS does not count dangerous builds, so those settings are never proven safe and only pass
+    through the rebuilds argument, not the default grid.
+
+    tuningDirectory/
+        neighbor<index>/neighbor.lammps  -> log.lammps
+    """
+
+    def __init__(
+        self,
+        factory: LammpsScriptFactory,
+        tuningDirectory: str,
+        skins: list[float] | None = None,
+        rebuilds: list[tuple[int, int, bool]] | None = None,
+        trialDurationPs: float = 1,
+        TempK: float = 100,
+    ):
+        self.factory: LammpsScriptFactory = factory
+        self.tuningDirectory: Path = Path(tuningDirectory)
+        self.skins: list[float] = [1.0, 1.5, 2.0, 2.5, 3.0] if skins is None else skins
+        # (every, delay, check)
+        self.rebuilds: list[tuple[int, int, bool]] = [(1, 0, True), (2, 0, True), (5, 0, True), (10, 0, True)] if rebuilds is None else rebuilds
+        self.trialDurationPs: float = trialDurationPs
+        self.TempK: float = TempK
+        self.results: np.ndarray | None = None
+
+    def _writeTrial(self, trialIndex: int, skin: float, every: int, delay: int, check: bool) -> Path:
+        trialFactory: LammpsScriptFactory = deepcopy(self.factory)
+        trialFactory.setNeighborList(skin, every, delay, check)
+        trialFactory.fixes = []
+        trialFactory.setTrajectoryDump(productionOnly=True)
+        trialFactory.addNVT(Temp1K=self.TempK, Temp2K=self.TempK, fixDurationPs=self.trialDurationPs, production=False)
+        trialDirectory: Path = self.tuningDirectory / f"neighbor{trialIndex}"
+        trialDirectory.mkdir(parents=True, exist_ok=True)
+        scriptPath: Path = trialDirectory / "neighbor.lammps"
+        trialFactory.buildJobAtPath(scriptPath.as_posix())
+        return scriptPath
+
+    def run(self, ranks: int = 1, lammpsExecutable: str = "lmp", mpiLauncher: str = "mpirun") -> np.ndarray:
+        """
+        One row per setting (skin, every, delay, check, timestepsPerSecond, neighborBuilds, dangerousBuilds), also kept in results.
+        dangerousBuilds is NaN when the runs did not check them.
+        """
+        trials: list[tuple[float, int, int, bool]] = [(skin, *rebuild) for skin in self.skins for rebuild in self.rebuilds]
+        runTrials([self._writeTrial(trialIndex, *trial) for trialIndex, trial in enumerate(trials)], ranks, lammpsExecutable, mpiLauncher)
+
+        self.results = np.zeros(
+            len(trials),
+            dtype=[("skin", "f8"), ("every", "i8"), ("delay", "i8"), ("check", "?"), ("timestepsPerSecond", "f8"), ("neighborBuilds", "f8"), ("dangerousBuilds", "f8")],
+        )
+        for trialIndex, trial in enumerate(trials):
+            runs: np.ndarray = parseLog((self.tuningDirectory / f"neighbor{trialIndex}" / "log.lammps").as_posix())
+            self.results[trialIndex] = trial + (
+                runs["steps"].sum() / runs["loopSeconds"].sum(),
+                np.nansum(runs["neighborBuilds"]),
+                runs["dangerousBuilds"].sum(),
+            )
+        return self.results
+
+    def applyBest(self) -> tuple[float, int, int, bool]:
+        """Set the fastest checked setting without dangerous builds on the factory. Returns (skin, every, delay, check)."""
+        if self.results is None:
+            raise ValueError("run the tuner first")
+        # NaN (not checked) never equals 0
+        safe: np.ndarray = self.results[self.results["check"] & (self.results["dangerousBuilds"] == 0)]
+        if not len(safe):
+            raise ValueError("No checked neighbor setting was free of dangerous builds: try larger skins or check yes")
+        fastest: np.void = safe[np.argmax(safe["timestepsPerSecond"])]
+        best: tuple[float, int, int, bool] = (float(fastest["skin"]), int(fastest["every"]), int(fastest["delay"]), bool(fastest["check"]))
+        self.factory.setNeighborList(*best)
+        return best
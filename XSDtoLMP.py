@@ -1,10 +1,68 @@
 import re
+import xml.etree.ElementTree as ElementTree
+from array import array
 from io import StringIO
 
-from Python.ChemPy.AtomicSystems import Atom, MolecularSystem, Molecule
+import numpy as np
+
+from LammPy.CrystalStructure import CrystalStructure
+from LammPy.Topology import findMoleculeIds
+from Python.ChemPy.AtomicSystems import Atom, Molecule
 from Python.FileTypes.File import File
 
 
+class XSDStructure:
+    """
+    Atomes, liaisons et vecteurs de maille lus en une seule passe dans un fichier XSD.
+    Les liaisons sont des paires d'indices dans les tableaux d'atomes (et non des ID XSD).
+    """
+
+    def __init__(
+        self,
+        xsdIds: np.ndarray,
+        labelCodes: np.ndarray,
+        labelTable: list[str],
+        fractionalPositions: np.ndarray,
+        bonds: np.ndarray,
+        cellVectors: np.ndarray,
+    ):
+        self.xsdIds: np.ndarray = xsdIds
+        self.labelCodes: np.ndarray = labelCodes
+        self.labelTable: list[str] = labelTable
+        self.fractionalPositions: np.ndarray = fractionalPositions
+        self.bonds: np.ndarray = bonds
+        self.cellVectors: np.ndarray = cellVectors
+
+    def __len__(self) -> int:
+        return len(self.xsdIds)
+
+    @property
+    def labels(self) -> np.ndarray:
+        return np.asarray(self.labelTable, dtype=str)[self.labelCodes]
+
+    @property
+    def cellLengths(self) -> np.ndarray:
+        return np.diag(self.cellVectors).copy()
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.fractionalPositions * self.cellLengths
+
+    @property
+    def moleculeIds(self) -> np.ndarray:
+        if not hasattr(self, "_moleculeIds"):
+            self._moleculeIds: np.ndarray = findMoleculeIds(len(self), self.bonds)
+        return self._moleculeIds
+
+    def toCrystalStructure(self) -> CrystalStructure:
+        return CrystalStructure(
+            typeLabels=self.labels,
+            positions=self.positions,
+            moleculeIds=self.moleculeIds,
+            boxBounds=np.column_stack((np.zeros(3), self.cellLengths)),
+        )
+
+
 class XSDFile(File):
     @staticmethod
     def get_property_value(line: str, propertyName: str) -> str:
@@ -24,107 +82,136 @@ class XSDFile(File):
         Regroupe les atomes en molécules basées sur les liaisons.
         bonds : liste de tuples (atom1, atom2) représentant les liaisons.
         Retourne une liste de molécules (listes d'atomes).
+        Le parcours du graphe se fait sur des indices entiers (voir findMoleculeIds).
         """
+        atomIndex: dict[int, int] = {}
+        atomList: list[Atom] = []
+        bondIndices: list[tuple[int, int]] = []
+        for atom1, atom2 in chemicalBonds:
+            for atom in (atom1, atom2):
+                if id(atom) not in atomIndex:
+                    atomIndex[id(atom)] = len(atomList)
+                    atomList.append(atom)
+            bondIndices.append((atomIndex[id(atom1)], atomIndex[id(atom2)]))
 
-        linkedAtoms: dict[Atom, list[Atom]] = {}
-        # for atom1, atom2 in chemicalBonds:
-        #     atom1.bond_to(atom2)
-
-        # Recherche des molécules en parcourant le graphe
-        visited_atoms: set[Atom] = set()
-
-        # Fonction récursive pour explorer une molécule
-        def appendAtomChain(atom: Atom, molecule: Molecule):
-            """
-            Add one atom (and recursively its neighbors) to the molecule.
-            """
-            if atom in visited_atoms:
-                return
-            visited_atoms.add(atom)
-            molecule.addAtom(atom)
-            for neighbor in linkedAtoms[atom]:
-                appendAtomChain(neighbor, molecule)
-
-        molecules: list[Molecule] = []
-
-        for atom in linkedAtoms:
-            if atom not in visited_atoms:
-                molecule: Molecule = Molecule(atomList=[])
-                appendAtomChain(atom, molecule)
-                molecules.append(molecule)
-
+        moleculeIds: np.ndarray = findMoleculeIds(len(atomList), np.array(bondIndices, dtype=np.int64))
+        molecules: list[Molecule] = [Molecule(atomList=[]) for _ in range(int(moleculeIds.max(initial=0)))]
+        for atom, moleculeId in zip(atomList, moleculeIds.tolist()):
+            molecules[moleculeId - 1].addAtom(atom)
         return molecules
 
+    def readStructure(self) -> XSDStructure:
+        """
+        Lit atomes, liaisons et maille en un seul passage incrémental (iterparse).
+        Les éléments déjà traités sont retirés de l'arbre : la mémoire reste bornée
+        quelle que soit la taille du fichier, seuls les tableaux compacts grandissent.
+        """
+        if hasattr(self, "_structure"):
+            return self._structure
+
+        xsdIds: array = array("q")
+        labelCodes: array = array("H")
+        labelIndex: dict[str, int] = {}
+        positions: array = array("d")
+        bondIds: array = array("q")
+        cellVectors: list[list[float]] = [[0.0] * 3 for _ in range(3)]
+
+        openElements: list[ElementTree.Element] = []
+        for event, element in ElementTree.iterparse(self.filePath, events=("start", "end")):
+            if event == "end":
+                openElements.pop()
+                if openElements:
+                    openElements[-1].remove(element)
+                continue
+            openElements.append(element)
+            attributes: dict[str, str] = element.attrib
+            if element.tag == "Atom3d":
+                if "UserID" not in attributes or "XYZ" not in attributes:
+                    continue
+                xsdIds.append(int(attributes["ID"]))
+                labelCodes.append(labelIndex.setdefault(attributes.get("Name", " "), len(labelIndex)))
+                positions.extend(map(float, attributes["XYZ"].split(",")))
+            elif element.tag == "Bond":
+                ## Hotfix to exclude HBond
+                if "Connects" not in attributes or any("HBond" in value for value in attributes.values()):
+                    continue
+                bondIds.extend(map(int, attributes["Connects"].split(",")))
+            elif element.tag == "SpaceGroup":
+                for i, vectorName in enumerate(("AVector", "BVector", "CVector")):
+                    cellVectors[i] = [float(value) for value in attributes[vectorName].split(",")]
+
+        ids: np.ndarray = np.frombuffer(xsdIds, dtype=np.int64)
+        pairIds: np.ndarray = np.frombuffer(bondIds, dtype=np.int64).reshape(-1, 2)
+
+        # Conversion vectorisée des ID XSD des liaisons en indices d'atomes
+        if not len(ids):
+            pairIds = pairIds[:0]
+        sortOrder: np.ndarray = np.argsort(ids, kind="stable")
+        slots: np.ndarray = np.searchsorted(ids, pairIds, sorter=sortOrder).clip(max=max(len(ids) - 1, 0))
+        bonds: np.ndarray = sortOrder[slots]
+        knownAtoms: np.ndarray = (ids[bonds] == pairIds).all(axis=1)
+
+        self._structure = XSDStructure(
+            xsdIds=ids,
+            labelCodes=np.frombuffer(labelCodes, dtype=np.uint16),
+            labelTable=list(labelIndex),
+            fractionalPositions=np.frombuffer(positions, dtype=np.float64).reshape(-1, 3),
+            bonds=bonds[knownAtoms],
+            cellVectors=np.array(cellVectors, dtype=np.float64),
+        )
+        return self._structure
+
     def get_bonds(self) -> list[tuple[Atom, Atom]]:
-        self.atoms: dict[int, Atom] = self.get_atoms()
-        bonds: list[tuple[Atom, Atom]] = []
-        with open(self.filePath, "r") as xsdFile:
-            # atomDict: dict[str, Atom] = {}
-            for line in xsdFile:
-                if ("<Bond" and "Connects") in line:
-                    ## Hotfix to exclude HBond
-                    if "HBond" in line:
-                        continue
-                    xsdIdAtom1, xsdIdAtom2 = self.get_property_value(line, "Connects").split(",")
-                    # atomPairs += [(Atom(xsdIdAtom1), Atom(xsdIdAtom2))]
-                    print(xsdIdAtom1, xsdIdAtom2)
-                    # print(self.atoms[])
-                    bonds.append((self.atoms[str(xsdIdAtom1)], self.atoms[str(xsdIdAtom2)]))
-        return bonds
+        self.atoms: dict[str, Atom] = self.get_atoms()
+        structure: XSDStructure = self.readStructure()
+        atomList: list[Atom] = list(self.atoms.values())
+        return [(atomList[i], atomList[j]) for i, j in structure.bonds.tolist()]
 
     def get_cell_parameters(self) -> list[list[str]]:
-        with open(self.filePath, "r") as xsdFile:
-            aVector: list[str] = []
-            bVector: list[str] = []
-            cVector: list[str] = []
-            for line in xsdFile:
-                if "SpaceGroup" in line:
-                    aVector: list[str] = self.get_property_value(line, "AVector").split(",")
-                    bVector: list[str] = self.get_property_value(line, "BVector").split(",")
-                    cVector: list[str] = self.get_property_value(line, "CVector").split(",")
-            return [aVector, bVector, cVector]
-
-    def get_atoms(self) -> dict[int, Atom]:
-        with open(self.filePath, "r") as xsdFile:
-            self.atoms: dict[int, Atom] = {}
-            for line in xsdFile:
-                if ("<Atom3d" and "UserID") in line:
-                    newAtom = Atom()
-                    newAtom.id = self.get_property_value(line, "ID")
-                    newAtom.label = self.get_property_value(line, "Name")
-                    newAtom.x, newAtom.y, newAtom.z = self.get_property_value(line, "XYZ").split(",")
-                    self.atoms[newAtom.id] = newAtom
-                    print(newAtom, newAtom.id, newAtom.label, newAtom.x, newAtom.y, newAtom.z)
+        structure: XSDStructure = self.readStructure()
+        return [[str(value) for value in vector] for vector in structure.cellVectors.tolist()]
+
+    def get_atoms(self) -> dict[str, Atom]:
+        structure: XSDStructure = self.readStructure()
+        self.atoms: dict[str, Atom] = {}
+        for xsdId, label, (x, y, z) in zip(structure.xsdIds.tolist(), structure.labels.tolist(), structure.fractionalPositions.tolist()):
+            newAtom = Atom()
+            newAtom.id = str(xsdId)
+            newAtom.label = label
+            newAtom.x, newAtom.y, newAtom.z = x, y, z
+            self.atoms[newAtom.id] = newAtom
         return self.atoms
 
+    def toCrystalStructure(self, generateTopology: bool = False) -> CrystalStructure:
+        """generateTopology adds the template bonds and angles, which needs labels such as "O[Water]"."""
+        crystal: CrystalStructure = self.readStructure().toCrystalStructure()
+        if generateTopology:
+            crystal.generateTopology()
+        return crystal
+
     def getCrystal(self) -> str:
+        """
+        LAMMPS commands of the crystal, bonds from create_bonds many distance searches. For the template
+        bonds and angles, load toCrystalStructure(generateTopology=True) with loadSystem(..., asDataFile=True).
+        """
         textBuffer = StringIO()
-        atoms = self.get_atoms()
-        bonds = self.get_bonds()
-        aVector, bVector, cVector = self.get_cell_parameters()
-
-        molecularSystem = MolecularSystem()
-        self.molecules = molecularSystem.find_molecules(bonds)
-
-        # print(atomPairs)
-        # self.molecules = self.find_molecules(atomPairs)
-        crystalMatrix: list[float] = [float(aVector[0]), float(bVector[1]), float(cVector[2])]
+        structure: XSDStructure = self.readStructure()
+        moleculeIds: np.ndarray = structure.moleculeIds
+        crystalMatrix: list[float] = structure.cellLengths.tolist()
 
         textBuffer.write("\n")
-        lammpsIdCorrespondingTo: dict[int, int] = {}
-        i = 1
-        for xsdId, atom in atoms.items():
-            createAtom: str = f"create_atoms {atom.label} single {float(atom.x) * crystalMatrix[0]} {float(atom.y) * crystalMatrix[1]} {float(atom.z) * crystalMatrix[2]} remap yes #{xsdId}\n"
-            lammpsIdCorrespondingTo[xsdId] = i
-            i += 1
-            textBuffer.write(createAtom)
-
-        print(self.molecules)
-        for i, molecule in enumerate(self.molecules):
-            textBuffer.write("\n")
-            for atom in molecule:
-                atomBindsToMolecule: str = f"set atom {lammpsIdCorrespondingTo.get(atom.id)} mol {i + 1}\n"
-                textBuffer.write(atomBindsToMolecule)
+        textBuffer.writelines(
+            f"create_atoms {label} single {x} {y} {z} remap yes #{xsdId}\n"
+            for xsdId, label, (x, y, z) in zip(structure.xsdIds.tolist(), structure.labels.tolist(), structure.positions.tolist())
+        )
+
+        previousMolecule: int = 0
+        for lammpsId in (np.argsort(moleculeIds, kind="stable") + 1).tolist():
+            moleculeId: int = int(moleculeIds[lammpsId - 1])
+            if moleculeId != previousMolecule:
+                textBuffer.write("\n")
+                previousMolecule = moleculeId
+            textBuffer.write(f"set atom {lammpsId} mol {moleculeId}\n")
 
         # for molecule, atoms in correctedMolDict.items():
         #     for atomWithXsdID in atoms:
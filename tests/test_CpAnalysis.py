@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from LammPy.CpAnalysis import blockStatistics, cpFromMeasurements, cpFromNptSweep
+
+
+def writeStage(path, TempK: float, enthalpy: float) -> None:
+    rows: np.ndarray = np.zeros((50, 8))
+    rows[:, 0] = np.arange(50) * 100
+    rows[:, 3] = TempK
+    rows[:, 7] = enthalpy
+    np.savetxt(path, rows, header="TimeStep VirtualTime(s) CpuTime(s) T(K) P(bar) Density(-) Volume(A^3) H(kJ/mol.at)")
+
+
+def test_sweepSkipsTheRelaxationAndReadsDecimalConditions(tmp_path):
+    writeStage(tmp_path / "relax_NPT-5K-1bar.csv", 5, -100)
+    writeStage(tmp_path / "T300.5K_NPT-300.5K-1.5bar.csv", 300.5, 0.0)
+    writeStage(tmp_path / "T310.5K_NPT-310.5K-1.5bar.csv", 310.5, 0.5)
+    result: np.ndarray = cpFromNptSweep(tmp_path.as_posix())
+    assert len(result) == 1
+    assert result["P"][0] == 1.5
+    np.testing.assert_allclose([result["T"][0], result["Cp"][0]], [305.5, 50.0])
+
+
+def test_measurementTemperaturesKeepTheirDecimals(tmp_path):
+    for TempK, fileTag in ((250.0, "250"), (250.5, "250p5")):
+        rows: np.ndarray = np.zeros((100, 8))
+        rows[:50, 3], rows[50:, 3] = TempK - 5, TempK + 5
+        rows[:50, 7], rows[50:, 7] = 0.0, 0.25
+        np.savetxt(tmp_path / f"DataWritingT{fileTag}.csv", rows)
+    result: np.ndarray = cpFromMeasurements(tmp_path.as_posix())
+    assert result["T"].tolist() == [250.0, 250.5]
+    np.testing.assert_allclose(result["Cp"], 25.0)
+
+
+def test_tooFewSamplesForTheBlocksRaise():
+    values: np.ndarray = np.arange(10.0).reshape(2, 5)
+    mask: np.ndarray = np.array([[True] * 5, [True, True, True, False, False]])
+    with pytest.raises(ValueError, match="3 samples"):
+        blockStatistics(values, mask, blockCount=5)
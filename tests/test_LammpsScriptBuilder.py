@@ -0,0 +1,114 @@
+import re
+
+import pytest
+
+from LammPy.LammpsScriptBuilder import WATER_CRYSTAL, LammpsScriptFactory
+
+
+def waterScript(constraintMode: str) -> str:
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.setConstraints(constraintMode)
+    factory.loadSystem(WATER_CRYSTAL, generateTopology=constraintMode != "rigid")
+    factory.addNVT(Temp1K=100, Temp2K=100, fixDurationPs=1)
+    return factory._getScript("test")
+
+
+def lastCoefficient(script: str, command: str, label: str) -> float:
+    """Value of the last '<command> <label> <value>' line, the one LAMMPS keeps."""
+    values: list[str] = re.findall(rf"^\s*{command}\s+{re.escape(label)}\s+(\S+)\s*$", script, re.MULTILINE)
+    return float(values[-1])
+
+
+def test_shakeHoldsWaterAtTemplateGeometry():
+    script: str = waterScript("shake")
+    assert "fix constraints all shake" in script
+    # bond_style zero takes r0 from bond_coeff: 0 would collapse every O-H
+    assert abs(lastCoefficient(script, "bond_coeff", "OH[Water]") - 1.0) < 0.01
+    assert abs(lastCoefficient(script, "angle_coeff", "HOH[Water]") - 109.47) < 0.1
+
+
+def test_rigidModeKeepsForceFieldCoefficients():
+    script: str = waterScript("rigid")
+    assert "fix constraints" not in script
+    assert lastCoefficient(script, "bond_coeff", "OH[Water]") == 0
+
+
+def test_launchCommandRecomputesTheProcessorGrid():
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(WATER_CRYSTAL)
+    factory.setProcessorGrid(8)
+    command: str = factory.acceleratedLaunchCommand("job.lammps", coreCount=4, atomCount=100000)
+    assert "-np 4 " in command
+    assert factory.processorGrid is not None and factory.processorGrid[0] * factory.processorGrid[1] * factory.processorGrid[2] == 4
+
+
+def test_topologyGenerationIsOptIn():
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(WATER_CRYSTAL)
+    assert "create_bonds many WaterOxygenAtoms WaterHydrogenAtoms" in factory.system
+    # Distance searches create no angle for fix shake to hold
+    with pytest.raises(ValueError, match="generateTopology"):
+        factory.setConstraints("shake")
+    factory.loadSystem(WATER_CRYSTAL, generateTopology=True)
+    # The generated bonds and angles go to the read_data file, not to one command each
+    assert factory.systemData is not None and len(factory.systemData.angles)
+    assert "create_bonds" not in factory.system
+
+
+def test_unparsableCommandsAreLoadedAsText():
+    commands: str = WATER_CRYSTAL.replace("create_atoms H[Water] single", "create_atoms H[Water] single $(v_shift) 0 0 #", 1)
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(commands)
+    assert factory.system.startswith(commands)
+    assert "create_bonds many" in factory.system
+    assert factory.atomCount() == 0
+    with pytest.raises(ValueError):
+        factory.loadSystem(commands, asDataFile=True)
+
+
+def test_labelsWithoutMoleculeKindLoadWithoutTopology():
+    # XSD files label atoms as drawn, e.g. Name="O1"
+    commands: str = WATER_CRYSTAL.replace("O[Water]", "O1").replace("H[Water]", "H1")
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(commands)
+    assert factory.atomCount() > 0
+    assert "create_bonds many" in factory.system
+
+
+def test_resumeSkipsAnAdaptiveStageThatStoppedEarly(tmp_path):
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(WATER_CRYSTAL)
+    factory.enableCheckpoints()
+    factory.addAdaptiveNPT(TempK=100, PressureBar=1, minDurationPs=1, maxDurationPs=10)
+    factory.addNVT(Temp1K=100, Temp2K=100, fixDurationPs=1)
+    factory.buildJobAtPath((tmp_path / "job.lammps").as_posix())
+
+    outputDirectory = tmp_path / "output"
+    outputDirectory.mkdir()
+    (outputDirectory / factory.checkpointFileName(0)).touch()
+    # Converged after 2 of the 10 ps: a fifth of the rows of a full-length stage
+    (outputDirectory / factory.fixes[0].csvFileName).write_text("# header\n" + "0 0 0 0 0 0 0 0\n" * (factory.fixes[0].expectedRows(factory.timestep) // 5))
+    assert factory.buildResumeJobAtPath((tmp_path / "resume.lammps").as_posix(), (tmp_path / "job.lammps").as_posix()) == 1
+
+
+def test_partitionedJobCanBeBuiltTwice(tmp_path):
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(WATER_CRYSTAL)
+    factory.addNVT(Temp1K=100, Temp2K=100, fixDurationPs=1)
+    for _ in range(2):
+        command: str = factory.buildPartitionedJobAtPath((tmp_path / "replicas.lammps").as_posix(), [100, 150, 200], [1], fixDurationPs=5)
+    script: str = (tmp_path / "replicas.lammps").read_text()
+    assert len(factory.fixes) == 1
+    assert script.count("#NPT at the partition temperature") == 1
+    assert "-partition 3x1" in command
+    # Each partition logs to log.lammps.<partition>, not to the universe log.lammps
+    assert "variable partitionLog world log.lammps.0 log.lammps.1 log.lammps.2" in script
+    assert "shell cp ${partitionLog} ${outputDir}" in script
+
+
+def test_cpMeasurementsKeepDecimalTemperaturesApart():
+    factory: LammpsScriptFactory = LammpsScriptFactory()
+    factory.loadSystem(WATER_CRYSTAL)
+    factory.addCpMeasurement(TempK=250.0)
+    factory.addCpMeasurement(TempK=250.5)
+    assert [stage.csvFileName for stage in factory.fixes] == ["DataWritingT250.csv", "DataWritingT250p5.csv"]
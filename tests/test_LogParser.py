@@ -0,0 +1,45 @@
+import numpy as np
+
+from LammPy.LammpsScriptBuilder import ProtocolStage
+from LammPy.LogParser import parseLog, stageSummary
+
+# LAMMPS echoes the run line as written, then once more after $() substitution
+RUN_BLOCK: str = """run $(1000*1/dt) #{comment}
+run 1000
+Loop time of 2.5 on 4 procs for 1000 steps with 3000 atoms
+
+Performance: 34.560 ns/day, 0.694 hours/ns, 400.000 timesteps/s
+Total # of neighbors = 1200000
+Ave neighs/atom = 400
+Neighbor list builds = 50
+{dangerous}
+"""
+
+
+def test_uncheckedDangerousBuildsAreUnknown(tmp_path):
+    logPath = tmp_path / "log.lammps"
+    logPath.write_text(
+        RUN_BLOCK.format(comment="checked", dangerous="Dangerous builds = 0")
+        + RUN_BLOCK.format(comment="unchecked", dangerous="Dangerous builds not checked")
+    )
+    runs: np.ndarray = parseLog(logPath.as_posix())
+    assert len(runs) == 2
+    assert runs["dangerousBuilds"][0] == 0
+    assert np.isnan(runs["dangerousBuilds"][1])
+    assert np.isnan(stageSummary(runs)["dangerousBuilds"]).all()
+
+
+def test_runBlocksAreMatchedToTheirStage(tmp_path):
+    stages: list[ProtocolStage] = [
+        ProtocolStage(name="NVT", commands="fix NVT all nvt temp 100 100 50\nrun $(1000*1/dt) #NVT at 100K\nunfix NVT\n"),
+        ProtocolStage(name="NPT", commands="fix NPT all npt temp 100 100 50 iso 1 1 500\nrun $(1000*1/dt) #NPT at 100K 1bar\nunfix NPT\n"),
+    ]
+    logPath = tmp_path / "log.lammps"
+    logPath.write_text(
+        RUN_BLOCK.format(comment="NVT at 100K", dangerous="Dangerous builds = 0")
+        + "run 500\nLoop time of 1.0 on 4 procs for 500 steps with 3000 atoms\n"
+        + RUN_BLOCK.format(comment="NPT at 100K 1bar", dangerous="Dangerous builds = 0")
+    )
+    runs: np.ndarray = parseLog(logPath.as_posix(), stages)
+    assert runs["stage"].tolist() == ["NVT", "", "NPT"]
+    assert runs["comment"].tolist() == ["NVT at 100K", "", "NPT at 100K 1bar"]
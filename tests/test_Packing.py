@@ -0,0 +1,11 @@
+import numpy as np
+
+from LammPy.CellList import neighbourPairs
+from LammPy.Packing import packMolecules
+
+
+def test_packedMoleculesDoNotClash():
+    structure = packMolecules({"Water": 500, "Nitric": 100}, densityGcm3=1.3, minDistance=1.6, seed=1)
+    assert len(structure) == 500 * 3 + 100 * 5
+    i, j, _ = neighbourPairs(structure.positions, structure.boxLengths, 1.6)
+    assert not (structure.moleculeIds[i] != structure.moleculeIds[j]).any()
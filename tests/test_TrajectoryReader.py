@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from LammPy.TrajectoryReader import TrajectoryReader
+
+
+def writeDump(path, columns: str, rows: np.ndarray, bounds: np.ndarray) -> None:
+    with open(path, "w") as dump:
+        dump.write(f"ITEM: TIMESTEP\n0\nITEM: NUMBER OF ATOMS\n{len(rows)}\nITEM: BOX BOUNDS pp pp pp\n")
+        dump.writelines(f"{low} {high}\n" for low, high in bounds)
+        dump.write(f"ITEM: ATOMS id type {columns}\n")
+        dump.writelines(f"{atom + 1} 1 {x} {y} {z}\n" for atom, (x, y, z) in enumerate(rows))
+
+
+def test_scaledCoordinatesAreMappedThroughTheBox(tmp_path):
+    bounds: np.ndarray = np.array([[1.0, 21.0], [-2.0, 20.0], [3.0, 24.0]])
+    scaled: np.ndarray = np.array([[0.0, 0.0, 0.0], [0.5, 0.25, 1.0]])
+    writeDump(tmp_path / "scaled.lammpstrj", "xs ys zs", scaled, bounds)
+    with TrajectoryReader(str(tmp_path / "scaled.lammpstrj")) as reader:
+        assert reader.scaledCoordinates
+        np.testing.assert_allclose(reader.positions(0), [[1.0, -2.0, 3.0], [11.0, 3.5, 24.0]])
+
+
+def test_emptyDumpIsRejectedClearly(tmp_path):
+    (tmp_path / "empty.lammpstrj").touch()
+    with pytest.raises(ValueError, match="empty"):
+        TrajectoryReader(str(tmp_path / "empty.lammpstrj"))
+
+
+def test_unwritableIndexKeepsTheIndexInMemory(tmp_path, monkeypatch):
+    def readOnlyDirectory(*arguments, **keywords):
+        raise PermissionError("read-only directory")
+
+    writeDump(tmp_path / "frames.lammpstrj", "x y z", np.ones((2, 3)), np.array([[0.0, 5.0]] * 3))
+    monkeypatch.setattr(np, "savez", readOnlyDirectory)
+    with TrajectoryReader(str(tmp_path / "frames.lammpstrj")) as reader:
+        assert len(reader) == 1
+        np.testing.assert_allclose(reader.positions(0), np.ones((2, 3)))